@@ -0,0 +1,628 @@
+import argparse
+import base64
+import hashlib
+import json
+import os
+import random
+import shutil
+import socketserver
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+# 本地模拟服务名称：HTTP服务，以及使用Redis协议的共享缓存
+HTTP_SERVICES = ('github', 'aliyun', 'wxpusher')
+SERVICES = HTTP_SERVICES + ('redis',)
+
+# 合成事件使用的取值
+SYNTHETIC_TYPES = ['website', 'ping', 'service', 'smtp']
+SYNTHETIC_CATEGORIES = ['Production', 'Staging', 'Edge Nodes', 'Databases']
+SYNTHETIC_STATUSES = ['online', 'offline']
+SYNTHETIC_NAMES = ['Web Server {n} - HTTPS', 'db-eu-{n} Ping', 'Singapore FRP {n}', 'API Gateway {n}']
+
+class StubState:
+    """模拟服务的共享状态：调用计数、注入延迟和GitHub仓库文件。"""
+    def __init__(self, latency: Dict[str, float]):
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.counts = {service: 0 for service in SERVICES}
+        self.files: Dict[str, bytes] = {}
+
+    def record(self, service: str) -> None:
+        """记录一次调用并按配置注入延迟。"""
+        with self.lock:
+            self.counts[service] += 1
+        delay = self.latency.get(service, 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def reset_counts(self) -> None:
+        """清零调用计数。"""
+        with self.lock:
+            self.counts = {service: 0 for service in SERVICES}
+
+def _file_sha(content: bytes) -> str:
+    """按Git blob的方式计算文件SHA。"""
+    return hashlib.sha1(b'blob %d\0' % len(content) + content).hexdigest()
+
+def _make_handler(state: StubState, service: str):
+    """创建指定服务的请求处理类。"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def _read_body(self) -> bytes:
+            length = int(self.headers.get('Content-Length') or 0)
+            return self.rfile.read(length) if length else b''
+
+        def _send_json(self, status: int, payload: Optional[Dict[str, Any]], headers: Optional[Dict[str, str]] = None) -> None:
+            body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            if body:
+                self.wfile.write(body)
+
+        def do_GET(self):
+            self._read_body()
+            state.record(service)
+            if service != 'github':
+                return self._send_json(404, {'message': 'Not Found'})
+            path = urlparse(self.path).path
+            if '/git/blobs/' in path:
+                sha = path.rsplit('/', 1)[-1]
+                with state.lock:
+                    content = next((data for data in state.files.values() if _file_sha(data) == sha), None)
+                if content is None:
+                    return self._send_json(404, {'message': 'Not Found'})
+                return self._send_json(200, {'content': base64.b64encode(content).decode(), 'encoding': 'base64', 'sha': sha})
+            file_path = path.split('/contents/', 1)[-1]
+            with state.lock:
+                content = state.files.get(file_path)
+            if content is None:
+                return self._send_json(404, {'message': 'Not Found'})
+            sha = _file_sha(content)
+            etag = f'"{sha}"'
+            if self.headers.get('If-None-Match') == etag:
+                return self._send_json(304, None, {'ETag': etag})
+            self._send_json(200, {
+                'content': base64.b64encode(content).decode(),
+                'encoding': 'base64',
+                'sha': sha,
+                'size': len(content)
+            }, {'ETag': etag})
+
+        def do_PUT(self):
+            data = json.loads(self._read_body() or b'{}')
+            state.record(service)
+            file_path = urlparse(self.path).path.split('/contents/', 1)[-1]
+            new_content = base64.b64decode(data.get('content', ''))
+            with state.lock:
+                current = state.files.get(file_path)
+                if current is None and data.get('sha'):
+                    return self._send_json(404, {'message': 'Not Found'})
+                if current is not None and data.get('sha') != _file_sha(current):
+                    return self._send_json(409 if data.get('sha') else 422, {'message': 'sha mismatch'})
+                state.files[file_path] = new_content
+            self._send_json(201 if current is None else 200, {'content': {'path': file_path, 'sha': _file_sha(new_content)}})
+
+        def do_POST(self):
+            raw_body = self._read_body()
+            state.record(service)
+            if service == 'wxpusher':
+                return self._send_json(200, {'code': 1000, 'msg': '处理成功', 'data': [], 'success': True})
+
+            # 阿里云RPC风格请求：参数位于查询字符串或表单中
+            params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+            params.update({key: values[0] for key, values in parse_qs(raw_body.decode('utf-8')).items()})
+            target = params.get('TargetLanguage', 'zh')
+            action = params.get('Action')
+            if action == 'GetBatchTranslate':
+                source = json.loads(params.get('SourceText', '{}'))
+                translated = [
+                    {'code': '200', 'index': index, 'translated': f"[{target}]{text}", 'wordCount': str(len(text))}
+                    for index, text in source.items()
+                ]
+                return self._send_json(200, {'Code': '200', 'TranslatedList': translated, 'RequestId': 'stub'})
+            if action == 'TranslateGeneral':
+                text = params.get('SourceText', '')
+                return self._send_json(200, {'Code': '200', 'Data': {'Translated': f"[{target}]{text}", 'WordCount': str(len(text))}, 'RequestId': 'stub'})
+            self._send_json(400, {'Code': 'InvalidAction', 'Message': f'unsupported action {action}'})
+
+    return Handler
+
+class RespStubHandler(socketserver.StreamRequestHandler):
+    """处理Redis协议（RESP）命令，每个连接按顺序处理流水线中的命令。"""
+
+    def _read_command(self) -> Optional[List[bytes]]:
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b'*'):
+            return line.split()
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def handle(self):
+        server: RespStubServer = self.server
+        while True:
+            try:
+                command = self._read_command()
+            except (OSError, ValueError):
+                return
+            if command is None:
+                return
+            server.state.record('redis')
+            try:
+                reply = server.execute(command)
+            except (IndexError, ValueError):
+                reply = b'-ERR syntax error\r\n'
+            try:
+                self.wfile.write(reply)
+                self.wfile.flush()
+            except OSError:
+                return
+
+class RespStubServer(socketserver.ThreadingTCPServer):
+    """模拟共享缓存的Redis协议服务，支持 PING、AUTH、SELECT、GET、MGET、SET（含EX）、DEL 和 FLUSHDB。"""
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+    def __init__(self, address, state: StubState):
+        self.state = state
+        self.data: Dict[bytes, tuple] = {}
+        self.lock = threading.Lock()
+        super().__init__(address, RespStubHandler)
+
+    @property
+    def server_port(self) -> int:
+        return self.server_address[1]
+
+    def _get(self, key: bytes, now: float) -> Optional[bytes]:
+        entry = self.data.get(key)
+        if entry is None or (entry[1] is not None and entry[1] <= now):
+            return None
+        return entry[0]
+
+    def execute(self, command: List[bytes]) -> bytes:
+        """执行一条命令并返回编码后的响应。"""
+        def bulk(value: Optional[bytes]) -> bytes:
+            return b'$-1\r\n' if value is None else b'$%d\r\n%s\r\n' % (len(value), value)
+
+        name, args, now = command[0].upper(), command[1:], time.time()
+        with self.lock:
+            if name == b'PING':
+                return b'+PONG\r\n'
+            if name in (b'AUTH', b'SELECT'):
+                return b'+OK\r\n'
+            if name == b'GET':
+                return bulk(self._get(args[0], now))
+            if name == b'MGET':
+                return b'*%d\r\n' % len(args) + b''.join(bulk(self._get(key, now)) for key in args)
+            if name == b'SET':
+                expires = now + float(args[3]) if len(args) >= 4 and args[2].upper() == b'EX' else None
+                self.data[args[0]] = (args[1], expires)
+                return b'+OK\r\n'
+            if name == b'DEL':
+                return b':%d\r\n' % sum(self.data.pop(key, None) is not None for key in args)
+            if name == b'FLUSHDB':
+                self.data.clear()
+                return b'+OK\r\n'
+        return b"-ERR unknown command '%s'\r\n" % name
+
+class StubServer(ThreadingHTTPServer):
+    """模拟服务使用的HTTP服务器，增大监听队列以承受突发并发连接。"""
+    daemon_threads = True
+    request_queue_size = 128
+
+def start_stub_servers(state: StubState) -> Dict[str, ThreadingHTTPServer]:
+    """在本地随机端口启动 GitHub、阿里云机器翻译、WxPusher 和共享缓存（Redis协议）的模拟服务。"""
+    servers = {}
+    for service in HTTP_SERVICES:
+        servers[service] = StubServer(('127.0.0.1', 0), _make_handler(state, service))
+    servers['redis'] = RespStubServer(('127.0.0.1', 0), state)
+    for server in servers.values():
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    return servers
+
+def load_events(path: str) -> List[Dict[str, Any]]:
+    """
+    从JSONL文件中读取录制的Webhook事件。
+
+    每行可以是HetrixTools事件对象，也可以是包含 body 字段的函数计算事件；
+    不包含监控字段的行会被跳过。
+    """
+    events = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(item, dict) and isinstance(item.get('body'), str):
+                try:
+                    body = item['body']
+                    if item.get('isBase64Encoded'):
+                        body = base64.b64decode(body).decode('utf-8')
+                    item = json.loads(body)
+                except (ValueError, json.JSONDecodeError):
+                    continue
+            if isinstance(item, dict) and ('monitor_name' in item or 'monitor_status' in item):
+                events.append(item)
+    return events
+
+def synthesize_events(count: int, cardinality: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """按给定数量和监控项基数合成Webhook事件。"""
+    rng = random.Random(seed)
+    monitors = []
+    for index in range(max(1, cardinality)):
+        monitors.append({
+            'monitor_id': f"m{index:05d}",
+            'monitor_name': SYNTHETIC_NAMES[index % len(SYNTHETIC_NAMES)].format(n=index),
+            'monitor_target': f"host{index}.example.com",
+            'monitor_type': SYNTHETIC_TYPES[index % len(SYNTHETIC_TYPES)],
+            'monitor_category': SYNTHETIC_CATEGORIES[index % len(SYNTHETIC_CATEGORIES)],
+        })
+    events = []
+    base_timestamp = 1700000000
+    for index in range(count):
+        event = dict(rng.choice(monitors))
+        event['monitor_status'] = rng.choice(SYNTHETIC_STATUSES)
+        event['timestamp'] = base_timestamp + index
+        event['monitor_errors'] = {}
+        events.append(event)
+    return events
+
+def percentile(values: List[float], pct: float) -> float:
+    """使用最近秩法计算百分位数。"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100.0 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+def reset_instance(local_cache_path: str) -> None:
+    """模拟新的函数实例：清空所有进程内缓存、共享客户端和本地缓存文件（共享缓存服务中的数据保留）。"""
+    import clients
+    import github
+    import local_cache
+    import shared_cache
+
+    github.invalidate_json_cache()
+    github._pending_updates.clear()
+    local_cache.clear()
+    shared_cache.reset()
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(local_cache_path + suffix):
+            os.remove(local_cache_path + suffix)
+    clients.reset_clients()
+
+def run_scenario(name: str, events: List[Dict[str, Any]], state: StubState, concurrency: int = 1) -> Dict[str, Any]:
+    """
+    通过 index.handler 重放事件并统计延迟、吞吐量和外部调用次数。
+
+    Returns:
+        Dict[str, Any]: 场景名称、事件数、错误数、延迟百分位（毫秒）、吞吐量和各服务调用次数。
+    """
+    import idempotency
+    import index
+
+    # 各场景重放相同的事件，清空幂等缓存以测量完整的处理流程
+    idempotency.clear()
+    payloads = [json.dumps({'body': json.dumps(event)}) for event in events]
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def invoke(payload: str) -> None:
+        nonlocal errors
+        start = time.perf_counter()
+        response = index.handler(payload, None)
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            if response.get('statusCode') != 200:
+                errors += 1
+
+    state.reset_counts()
+    started = time.perf_counter()
+    if concurrency <= 1:
+        for payload in payloads:
+            invoke(payload)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(invoke, payloads))
+    duration = time.perf_counter() - started
+
+    return {
+        'scenario': name,
+        'events': len(events),
+        'errors': errors,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'throughput': len(events) / duration if duration > 0 else 0.0,
+        'calls': dict(state.counts),
+    }
+
+def profile_imports(module: str = 'index', top: int = 10, runs: int = 3) -> Dict[str, Any]:
+    """
+    使用 python -X importtime 在新进程中测量模块的导入耗时，用于跟踪冷启动时间。
+
+    Args:
+        module (str): 要导入的模块，默认为 index。
+        top (int): 输出累计耗时最高的模块数量。
+        runs (int): 测量次数，取总耗时的中位数那一次。
+
+    Returns:
+        Dict[str, Any]: module、total_ms（模块累计导入耗时）和 top（耗时最高的模块及其累计耗时，毫秒）。
+    """
+    repo_dir = os.path.dirname(os.path.abspath(__file__))
+    samples = []
+    for _ in range(max(1, runs)):
+        completed = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=repo_dir, capture_output=True, text=True
+        )
+        entries = []
+        for line in completed.stderr.splitlines():
+            if not line.startswith('import time:') or '|' not in line:
+                continue
+            parts = line[len('import time:'):].split('|')
+            if len(parts) != 3 or not parts[1].strip().isdigit():
+                continue
+            name = parts[2].rstrip()
+            depth = (len(name) - len(name.lstrip(' '))) // 2
+            entries.append((name.strip(), depth, float(parts[1]) / 1000.0))
+
+        # 子模块的输出位于父模块之前且缩进更深，只统计目标模块导入树中的模块
+        cumulative: Dict[str, float] = {}
+        position = next((i for i in range(len(entries) - 1, -1, -1) if entries[i][0] == module and entries[i][1] == 0), None)
+        if position is not None:
+            cumulative[module] = entries[position][2]
+            for name, depth, value in reversed(entries[:position]):
+                if depth == 0:
+                    break
+                cumulative[name] = max(value, cumulative.get(name, 0.0))
+        samples.append((cumulative.get(module, 0.0), cumulative))
+
+    samples.sort(key=lambda sample: sample[0])
+    total_ms, cumulative = samples[len(samples) // 2]
+    heaviest = sorted(
+        ((name, value) for name, value in cumulative.items() if name != module),
+        key=lambda item: item[1], reverse=True
+    )[:top]
+    return {'module': module, 'total_ms': total_ms, 'top': [{'module': name, 'cumulative_ms': value} for name, value in heaviest]}
+
+def _synthesize_store(entries: int, seed: int = 0) -> Dict[str, str]:
+    """合成指定条目数的翻译文件内容，包含多语言键和中文翻译。"""
+    rng = random.Random(seed)
+    words = ['Web', 'Server', 'Gateway', 'Database', 'Edge', 'Node', 'Ping', 'HTTPS', 'Cluster', 'Backup']
+    chinese = '网站服务器网关数据库边缘节点集群备份监控在线离线'
+    store = {}
+    for index in range(entries):
+        source = ' '.join(rng.choice(words) for _ in range(rng.randint(2, 5))) + f" {index}"
+        language = rng.choice(['', 'ja::', 'en::'])
+        store[language + source] = ''.join(rng.choice(chinese) for _ in range(rng.randint(4, 12)))
+    return store
+
+def benchmark_store_codecs(sizes: List[int], repeat: int = 5) -> List[Dict[str, Any]]:
+    """
+    测量各JSON实现读写翻译文件的耗时：解码、按键排序编码和计算Git Blob SHA（用于跳过内容未变化的提交）。
+
+    legacy 为改用 json_codec 之前的写法（json.loads 和不排序、转义非ASCII字符的 json.dumps），作为对比。
+
+    Args:
+        sizes (List[int]): 翻译文件的条目数。
+        repeat (int): 每项测量的次数，取中位数。
+
+    Returns:
+        List[Dict[str, Any]]: 每个实现和条目数的 codec、entries、bytes、decode_ms、encode_ms 和 sha_ms（legacy 为None）。
+    """
+    import github
+    import json_codec
+
+    def measure(func) -> float:
+        samples = []
+        for _ in range(max(1, repeat)):
+            start = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - start)
+        return percentile(samples, 50) * 1000
+
+    results = []
+    previous = json_codec.get_backend()
+    try:
+        for entries in sizes:
+            store = _synthesize_store(entries)
+            legacy = json.dumps(store).encode('utf-8')
+            results.append({
+                'codec': 'legacy', 'entries': entries, 'bytes': len(legacy),
+                'decode_ms': measure(lambda: json.loads(legacy.decode('utf-8'))),
+                'encode_ms': measure(lambda: json.dumps(store).encode('utf-8')),
+                'sha_ms': None,
+            })
+            for codec in json_codec.available_backends():
+                json_codec.use(codec)
+                encoded = json_codec.encode_store(store)
+                results.append({
+                    'codec': codec, 'entries': entries, 'bytes': len(encoded),
+                    'decode_ms': measure(lambda: json_codec.loads(encoded)),
+                    'encode_ms': measure(lambda: json_codec.encode_store(store)),
+                    'sha_ms': measure(lambda: github.blob_sha(encoded)),
+                })
+    finally:
+        json_codec.use(previous)
+    return results
+
+def print_store_report(results: List[Dict[str, Any]]) -> None:
+    """以表格形式输出翻译文件编解码结果。"""
+    header = f"{'codec':<10}{'entries':>10}{'KiB':>10}{'decode ms':>12}{'encode ms':>12}{'sha ms':>10}"
+    print(header)
+    print('-' * len(header))
+    for result in results:
+        print(f"{result['codec']:<10}{result['entries']:>10}{result['bytes'] / 1024:>10.1f}"
+              f"{result['decode_ms']:>12.2f}{result['encode_ms']:>12.2f}"
+              + (f"{result['sha_ms']:>10.2f}" if result['sha_ms'] is not None else f"{'-':>10}"))
+
+def _parse_latency(spec: str) -> Dict[str, float]:
+    """解析 github=50,aliyun=120 形式的延迟配置（毫秒）。"""
+    latency = {service: 0.0 for service in SERVICES}
+    for part in filter(None, (item.strip() for item in spec.split(','))):
+        service, _, value = part.partition('=')
+        if service not in SERVICES:
+            raise ValueError(f"未知服务: {service}")
+        latency[service] = float(value) / 1000.0
+    return latency
+
+def print_report(results: List[Dict[str, Any]]) -> None:
+    """以表格形式输出各场景结果。"""
+    header = f"{'scenario':<12}{'events':>8}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ev/s':>10}  calls (github/aliyun/wxpusher/redis)"
+    print(header)
+    print('-' * len(header))
+    for result in results:
+        calls = result['calls']
+        print(f"{result['scenario']:<12}{result['events']:>8}{result['errors']:>8}"
+              f"{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}{result['throughput']:>10.1f}"
+              f"  {calls['github']}/{calls['aliyun']}/{calls['wxpusher']}/{calls['redis']}")
+
+def print_import_profile(profile: Dict[str, Any]) -> None:
+    """输出导入耗时报告。"""
+    print(f"import {profile['module']}: {profile['total_ms']:.2f} ms")
+    for item in profile['top']:
+        print(f"  {item['module']:<40}{item['cumulative_ms']:>10.2f} ms")
+
+def main(argv=None) -> int:
+    """
+    重放Webhook事件的基准测试入口。
+
+    在本地启动 GitHub、阿里云机器翻译、WxPusher 和共享缓存的模拟服务，通过 index.handler 依次运行
+    cold（空翻译文件、新实例）、warm（翻译文件和缓存已预热）、burst（新实例、并发突发）
+    和 shared（启用共享缓存，其他实例已预热共享缓存后新实例并发突发）四个场景。
+    指定 --import-profile 时还会在新进程中测量 index 模块的导入耗时。
+    """
+    parser = argparse.ArgumentParser(description="重放Webhook事件并统计处理延迟")
+    parser.add_argument('--events', default='requests.jsonl', help="录制事件的JSONL文件，默认为 requests.jsonl；文件不存在或不含事件时合成事件")
+    parser.add_argument('--count', type=int, default=200, help="合成事件数量，默认200")
+    parser.add_argument('--cardinality', type=int, default=20, help="合成事件的监控项数量，默认20")
+    parser.add_argument('--concurrency', type=int, default=16, help="burst 场景的并发数，默认16")
+    parser.add_argument('--latency', default='', help="注入的服务延迟（毫秒），例如 github=80,aliyun=150,wxpusher=40")
+    parser.add_argument('--scenarios', default='cold,warm,burst,shared', help="要运行的场景，默认 cold,warm,burst,shared")
+    parser.add_argument('--seed', type=int, default=0, help="合成事件的随机种子")
+    parser.add_argument('--import-profile', action='store_true', help="同时测量 index 模块的冷启动导入耗时")
+    parser.add_argument('--store-sizes', default='', help="测量翻译文件编解码耗时的条目数，例如 1000,10000,100000")
+    parser.add_argument('--json', action='store_true', help="以JSON格式输出结果")
+    args = parser.parse_args(argv)
+
+    events = load_events(args.events) if os.path.exists(args.events) else []
+    if not events:
+        events = synthesize_events(args.count, args.cardinality, args.seed)
+
+    state = StubState(_parse_latency(args.latency))
+    servers = start_stub_servers(state)
+    workdir = tempfile.mkdtemp(prefix='hetrix-bench-')
+    local_cache_path = os.path.join(workdir, 'translations.sqlite3')
+
+    # 模块在导入时读取部分配置，必须在导入 index 之前设置环境变量
+    os.environ.update({
+        'GITHUB_TOKEN': 'bench-token',
+        'GITHUB_REPO': 'bench/translations',
+        'GITHUB_FILE': 'translations.json',
+        'GITHUB_API_URL': f"http://127.0.0.1:{servers['github'].server_port}",
+        'ALIYUN_ACCESS_KEY_ID': 'bench-id',
+        'ALIYUN_ACCESS_KEY_SECRET': 'bench-secret',
+        'ALIYUN_MT_DOMAIN': f"127.0.0.1:{servers['aliyun'].server_port}",
+        'ALIYUN_MT_PROTOCOL': 'http',
+        'APP_TOKEN': 'AT_bench',
+        'UID': 'UID_bench',
+        'WXPUSHER_API_URL': f"http://127.0.0.1:{servers['wxpusher'].server_port}/api/send/message",
+        'LOCAL_CACHE_PATH': local_cache_path,
+        'SPOOL_DIR': os.path.join(workdir, 'spool'),
+        'DIGEST_WINDOW_SECONDS': '0',
+        'WRITE_BEHIND': '',
+        'SHARED_CACHE_URL': '',
+        'NO_PROXY': '127.0.0.1',
+    })
+
+    results = []
+    try:
+        for scenario in filter(None, (item.strip() for item in args.scenarios.split(','))):
+            if scenario == 'cold':
+                state.files.clear()
+                reset_instance(local_cache_path)
+                results.append(run_scenario('cold-store', events, state))
+            elif scenario == 'warm':
+                run_scenario('prewarm', events, state)
+                results.append(run_scenario('warm-store', events, state))
+            elif scenario == 'burst':
+                if not state.files:
+                    run_scenario('prewarm', events, state)
+                reset_instance(local_cache_path)
+                results.append(run_scenario('burst', events, state, concurrency=args.concurrency))
+            elif scenario == 'shared':
+                if not state.files:
+                    run_scenario('prewarm', events, state)
+                servers['redis'].data.clear()
+                os.environ['SHARED_CACHE_URL'] = f"redis://127.0.0.1:{servers['redis'].server_port}/0"
+                try:
+                    # 另一个实例读取翻译文件并回填共享缓存，随后新实例只读共享缓存
+                    reset_instance(local_cache_path)
+                    run_scenario('prewarm', events, state)
+                    reset_instance(local_cache_path)
+                    results.append(run_scenario('shared', events, state, concurrency=args.concurrency))
+                finally:
+                    os.environ['SHARED_CACHE_URL'] = ''
+                    reset_instance(local_cache_path)
+            else:
+                print(f"未知场景: {scenario}", file=sys.stderr)
+                return 2
+    finally:
+        for server in servers.values():
+            server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    import_profile = profile_imports() if args.import_profile else None
+    store_sizes = [int(size) for size in args.store_sizes.split(',') if size.strip()]
+    store_results = benchmark_store_codecs(store_sizes) if store_sizes else None
+
+    if args.json:
+        output: Any = results
+        if import_profile is not None or store_results is not None:
+            output = {'scenarios': results}
+            if import_profile is not None:
+                output['imports'] = import_profile
+            if store_results is not None:
+                output['store'] = store_results
+        print(json.dumps(output, ensure_ascii=False, indent=2))
+    else:
+        print_report(results)
+        if import_profile is not None:
+            print()
+            print_import_profile(import_profile)
+        if store_results is not None:
+            print()
+            print_store_report(store_results)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
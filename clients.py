@@ -0,0 +1,95 @@
+import os
+import threading
+from typing import TYPE_CHECKING, Dict, Tuple
+
+if TYPE_CHECKING:
+    import requests
+    from aliyunsdkcore.client import AcsClient
+
+# 连接池默认配置：缓存的主机连接池数量，以及每个主机保持的连接数
+DEFAULT_POOL_CONNECTIONS = 4
+DEFAULT_POOL_MAXSIZE = 10
+
+# 阿里云机器翻译服务所在地域
+ALIYUN_REGION_ID = 'ap-northeast-1'
+
+# 模块级客户端，在函数实例热启动的多次调用间复用，避免每次请求重新建立TLS连接
+_http_session = None
+_acs_clients: Dict[Tuple[str, str, str], 'AcsClient'] = {}
+_lock = threading.Lock()
+
+def _get_int_env(name: str, default: int) -> int:
+    """读取整数类型的环境变量，无效时返回默认值。"""
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+def get_http_session() -> 'requests.Session':
+    """
+    获取共享的HTTP会话。
+
+    会话按主机维护连接池（HTTP_POOL_CONNECTIONS 个主机、每个主机 HTTP_POOL_MAXSIZE 个连接），
+    GitHub 和 WxPusher 的请求复用同一会话以保持长连接。
+
+    Returns:
+        requests.Session: 共享的HTTP会话。
+    """
+    global _http_session
+
+    if _http_session is None:
+        # 延迟导入，只有实际发起HTTP请求时才加载requests
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        with _lock:
+            if _http_session is None:
+                adapter = HTTPAdapter(
+                    pool_connections=_get_int_env('HTTP_POOL_CONNECTIONS', DEFAULT_POOL_CONNECTIONS),
+                    pool_maxsize=_get_int_env('HTTP_POOL_MAXSIZE', DEFAULT_POOL_MAXSIZE)
+                )
+                session = requests.Session()
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _http_session = session
+    return _http_session
+
+def get_acs_client(access_key_id: str, access_key_secret: str, region_id: str = ALIYUN_REGION_ID) -> 'AcsClient':
+    """
+    获取共享的阿里云客户端。
+
+    客户端按访问密钥和地域缓存，其内部会话在多次翻译请求间复用连接。
+
+    Args:
+        access_key_id (str): 阿里云访问密钥ID。
+        access_key_secret (str): 阿里云访问密钥。
+        region_id (str, optional): 地域ID，默认为'ap-northeast-1'。
+
+    Returns:
+        AcsClient: 共享的阿里云客户端。
+    """
+    key = (access_key_id, access_key_secret, region_id)
+    client = _acs_clients.get(key)
+    if client is None:
+        # 延迟导入，阿里云SDK只在需要调用翻译接口时加载
+        from aliyunsdkcore.client import AcsClient
+        from aliyunsdkcore.auth.credentials import AccessKeyCredential
+
+        with _lock:
+            client = _acs_clients.get(key)
+            if client is None:
+                credentials = AccessKeyCredential(access_key_id, access_key_secret)
+                # 重试由 resilience.call 按本次调用的剩余时间控制，关闭SDK自带的重试
+                client = AcsClient(region_id=region_id, credential=credentials, auto_retry=False)
+                _acs_clients[key] = client
+    return client
+
+def reset_clients() -> None:
+    """关闭并丢弃所有共享客户端，下一次使用时重新创建。"""
+    global _http_session
+
+    with _lock:
+        if _http_session is not None:
+            _http_session.close()
+            _http_session = None
+        _acs_clients.clear()
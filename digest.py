@@ -0,0 +1,252 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+import json_codec
+
+# 分组方式：按监控项、按分类或全局合并
+GROUP_BY_OPTIONS = ('monitor', 'category', 'global')
+DEFAULT_GROUP_BY = 'global'
+
+# 等待合并的事件保存在 SPOOL_DIR（各实例共享的持久存储）下的该文件中，
+# 任一实例的调用或 digest_handler 定时触发器都可以发送到期的窗口
+DIGEST_FILE_NAME = 'digests.sqlite3'
+
+# 进程内窗口：分组键 -> {'opened_at': 打开时间, 'events': 事件列表, 'timer': 超时定时器}。
+# 只在常驻服务器中使用（见 enable_memory_windows）：函数计算实例冻结后定时器不会触发，
+# 其他实例也看不到这些窗口，而事件已经以200返回，HetrixTools 不会重试
+_windows: Dict[str, Dict[str, Any]] = {}
+_memory_windows = False
+
+# 持久化窗口在当前实例中的超时定时器：分组键 -> threading.Timer
+_timers: Dict[str, threading.Timer] = {}
+
+_connection: Optional[sqlite3.Connection] = None
+_connection_path: Optional[str] = None
+_warned = False
+_lock = threading.Lock()
+
+def get_window_seconds() -> float:
+    """读取摘要窗口时长（环境变量 DIGEST_WINDOW_SECONDS，单位秒）。0表示不合并，逐条发送。"""
+    try:
+        return max(0.0, float(os.getenv('DIGEST_WINDOW_SECONDS', 0)))
+    except ValueError:
+        return 0.0
+
+def is_durable() -> bool:
+    """是否将等待合并的事件保存到持久存储（设置了 SPOOL_DIR）。"""
+    return bool(os.getenv('SPOOL_DIR', ''))
+
+def enable_memory_windows(enabled: bool = True) -> None:
+    """
+    允许在未设置 SPOOL_DIR 时使用进程内窗口。常驻服务器启动时调用，进程由后台线程定期发送到期摘要，
+    并在退出前发送所有窗口。
+    """
+    global _memory_windows
+
+    _memory_windows = enabled
+
+def is_enabled() -> bool:
+    """
+    是否启用通知合并：DIGEST_WINDOW_SECONDS 大于0，且设置了 SPOOL_DIR 或运行在常驻服务器中。
+    两者都不满足时打印一次警告，事件逐条发送。
+    """
+    global _warned
+
+    if get_window_seconds() <= 0:
+        return False
+    if is_durable() or _memory_windows:
+        return True
+    if not _warned:
+        _warned = True
+        print("DIGEST_WINDOW_SECONDS 需要设置 SPOOL_DIR（持久存储）或使用常驻服务器，通知合并未启用")
+    return False
+
+def _get_connection(create: bool = False) -> Optional[sqlite3.Connection]:
+    """
+    获取持久化窗口的SQLite连接。未设置 SPOOL_DIR 或打开失败时返回None。
+
+    Args:
+        create (bool): 文件不存在时是否创建。只读操作不创建文件，未使用通知合并时无需访问磁盘。
+    """
+    global _connection, _connection_path
+
+    directory = os.getenv('SPOOL_DIR', '')
+    if not directory:
+        return None
+    path = os.path.join(directory, DIGEST_FILE_NAME)
+    if _connection is not None and _connection_path == path:
+        return _connection
+    if not create and not os.path.exists(path):
+        return None
+
+    try:
+        os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(path, timeout=1.0, check_same_thread=False, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=FULL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS digest_items ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, group_key TEXT NOT NULL, item TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+    except (OSError, sqlite3.Error) as e:
+        print(f"摘要窗口存储不可用: {e}")
+        return None
+
+    if _connection is not None:
+        _connection.close()
+    _connection, _connection_path = connection, path
+    return _connection
+
+def _get_group_by() -> str:
+    """读取分组方式（环境变量 DIGEST_GROUP_BY）。"""
+    group_by = os.getenv('DIGEST_GROUP_BY', DEFAULT_GROUP_BY).lower()
+    return group_by if group_by in GROUP_BY_OPTIONS else DEFAULT_GROUP_BY
+
+def group_key(fields: Dict[str, Any]) -> str:
+    """
+    计算事件所属的分组键。
+
+    Args:
+        fields (Dict[str, Any]): 翻译后的字段字典。
+
+    Returns:
+        str: 分组键。
+    """
+    group_by = _get_group_by()
+    if group_by == 'monitor':
+        return f"monitor:{fields.get('monitor_id') or fields.get('monitor_name')}"
+    if group_by == 'category':
+        return f"category:{fields.get('monitor_category') or ''}"
+    return 'global'
+
+def _start_timer(window_seconds: float, on_timeout: Optional[Callable[[], Any]]) -> Optional[threading.Timer]:
+    """启动窗口到期的定时器。"""
+    if on_timeout is None:
+        return None
+    timer = threading.Timer(window_seconds, on_timeout)
+    timer.daemon = True
+    timer.start()
+    return timer
+
+def add(fields: Dict[str, Any], item: Any = None, on_timeout: Optional[Callable[[], Any]] = None) -> bool:
+    """
+    将事件加入所属分组的窗口，窗口不存在时打开新窗口。
+
+    设置了 SPOOL_DIR 时事件写入持久存储，写入成功后才返回；否则存入进程内窗口（仅限常驻服务器）。
+
+    Args:
+        fields (Dict[str, Any]): 用于计算分组键的字段字典。
+        item (Any, optional): 实际存入窗口的内容，默认为 fields 本身，持久存储时必须可以编码为JSON。
+        on_timeout (Callable, optional): 窗口到期时在后台线程中调用的函数，用于超时发送。
+
+    Returns:
+        bool: 是否已加入窗口。写入持久存储失败时返回False，调用方应直接发送。
+    """
+    key = group_key(fields)
+    item = fields if item is None else item
+    window_seconds = get_window_seconds()
+
+    if is_durable():
+        with _lock:
+            connection = _get_connection(create=True)
+            if connection is None:
+                return False
+            try:
+                connection.execute(
+                    "INSERT INTO digest_items (group_key, item, created_at) VALUES (?, ?, ?)",
+                    (key, json_codec.dumps(item), time.time())
+                )
+            except sqlite3.Error as e:
+                print(f"写入摘要窗口失败: {e}")
+                return False
+            if key not in _timers:
+                timer = _start_timer(window_seconds, on_timeout)
+                if timer is not None:
+                    _timers[key] = timer
+        return True
+
+    with _lock:
+        window = _windows.get(key)
+        if window is None:
+            window = {'opened_at': time.monotonic(), 'events': [], 'timer': _start_timer(window_seconds, on_timeout)}
+            _windows[key] = window
+        window['events'].append(item)
+    return True
+
+def _take_durable(now: float, window_seconds: float) -> List[tuple]:
+    """
+    在一个事务中取出并删除持久存储中已到期的窗口，多个实例同时发送时每个窗口只会被取出一次。
+
+    Returns:
+        List[tuple]: (打开时间, 事件列表)。
+    """
+    connection = _get_connection()
+    if connection is None:
+        return []
+    try:
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            rows = connection.execute(
+                "SELECT id, group_key, item, created_at FROM digest_items ORDER BY id"
+            ).fetchall()
+            groups: Dict[str, Dict[str, Any]] = {}
+            for row_id, key, item, created_at in rows:
+                group = groups.setdefault(key, {'opened_at': created_at, 'ids': [], 'events': []})
+                group['ids'].append((row_id,))
+                group['events'].append(json_codec.loads(item))
+            due = {key: group for key, group in groups.items() if now - group['opened_at'] >= window_seconds}
+            for group in due.values():
+                connection.executemany("DELETE FROM digest_items WHERE id = ?", group['ids'])
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+    except sqlite3.Error as e:
+        print(f"读取摘要窗口失败: {e}")
+        return []
+
+    for key in due:
+        timer = _timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+    return [(group['opened_at'], group['events']) for group in due.values()]
+
+def take_due(force: bool = False) -> List[List[Any]]:
+    """
+    取出已到期的窗口中的事件。
+
+    Args:
+        force (bool): 为True时取出所有进程内窗口，不论是否到期（进程退出前调用）。持久存储中的窗口
+            仍按到期时间取出，未到期的窗口由其他实例或定时触发器发送。
+
+    Returns:
+        List[List[Any]]: 每个到期窗口中存入的内容列表，按窗口打开时间排序。
+    """
+    window_seconds = get_window_seconds()
+    due = []
+    with _lock:
+        now = time.monotonic()
+        for key, window in list(_windows.items()):
+            if force or now - window['opened_at'] >= window_seconds:
+                del _windows[key]
+                if window['timer'] is not None:
+                    window['timer'].cancel()
+                due.append((time.time() - (now - window['opened_at']), window['events']))
+        if is_durable():
+            due.extend(_take_durable(time.time(), window_seconds))
+    due.sort(key=lambda window: window[0])
+    return [events for _, events in due]
+
+def pending_count() -> int:
+    """获取所有窗口（包括持久存储中其他实例加入的窗口）中等待发送的事件数。"""
+    with _lock:
+        count = sum(len(window['events']) for window in _windows.values())
+        connection = _get_connection() if is_durable() else None
+        if connection is not None:
+            try:
+                count += connection.execute("SELECT COUNT(*) FROM digest_items").fetchone()[0]
+            except sqlite3.Error as e:
+                print(f"读取摘要窗口失败: {e}")
+        return count
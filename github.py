@@ -1,8 +1,52 @@
+import atexit
+import hashlib
 import json
 import os
-import requests
+import random
+import threading
+import time
+import zlib
 import base64
-from typing import Dict, Any
+from clients import get_http_session
+import json_codec
+import metrics
+import resilience
+import scheduler
+import shared_cache
+from resilience import OutboundError
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+# GitHub API 地址，可通过环境变量指向 GitHub Enterprise 或本地测试服务
+GITHUB_API_URL = os.getenv('GITHUB_API_URL', 'https://api.github.com').rstrip('/')
+
+# translations.json 的进程内缓存，在函数实例热启动的多次调用间复用。
+# 键为 (仓库路径, 文件路径)，值包含解析后的数据、SHA、ETag 和获取时间。
+_json_cache: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+# 缓存有效期（秒），在有效期内直接使用缓存，过期后使用ETag向GitHub重新验证
+DEFAULT_CACHE_TTL = 300
+
+# 分片存储的默认目录，分片数量由环境变量 GITHUB_SHARDS 指定
+DEFAULT_SHARD_DIR = 'translations'
+
+# 写回缓冲区（write-behind）：跨调用累积新翻译，达到条数或时间阈值后合并为一次提交
+_pending_updates: Dict[str, Any] = {}
+_pending_since: Optional[float] = None
+
+# 常驻进程中多个线程共享写回缓冲区：_pending_lock 保护缓冲区，_flush_lock 保证同一时间只有一个线程提交
+_pending_lock = threading.Lock()
+_flush_lock = threading.Lock()
+
+# 提交冲突时的重试次数及退避时间（秒）
+DEFAULT_MAX_WRITE_RETRIES = 5
+WRITE_BACKOFF_BASE = 0.2
+WRITE_BACKOFF_CAP = 3.0
+
+# 写入统计：提交次数、内容未变化而跳过的提交次数、SHA冲突次数、重试次数和最终失败次数
+_write_stats = {'writes': 0, 'skipped': 0, 'conflicts': 0, 'retries': 0, 'failures': 0}
+
+DEFAULT_WRITE_BEHIND_MAX_ENTRIES = 20
+DEFAULT_WRITE_BEHIND_MAX_SECONDS = 60
 
 class GitHubError(Exception):
     """自定义异常类，用于GitHub相关的错误"""
@@ -10,6 +54,36 @@ class GitHubError(Exception):
         self.message = message
         super().__init__(self.message)
 
+class GitHubConflictError(GitHubError):
+    """文件SHA已过期（其他实例已提交新版本）时抛出的异常"""
+    pass
+
+def _request(method: str, url: str, **kwargs):
+    """
+    通过共享会话发起GitHub请求。
+
+    每次请求的超时时间受本次调用的剩余时间限制，连接错误、超时、5xx和429按退避重试，
+    连续失败时熔断，见 resilience.call。请求按令牌桶限速，并根据响应中的限流头调整速率，见 scheduler。
+
+    Raises:
+        requests.exceptions.RequestException: 如果重试用尽后请求仍然失败。
+        OutboundError: 如果剩余时间不足或GitHub处于熔断状态。
+    """
+    import requests
+
+    def send(timeout: float):
+        metrics.incr('github.requests')
+        response = get_http_session().request(method, url, timeout=timeout, **kwargs)
+        # 根据 X-RateLimit-* 和 Retry-After 调整后续请求的速率
+        scheduler.observe_headers('github', response.headers)
+        return response
+
+    return resilience.call(
+        'github', send,
+        retry_on=(requests.exceptions.ConnectionError, requests.exceptions.Timeout),
+        retry_if=resilience.is_retryable_response
+    )
+
 def get_github_file_content(repo_path, path, token):
     """
     获取GitHub仓库中指定文件的内容和SHA值。
@@ -25,20 +99,83 @@ def get_github_file_content(repo_path, path, token):
     Raises:
         GitHubError: 如果请求失败。
     """
+    content, sha, _, _ = get_github_file_content_conditional(repo_path, path, token)
+    return content, sha
+
+def get_github_file_content_conditional(repo_path, path, token, etag: Optional[str] = None):
+    """
+    使用 If-None-Match 条件请求获取GitHub仓库中指定文件的内容。
+
+    Args:
+        repo_path (str): 仓库路径，格式为owner/repo。
+        path (str): 文件路径。
+        token (str): GitHub访问令牌。
+        etag (str, optional): 上一次响应的ETag。文件未变化时GitHub返回304。
+
+    Returns:
+        tuple: (base64内容, SHA, ETag, 是否未修改)。文件不存在时返回(None, None, None, False)；
+            文件未修改时返回(None, None, etag, True)。
+
+    Raises:
+        GitHubError: 如果请求失败。
+    """
+    # 延迟导入，完全命中缓存的调用无需加载requests
+    import requests
+
+    owner, repo = repo_path.split('/')
+    url = f"{GITHUB_API_URL}/repos/{owner}/{repo}/contents/{path}"
+    headers = {
+        "Authorization": f"token {token}",
+        "Accept": "application/vnd.github.v3+json"
+    }
+    if etag:
+        headers["If-None-Match"] = etag
+    try:
+        response = _request('GET', url, headers=headers)
+        if response.status_code == 304:
+            metrics.incr('github.not_modified')
+            return None, None, etag, True
+        if response.status_code == 404:
+            return None, None, None, False
+        response.raise_for_status()
+        content = json_codec.loads(response.content)
+        file_content = content.get('content')
+        if content.get('encoding') == 'none' or (not file_content and content.get('size')):
+            # 超过1MB的文件不返回内联内容，改为通过Git Blob接口获取
+            file_content = get_github_blob(repo_path, content['sha'], token)
+        return file_content, content['sha'], response.headers.get('ETag'), False
+    except (requests.exceptions.RequestException, OutboundError) as e:
+        raise GitHubError(f"获取GitHub文件内容失败: {str(e)}")
+
+def get_github_blob(repo_path, sha, token):
+    """
+    通过Git Blob接口获取文件内容，用于Contents接口不返回内联内容的大文件。
+
+    Args:
+        repo_path (str): 仓库路径，格式为owner/repo。
+        sha (str): 文件的SHA值。
+        token (str): GitHub访问令牌。
+
+    Returns:
+        str: 文件内容的base64编码字符串。
+
+    Raises:
+        GitHubError: 如果请求失败。
+    """
+    # 延迟导入，完全命中缓存的调用无需加载requests
+    import requests
+
     owner, repo = repo_path.split('/')
-    url = f"https://api.github.com/repos/{owner}/{repo}/contents/{path}"
+    url = f"{GITHUB_API_URL}/repos/{owner}/{repo}/git/blobs/{sha}"
     headers = {
         "Authorization": f"token {token}",
         "Accept": "application/vnd.github.v3+json"
     }
-    response = requests.get(url, headers=headers)
-    if response.status_code == 404:
-        return None, None
     try:
+        response = _request('GET', url, headers=headers)
         response.raise_for_status()
-        content = response.json()
-        return content['content'], content['sha']
-    except requests.exceptions.RequestException as e:
+        return json_codec.loads(response.content)['content']
+    except (requests.exceptions.RequestException, OutboundError) as e:
         raise GitHubError(f"获取GitHub文件内容失败: {str(e)}")
 
 def update_github_file(repo_path, path, content, sha, token, commit_message):
@@ -57,13 +194,18 @@ def update_github_file(repo_path, path, content, sha, token, commit_message):
         dict: 更新文件后的响应JSON。
 
     Raises:
+        GitHubConflictError: 如果文件的SHA已过期。
         GitHubError: 如果请求失败。
     """
+    # 延迟导入，完全命中缓存的调用无需加载requests
+    import requests
+
     owner, repo = repo_path.split('/')
-    url = f"https://api.github.com/repos/{owner}/{repo}/contents/{path}"
+    url = f"{GITHUB_API_URL}/repos/{owner}/{repo}/contents/{path}"
     headers = {
         "Authorization": f"token {token}",
-        "Accept": "application/vnd.github.v3+json"
+        "Accept": "application/vnd.github.v3+json",
+        "Content-Type": "application/json"
     }
     data = {
         "message": commit_message,
@@ -71,10 +213,13 @@ def update_github_file(repo_path, path, content, sha, token, commit_message):
         "sha": sha
     }
     try:
-        response = requests.put(url, headers=headers, json=data)
+        response = _request('PUT', url, headers=headers, data=json_codec.dumps_bytes(data))
+        if response.status_code in (409, 422):
+            # SHA不匹配或文件已被其他实例创建
+            raise GitHubConflictError(f"更新GitHub文件失败: 文件已被修改 ({response.status_code})")
         response.raise_for_status()
         return response.json()
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, OutboundError) as e:
         raise GitHubError(f"更新GitHub文件失败: {str(e)}")
 
 def create_github_file(repo_path, path, content, token, commit_message):
@@ -92,124 +237,484 @@ def create_github_file(repo_path, path, content, token, commit_message):
         dict: 创建文件后的响应JSON。
 
     Raises:
+        GitHubConflictError: 如果文件已被其他实例创建。
         GitHubError: 如果请求失败。
     """
+    # 延迟导入，完全命中缓存的调用无需加载requests
+    import requests
+
     owner, repo = repo_path.split('/')
-    url = f"https://api.github.com/repos/{owner}/{repo}/contents/{path}"
+    url = f"{GITHUB_API_URL}/repos/{owner}/{repo}/contents/{path}"
     headers = {
         "Authorization": f"token {token}",
-        "Accept": "application/vnd.github.v3+json"
+        "Accept": "application/vnd.github.v3+json",
+        "Content-Type": "application/json"
     }
     data = {
         "message": commit_message,
         "content": content
     }
     try:
-        response = requests.put(url, headers=headers, json=data)
+        response = _request('PUT', url, headers=headers, data=json_codec.dumps_bytes(data))
+        if response.status_code in (409, 422):
+            # SHA不匹配或文件已被其他实例创建
+            raise GitHubConflictError(f"创建GitHub文件失败: 文件已被修改 ({response.status_code})")
         response.raise_for_status()
         return response.json()
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, OutboundError) as e:
         raise GitHubError(f"创建GitHub文件失败: {str(e)}")
 
-def open_github_json():
+def _get_cache_ttl() -> float:
+    """读取缓存有效期配置（环境变量 TRANSLATION_CACHE_TTL，单位秒）。"""
+    try:
+        return float(os.getenv('TRANSLATION_CACHE_TTL', DEFAULT_CACHE_TTL))
+    except ValueError:
+        return float(DEFAULT_CACHE_TTL)
+
+def _store_json_cache(repo_path: str, path: str, data: Dict[str, Any], sha: Optional[str], etag: Optional[str]) -> None:
+    """写入进程内缓存。"""
+    _json_cache[(repo_path, path)] = {
+        'data': data,
+        'sha': sha,
+        'etag': etag,
+        'fetched_at': time.monotonic()
+    }
+
+def _with_pending(data: Dict[str, Any]) -> Dict[str, Any]:
+    """返回数据副本，并叠加写回缓冲区中尚未提交的翻译。"""
+    merged = dict(data)
+    with _pending_lock:
+        merged.update(_pending_updates)
+    return merged
+
+def invalidate_json_cache() -> None:
+    """清空进程内缓存，下一次读取将重新从GitHub获取。"""
+    _json_cache.clear()
+
+def _get_github_config() -> Tuple[str, str, str]:
     """
-    打开GitHub仓库中的JSON文件，并返回文件内容。
+    从环境变量中获取GitHub相关信息。
 
     Returns:
-        dict: JSON文件内容。如果文件不存在或内容不是有效的JSON，则返回空字典。
+        tuple: (访问令牌, 仓库路径, 文件路径)。
 
     Raises:
-        GitHubError: 如果请求失败或环境变量未设置。
+        GitHubError: 如果环境变量未设置。
+    """
+    github_token = os.getenv('GITHUB_TOKEN')
+    github_repo_path = os.getenv('GITHUB_REPO')
+    github_file = os.getenv('GITHUB_FILE', 'translations.json')
+
+    if not github_token or not github_repo_path or not github_file:
+        raise GitHubError("GitHub相关信息未设置，请检查环境变量。")
+
+    return github_token, github_repo_path, github_file
+
+def _get_shard_config() -> Tuple[int, str]:
+    """
+    读取分片存储配置。
+
+    Returns:
+        tuple: (分片数量, 分片目录)。分片数量小于等于1时使用单文件存储。
     """
     try:
-        # 从环境变量中获取GitHub相关信息
-        github_token = os.getenv('GITHUB_TOKEN')
-        github_repo_path = os.getenv('GITHUB_REPO')
-        github_file = os.getenv('GITHUB_FILE', 'translations.json')
+        shards = int(os.getenv('GITHUB_SHARDS', 0))
+    except ValueError:
+        shards = 0
+    return shards, os.getenv('GITHUB_SHARD_DIR', DEFAULT_SHARD_DIR).strip('/')
+
+def shard_path(key: str, shards: int, shard_dir: str = DEFAULT_SHARD_DIR) -> str:
+    """
+    计算翻译条目所在的分片文件路径。
 
-        if not github_token or not github_repo_path or not github_file:
-            raise GitHubError("GitHub相关信息未设置，请检查环境变量。")
+    使用CRC32哈希，结果在不同进程和Python版本间保持稳定。
 
-        # 获取当前的JSON文件内容
-        file_content_base64, _ = get_github_file_content(github_repo_path, github_file, github_token)
+    Args:
+        key (str): 翻译条目的原文。
+        shards (int): 分片数量。
+        shard_dir (str): 分片目录。
+
+    Returns:
+        str: 分片文件路径，例如 translations/shard-007.json。
+    """
+    index = zlib.crc32(key.encode('utf-8')) % shards
+    return f"{shard_dir}/shard-{index:03d}.json"
+
+def _group_by_shard(data: Dict[str, Any], shards: int, shard_dir: str) -> Dict[str, Dict[str, Any]]:
+    """将翻译条目按分片文件路径分组。"""
+    groups: Dict[str, Dict[str, Any]] = {}
+    for key, value in data.items():
+        groups.setdefault(shard_path(key, shards, shard_dir), {})[key] = value
+    return groups
+
+def _open_json_path(repo_path: str, path: str, token: str, use_cache: bool = True) -> Dict[str, Any]:
+    """
+    读取GitHub仓库中的单个JSON文件，使用进程内缓存和ETag重新验证。
+
+    Returns:
+        dict: 缓存中的JSON文件内容（调用方不应修改）。文件不存在或内容无效时为空字典。
+
+    Raises:
+        GitHubError: 如果请求失败。
+    """
+    cached = _json_cache.get((repo_path, path)) if use_cache else None
+    if cached is not None and time.monotonic() - cached['fetched_at'] < _get_cache_ttl():
+        return cached['data']
 
-        if file_content_base64 is None:
-            # 文件不存在，返回空字典
-            return {}
+    # 获取当前的JSON文件内容，缓存过期时使用ETag重新验证
+    file_content_base64, file_sha, etag, not_modified = get_github_file_content_conditional(
+        repo_path, path, token, cached['etag'] if cached else None)
 
+    if not_modified:
+        cached['fetched_at'] = time.monotonic()
+        return cached['data']
+
+    if file_content_base64 is None:
+        # 文件不存在，返回空字典
+        file_content = {}
+    else:
         try:
             # 尝试解析文件内容为JSON
-            file_content = json.loads(base64.b64decode(file_content_base64).decode('utf-8'))
-            return file_content
+            file_content = json_codec.loads(base64.b64decode(file_content_base64))
         except json.JSONDecodeError:
             # 文件内容不是有效的JSON，返回空字典
-            return {}
+            file_content = {}
+
+    _store_json_cache(repo_path, path, file_content, file_sha, etag)
+    return file_content
+
+def open_github_json(use_cache: bool = True):
+    """
+    打开GitHub仓库中的JSON文件，并返回文件内容。
+
+    结果缓存在进程内，在有效期（TRANSLATION_CACHE_TTL）内的调用不访问GitHub；
+    过期后携带ETag进行条件请求，文件未变化时GitHub返回304，直接复用缓存。
+    启用分片存储（GITHUB_SHARDS）时返回所有分片合并后的内容。
+
+    Args:
+        use_cache (bool): 是否使用进程内缓存，默认为True。
+
+    Returns:
+        dict: JSON文件内容的副本（包含写回缓冲区中尚未提交的翻译）。如果文件不存在或内容不是有效的JSON，则返回空字典。
+
+    Raises:
+        GitHubError: 如果请求失败或环境变量未设置。
+    """
+    try:
+        github_token, github_repo_path, github_file = _get_github_config()
+        shards, shard_dir = _get_shard_config()
+
+        if shards <= 1:
+            return _with_pending(_open_json_path(github_repo_path, github_file, github_token, use_cache))
+
+        merged: Dict[str, Any] = {}
+        for index in range(shards):
+            merged.update(_open_json_path(github_repo_path, f"{shard_dir}/shard-{index:03d}.json", github_token, use_cache))
+        return _with_pending(merged)
     except GitHubError as e:
         raise GitHubError(f"打开GitHub文件时出错: {e.message}")
 
-def update_json_file(data):
+def open_translations(keys: Iterable[str], use_cache: bool = True) -> Dict[str, Any]:
     """
-    更新GitHub仓库中的JSON文件内容。
+    读取包含指定条目的翻译数据。
+
+    单文件存储时返回整个文件内容；分片存储时只读取这些条目所在的分片。
 
     Args:
-        data (dict): 要更新到JSON文件中的数据。
+        keys (Iterable[str]): 需要查找的原文。
+        use_cache (bool): 是否使用进程内缓存，默认为True。
 
     Returns:
-        dict: 更新操作的响应结果。包含状态码和消息。
+        dict: 至少覆盖指定条目的翻译数据副本（包含写回缓冲区中尚未提交的翻译）。
 
     Raises:
         GitHubError: 如果请求失败或环境变量未设置。
     """
+    shards, shard_dir = _get_shard_config()
+    if shards <= 1:
+        return open_github_json(use_cache)
+
     try:
-        # 从环境变量中获取GitHub相关信息
-        github_token = os.getenv('GITHUB_TOKEN')
-        github_repo_path = os.getenv('GITHUB_REPO')
-        github_file = os.getenv('GITHUB_FILE', 'translations.json')
-        commit_message = os.getenv('COMMIT_MESSAGE', 'Update JSON file')
+        github_token, github_repo_path, _ = _get_github_config()
+        merged: Dict[str, Any] = {}
+        for path in sorted({shard_path(key, shards, shard_dir) for key in keys}):
+            merged.update(_open_json_path(github_repo_path, path, github_token, use_cache))
+        return _with_pending(merged)
+    except GitHubError as e:
+        raise GitHubError(f"打开GitHub文件时出错: {e.message}")
+
+def _fetch_json_for_update(repo_path: str, path: str, token: str) -> Tuple[Dict[str, Any], Optional[str], Optional[str]]:
+    """
+    获取最新的JSON文件内容用于合并写入。
+
+    Returns:
+        tuple: (文件内容, 文件SHA, 需要使用的提交信息)。文件不存在时SHA为None。
+    """
+    file_content_base64, file_sha = get_github_file_content(repo_path, path, token)
+    if file_content_base64 is None:
+        # 文件不存在，创建一个新的JSON文件
+        return {}, None, "Create JSON file"
+    try:
+        # 尝试解析文件内容为JSON
+        return json_codec.loads(base64.b64decode(file_content_base64)), file_sha, None
+    except json.JSONDecodeError:
+        # 文件内容不是有效的JSON，清空文件内容
+        return {}, file_sha, "Fix invalid JSON file"
 
-        if not github_token or not github_repo_path or not github_file:
-            raise GitHubError("GitHub相关信息未设置，请检查环境变量。")
+def _get_max_write_retries() -> int:
+    """读取提交冲突时的最大重试次数（环境变量 GITHUB_MAX_RETRIES）。"""
+    try:
+        return max(0, int(os.getenv('GITHUB_MAX_RETRIES', DEFAULT_MAX_WRITE_RETRIES)))
+    except ValueError:
+        return DEFAULT_MAX_WRITE_RETRIES
 
-        # 获取当前的JSON文件内容
-        file_content_base64, file_sha = get_github_file_content(github_repo_path, github_file, github_token)
+def get_write_stats() -> Dict[str, int]:
+    """
+    获取写入统计信息。
 
-        if file_content_base64 is None:
-            # 文件不存在，创建一个新的JSON文件
-            file_content = {}
-            file_sha = None
-            commit_message = "Create JSON file"
-        else:
-            try:
-                # 尝试解析文件内容为JSON
-                file_content = json.loads(base64.b64decode(file_content_base64).decode('utf-8'))
-            except json.JSONDecodeError:
-                # 文件内容不是有效的JSON，清空文件内容
-                file_content = {}
-                commit_message = "Fix invalid JSON file"
-
-        # 更新JSON内容
+    Returns:
+        Dict[str, int]: 提交次数(writes)、内容未变化而跳过的提交次数(skipped)、SHA冲突次数(conflicts)、
+            重试次数(retries)和最终失败次数(failures)。
+    """
+    return dict(_write_stats)
+
+def blob_sha(content: bytes) -> str:
+    """按Git Blob的方式计算内容的SHA，与GitHub返回的文件SHA一致。"""
+    return hashlib.sha1(b'blob %d\0' % len(content) + content).hexdigest()
+
+def _skip_write(file_sha: str) -> Dict[str, Any]:
+    """内容与仓库中的文件相同，跳过提交。"""
+    _write_stats['skipped'] += 1
+    metrics.incr('github.skipped_writes')
+    return {'content': {'sha': file_sha}}
+
+def _update_json_path(repo_path: str, path: str, token: str, data: Dict[str, Any], default_commit_message: str) -> None:
+    """
+    将条目合并写入GitHub仓库中的单个JSON文件，SHA冲突时重新获取并重试。
+    合并后的内容与文件相同（Git Blob SHA一致）时跳过提交。
+
+    Raises:
+        GitHubError: 如果请求失败或重试次数用尽。
+    """
+    # 首次尝试使用缓存中的内容和SHA，省去一次GET请求
+    cached = _json_cache.get((repo_path, path))
+    if cached is not None and cached['sha'] is not None:
+        file_content, file_sha, commit_message = dict(cached['data']), cached['sha'], None
+    else:
+        file_content, file_sha, commit_message = _fetch_json_for_update(repo_path, path, token)
+
+    max_retries = _get_max_write_retries()
+    attempt = 0
+    while True:
+        # 新条目均已存在时无需编码和提交
+        if file_sha is not None and all(key in file_content and file_content[key] == value for key, value in data.items()):
+            result = _skip_write(file_sha)
+            break
+
+        # 将新条目合并到最新内容中，按键排序编码，相同内容的编码结果相同
         file_content.update(data)
+        encoded = json_codec.encode_store(file_content)
+        if file_sha is not None and blob_sha(encoded) == file_sha:
+            result = _skip_write(file_sha)
+            break
+        new_file_content_base64 = base64.b64encode(encoded).decode('ascii')
+
+        try:
+            if file_sha is None:
+                # 创建新文件
+                result = create_github_file(repo_path, path, new_file_content_base64, token, commit_message or default_commit_message)
+            else:
+                # 更新现有文件
+                result = update_github_file(repo_path, path, new_file_content_base64, file_sha, token, commit_message or default_commit_message)
+            _write_stats['writes'] += 1
+            metrics.incr('github.writes')
+            break
+        except GitHubConflictError:
+            _write_stats['conflicts'] += 1
+            metrics.incr('github.conflicts')
+            if attempt >= max_retries:
+                raise GitHubError(f"更新GitHub文件失败: 连续{attempt + 1}次SHA冲突")
+            # 带抖动的指数退避，避免并发实例同时重试
+            time.sleep(random.uniform(0, min(WRITE_BACKOFF_CAP, WRITE_BACKOFF_BASE * (2 ** attempt))))
+            attempt += 1
+            _write_stats['retries'] += 1
+            metrics.incr('github.retries')
+            file_content, file_sha, commit_message = _fetch_json_for_update(repo_path, path, token)
+
+    # 用写入后的内容刷新进程内缓存，新的ETag未知，下一次重新验证时完整获取；
+    # 跳过提交且缓存仍对应该SHA时保留缓存的ETag
+    new_sha = (result.get('content') or {}).get('sha') if isinstance(result, dict) else None
+    etag = cached['etag'] if cached is not None and cached['sha'] == new_sha else None
+    _store_json_cache(repo_path, path, file_content, new_sha, etag)
+
+def update_json_file(data):
+    """
+    更新GitHub仓库中的JSON文件内容。
+
+    使用乐观并发控制：优先基于进程内缓存中的内容和SHA直接提交；若其他实例已提交新版本
+    导致SHA冲突（409/422），则重新获取最新内容，将新条目合并后以带抖动的指数退避重试，
+    最多重试 GITHUB_MAX_RETRIES 次。启用分片存储时只读写条目所在的分片文件。
+
+    Args:
+        data (dict): 要更新到JSON文件中的数据。
+
+    Returns:
+        dict: 更新操作的响应结果。包含状态码和消息。
 
-        # 将更新后的内容编码为base64
-        new_file_content_base64 = base64.b64encode(json.dumps(file_content).encode('utf-8')).decode('utf-8')
+    Raises:
+        GitHubError: 如果请求失败或环境变量未设置。
+    """
+    try:
+        github_token, github_repo_path, github_file = _get_github_config()
+        commit_message = os.getenv('COMMIT_MESSAGE', 'Update JSON file')
+        shards, shard_dir = _get_shard_config()
 
-        if file_sha is None:
-            # 创建新文件
-            create_github_file(github_repo_path, github_file, new_file_content_base64, github_token, commit_message)
+        if shards <= 1:
+            _update_json_path(github_repo_path, github_file, github_token, data, commit_message)
         else:
-            # 更新现有文件
-            update_github_file(github_repo_path, github_file, new_file_content_base64, file_sha, github_token, commit_message)
+            for path, shard_data in sorted(_group_by_shard(data, shards, shard_dir).items()):
+                _update_json_path(github_repo_path, path, github_token, shard_data, commit_message)
 
         return {
             'statusCode': 200,
-            'body': json.dumps({
+            'body': json_codec.dumps({
                 'message': 'JSON file updated successfully'
             })
         }
     except GitHubError as e:
+        _write_stats['failures'] += 1
+        metrics.incr('github.failures')
         return {
             'statusCode': 500,
-            'body': json.dumps({
+            'body': json_codec.dumps({
                 'error': e.message
             })
-        }
\ No newline at end of file
+        }
+
+def migrate_to_shards(shards: int, shard_dir: str = DEFAULT_SHARD_DIR, dry_run: bool = False) -> Dict[str, int]:
+    """
+    将单文件存储（GITHUB_FILE）中的翻译迁移到分片存储。
+
+    已存在的分片文件会与迁移的条目合并，原文件保持不变，可在确认后手动删除。
+
+    Args:
+        shards (int): 分片数量，必须大于1。
+        shard_dir (str): 分片目录。
+        dry_run (bool): 为True时只计算每个分片的条目数，不写入GitHub。
+
+    Returns:
+        Dict[str, int]: 每个分片文件路径对应的条目数。
+
+    Raises:
+        GitHubError: 如果请求失败、环境变量未设置或分片数量无效。
+    """
+    if shards <= 1:
+        raise GitHubError("分片数量必须大于1。")
+
+    github_token, github_repo_path, github_file = _get_github_config()
+    source = _open_json_path(github_repo_path, github_file, github_token, use_cache=False)
+    groups = _group_by_shard(source, shards, shard_dir.strip('/'))
+
+    if not dry_run:
+        commit_message = f"Migrate {github_file} to {shards} shards"
+        for path, shard_data in sorted(groups.items()):
+            _update_json_path(github_repo_path, path, github_token, shard_data, commit_message)
+
+    return {path: len(shard_data) for path, shard_data in sorted(groups.items())}
+
+def _write_behind_enabled() -> bool:
+    """
+    是否启用写回缓冲区（环境变量 WRITE_BEHIND）。
+
+    未设置 WRITE_BEHIND 时，配置了共享缓存（SHARED_CACHE_URL）即启用：新翻译写入共享缓存后
+    其他实例立即可读，GitHub只作为持久备份，按阈值合并提交。
+    """
+    value = os.getenv('WRITE_BEHIND', '')
+    if not value:
+        return shared_cache.is_enabled()
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+def _get_write_behind_limits() -> Tuple[int, float]:
+    """读取写回缓冲区的条数阈值和时间阈值。"""
+    try:
+        max_entries = int(os.getenv('WRITE_BEHIND_MAX_ENTRIES', DEFAULT_WRITE_BEHIND_MAX_ENTRIES))
+    except ValueError:
+        max_entries = DEFAULT_WRITE_BEHIND_MAX_ENTRIES
+    try:
+        max_seconds = float(os.getenv('WRITE_BEHIND_MAX_SECONDS', DEFAULT_WRITE_BEHIND_MAX_SECONDS))
+    except ValueError:
+        max_seconds = float(DEFAULT_WRITE_BEHIND_MAX_SECONDS)
+    return max_entries, max_seconds
+
+def flush_json_updates(force: bool = False) -> Dict[str, Any]:
+    """
+    将写回缓冲区中的翻译合并为一次提交写入GitHub。
+
+    Args:
+        force (bool): 为True时忽略阈值立即提交；否则仅在达到条数或时间阈值时提交。
+
+    Returns:
+        dict: 更新操作的响应结果。包含状态码和消息。提交失败时缓冲区保留，等待下次重试。
+    """
+    global _pending_since
+
+    with _flush_lock:
+        with _pending_lock:
+            if not _pending_updates:
+                return {
+                    'statusCode': 200,
+                    'body': json_codec.dumps({'message': 'No pending updates'})
+                }
+
+            if not force and _write_behind_enabled():
+                max_entries, max_seconds = _get_write_behind_limits()
+                age = time.monotonic() - (_pending_since or time.monotonic())
+                if len(_pending_updates) < max_entries and age < max_seconds:
+                    return {
+                        'statusCode': 200,
+                        'body': json_codec.dumps({'message': 'Updates queued', 'pending': len(_pending_updates)})
+                    }
+
+            batch = dict(_pending_updates)
+
+        response = update_json_file(batch)
+        if response['statusCode'] == 200:
+            with _pending_lock:
+                for key, value in batch.items():
+                    # 提交期间其他线程更新的条目保留在缓冲区中
+                    if _pending_updates.get(key) == value:
+                        del _pending_updates[key]
+                _pending_since = time.monotonic() if _pending_updates else None
+        return response
+
+def queue_json_update(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    将新翻译加入写回缓冲区，并按配置决定是否立即提交。
+
+    未启用写回缓冲区（WRITE_BEHIND，配置共享缓存时默认启用）时立即合并为一次提交；启用后在累积达到
+    WRITE_BEHIND_MAX_ENTRIES 条或最早的条目超过 WRITE_BEHIND_MAX_SECONDS 秒时提交。
+    传入空字典时仅检查阈值，可用于在没有新翻译的调用中推进提交。
+
+    Args:
+        data (dict): 新增的翻译条目。
+
+    Returns:
+        dict: 更新操作的响应结果。包含状态码和消息。
+    """
+    global _pending_since
+
+    if data:
+        with _pending_lock:
+            if not _pending_updates:
+                _pending_since = time.monotonic()
+            _pending_updates.update(data)
+    return flush_json_updates()
+
+def _flush_at_exit():
+    """进程退出时尽力提交写回缓冲区中的翻译。"""
+    try:
+        flush_json_updates(force=True)
+    except Exception:
+        pass
+
+atexit.register(_flush_at_exit)
@@ -0,0 +1,206 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import metrics
+
+# 进程内缓存的最大条目数及有效期（秒）
+DEFAULT_CACHE_SIZE = 1024
+DEFAULT_TTL = 3600
+
+# 同一事件正在处理时，重复事件等待处理结果的最长时间（秒）
+DEFAULT_WAIT_SECONDS = 10.0
+
+# 进程内LRU缓存：幂等键 -> (处理结果, 写入时间)
+_results: 'OrderedDict[str, tuple]' = OrderedDict()
+
+# 正在处理的事件：幂等键 -> 处理完成时触发的 threading.Event
+_inflight: Dict[str, threading.Event] = {}
+
+# 可选的容器本地持久化缓存（IDEMPOTENCY_PATH），进程重启后仍可识别重复事件
+_connection: Optional[sqlite3.Connection] = None
+_connection_path: Optional[str] = None
+_lock = threading.Lock()
+
+def _get_float_env(name: str, default: float) -> float:
+    """读取浮点类型的环境变量，无效时返回默认值。"""
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+def event_key(parsed_body: Dict[str, Any]) -> Optional[str]:
+    """
+    根据 (monitor_id, monitor_status, timestamp) 计算事件的幂等键。
+
+    Args:
+        parsed_body (Dict[str, Any]): 解析后的Webhook内容。
+
+    Returns:
+        Optional[str]: 幂等键。缺少监控项或时间戳时返回None，此类事件不做去重。
+    """
+    monitor = parsed_body.get('monitor_id') or parsed_body.get('monitor_name')
+    timestamp = parsed_body.get('timestamp')
+    if monitor is None or timestamp is None:
+        return None
+    return json.dumps([str(monitor), parsed_body.get('monitor_status'), timestamp], ensure_ascii=False)
+
+def _get_connection() -> Optional[sqlite3.Connection]:
+    """获取持久化缓存的SQLite连接。未设置 IDEMPOTENCY_PATH 或打开失败时返回None。"""
+    global _connection, _connection_path
+
+    path = os.getenv('IDEMPOTENCY_PATH', '')
+    if not path:
+        return None
+    if _connection is not None and _connection_path == path:
+        return _connection
+
+    try:
+        connection = sqlite3.connect(path, timeout=1.0, check_same_thread=False, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS idempotency ("
+            "key TEXT PRIMARY KEY, result TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+    except sqlite3.Error as e:
+        print(f"幂等缓存不可用: {e}")
+        return None
+
+    if _connection is not None:
+        _connection.close()
+    _connection, _connection_path = connection, path
+    return _connection
+
+def _get_locked(key: str, now: float) -> Optional[Dict[str, Any]]:
+    """在持有锁时依次查找进程内缓存和持久化缓存。"""
+    ttl = _get_float_env('IDEMPOTENCY_TTL', DEFAULT_TTL)
+    entry = _results.get(key)
+    if entry is not None:
+        if now - entry[1] < ttl:
+            _results.move_to_end(key)
+            return entry[0]
+        del _results[key]
+
+    connection = _get_connection()
+    if connection is None:
+        return None
+    try:
+        row = connection.execute(
+            "SELECT result, created_at FROM idempotency WHERE key = ?", (key,)
+        ).fetchone()
+    except sqlite3.Error as e:
+        print(f"读取幂等缓存失败: {e}")
+        return None
+    if row is None or now - row[1] >= ttl:
+        return None
+    result = json.loads(row[0])
+    _remember(key, result, row[1])
+    return result
+
+def _remember(key: str, result: Dict[str, Any], created_at: float) -> None:
+    """写入进程内缓存，超过 IDEMPOTENCY_CACHE_SIZE 时淘汰最久未使用的条目。"""
+    _results[key] = (result, created_at)
+    _results.move_to_end(key)
+    max_size = int(_get_float_env('IDEMPOTENCY_CACHE_SIZE', DEFAULT_CACHE_SIZE))
+    while len(_results) > max(1, max_size):
+        _results.popitem(last=False)
+
+def get(key: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    获取已处理事件的结果。
+
+    Args:
+        key (str): 幂等键，为None时直接返回None。
+
+    Returns:
+        Optional[Dict[str, Any]]: 首次处理时的响应结果，未处理过或已过期时返回None。
+    """
+    if key is None:
+        return None
+    with _lock:
+        return _get_locked(key, time.time())
+
+def acquire(key: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    开始处理事件。事件已处理过时返回首次处理的结果；同一事件正在其他线程中处理时，
+    等待其完成（最多 IDEMPOTENCY_WAIT_SECONDS 秒）后返回其结果。
+
+    返回None时调用方负责处理该事件，并且必须在处理结束后调用 release。
+
+    Args:
+        key (str): 幂等键，为None时不做去重，直接返回None。
+
+    Returns:
+        Optional[Dict[str, Any]]: 首次处理的响应结果；需要由调用方处理时返回None。
+    """
+    if key is None:
+        return None
+
+    deadline = time.monotonic() + _get_float_env('IDEMPOTENCY_WAIT_SECONDS', DEFAULT_WAIT_SECONDS)
+    while True:
+        with _lock:
+            result = _get_locked(key, time.time())
+            if result is not None:
+                metrics.incr('idempotency.hits')
+                return result
+            event = _inflight.get(key)
+            if event is None:
+                _inflight[key] = threading.Event()
+                metrics.incr('idempotency.misses')
+                return None
+
+        # 等待正在处理的同一事件；超时或首次处理失败时由当前调用重新处理
+        if not event.wait(max(0.0, deadline - time.monotonic())):
+            metrics.incr('idempotency.wait_timeouts')
+            with _lock:
+                if _inflight.get(key) is event:
+                    _inflight[key] = threading.Event()
+                    return None
+
+def release(key: Optional[str], result: Optional[Dict[str, Any]]) -> None:
+    """
+    结束事件处理。结果为成功（2xx）时记录下来，重复的事件将直接返回该结果；
+    失败时不记录，HetrixTools 重试时会重新处理。
+
+    Args:
+        key (str): 幂等键，为None时不做任何处理。
+        result (Dict[str, Any], optional): 响应结果，处理过程中发生异常时为None。
+    """
+    if key is None:
+        return
+
+    now = time.time()
+    succeeded = isinstance(result, dict) and 200 <= result.get('statusCode', 500) < 300
+    with _lock:
+        if succeeded:
+            _remember(key, result, now)
+            connection = _get_connection()
+            if connection is not None:
+                try:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO idempotency (key, result, created_at) VALUES (?, ?, ?)",
+                        (key, json.dumps(result, ensure_ascii=False), now)
+                    )
+                    connection.execute(
+                        "DELETE FROM idempotency WHERE created_at < ?",
+                        (now - _get_float_env('IDEMPOTENCY_TTL', DEFAULT_TTL),)
+                    )
+                except sqlite3.Error as e:
+                    print(f"写入幂等缓存失败: {e}")
+        event = _inflight.pop(key, None)
+    if event is not None:
+        event.set()
+
+def clear() -> None:
+    """清空进程内缓存并关闭SQLite连接（不删除缓存文件）。"""
+    global _connection, _connection_path
+
+    with _lock:
+        _results.clear()
+        if _connection is not None:
+            _connection.close()
+        _connection, _connection_path = None, None
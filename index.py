@@ -1,12 +1,53 @@
 import os
-import pytz
+import atexit
 import json
 import base64
-from datetime import datetime
-from typing import Dict, Any
-from github import update_json_file, open_github_json, GitHubError
-from translation import translate_text, TranslationError
-from message import send_message, WxPusherError
+import contextvars
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Callable, List, Optional, Tuple
+import digest
+import idempotency
+import local_cache
+import json_codec
+import metrics
+import negative_cache
+import resilience
+import shared_cache
+import spool
+import translation_memory
+from github import queue_json_update, open_translations, GitHubError
+from translation import translate_batch, TranslationError, PartialTranslationError
+from message import send_message, get_recipients, WxPusherError, UID
+
+# 需要翻译的字段
+TRANSLATABLE_FIELDS = ["monitor_name", "monitor_type", "monitor_category", "monitor_status"]
+
+# HetrixTools 事件的原文语言，以及默认的目标语言
+SOURCE_LANGUAGE = 'en'
+DEFAULT_TARGET_LANGUAGE = 'zh'
+
+# 消息中使用的本地时区（假设为上海时区）。上海自1991年起不再实行夏令时，
+# 固定的UTC+8偏移与 Asia/Shanghai 一致，无需加载时区数据库
+LOCAL_TZ = timezone(timedelta(hours=8), 'Asia/Shanghai')
+
+# 各语言消息使用的标签，未列出的语言使用英文标签
+MESSAGE_LABELS = {
+    'zh': {
+        'name': "业务名称", 'time': "时间", 'category': "分类", 'status': "状态",
+        'source': "点击访问来源", 'digest': "共 {count} 条状态变化", 'digest_summary': "{count}条监控状态变化",
+    },
+    'en': {
+        'name': "Monitor", 'time': "Time", 'category': "Category", 'status': "Status",
+        'source': "View on HetrixTools", 'digest': "{count} status changes", 'digest_summary': "{count} monitor status changes",
+    },
+    'ja': {
+        'name': "監視名", 'time': "時間", 'category': "カテゴリ", 'status': "ステータス",
+        'source': "HetrixToolsで表示", 'digest': "{count} 件の状態変化", 'digest_summary': "{count}件の監視状態変化",
+    },
+}
+
+# 消息结尾的来源链接
+MESSAGE_CLOSING = "\n\n## [{source}](https://hetrixtools.com)\n\n![logo](https://hetrixtools.com/img/ht_logo.png)"
 
 def generate_error_response(message: str, status_code: int = 500) -> Dict[str, Any]:
     """
@@ -21,9 +62,40 @@ def generate_error_response(message: str, status_code: int = 500) -> Dict[str, A
     """
     return {
         "statusCode": status_code,
-        "body": json.dumps({"error": message})
+        "body": json_codec.dumps({"error": message})
     }
 
+def _decode_event_body(event: str) -> str:
+    """
+    从事件字符串中取出body，必要时进行Base64解码。
+
+    Raises:
+        ValueError: 如果事件缺少 'body' 字段或 body 内容为空。
+        Exception: 如果 Base64 解码失败。
+        json.JSONDecodeError: 如果事件本身不是有效的JSON。
+    """
+    # 将事件字符串解析为字典
+    event_dict = json_codec.loads(event)
+    
+    # 检查事件中是否包含 'body' 字段
+    if "body" not in event_dict:
+        raise ValueError("事件缺少'body'")
+    
+    body = event_dict['body']
+    
+    # 检查 body 是否为空
+    if not body:
+        raise ValueError("body 内容为空")
+    
+    try:
+        # 如果事件内容是Base64编码，则解码
+        if 'isBase64Encoded' in event_dict and event_dict['isBase64Encoded']:
+            body = base64.b64decode(body).decode("utf-8")
+    except Exception as e:
+        raise Exception(f"Base64 解码失败: {e}")
+
+    return body
+
 def parse_event(event: str) -> Dict[str, Any]:
     """
     解析传入的事件字符串为字典格式。
@@ -40,90 +112,533 @@ def parse_event(event: str) -> Dict[str, Any]:
         json.JSONDecodeError: 如果 JSON 解析失败。
     """
     try:
-        # 将事件字符串解析为字典
-        event_dict = json.loads(event)
-        
-        # 检查事件中是否包含 'body' 字段
-        if "body" not in event_dict:
-            raise ValueError("事件缺少'body'")
-        
-        body = event_dict['body']
-        
-        # 检查 body 是否为空
-        if not body:
-            raise ValueError("body 内容为空")
-        
-        try:
-            # 如果事件内容是Base64编码，则解码
-            if 'isBase64Encoded' in event_dict and event_dict['isBase64Encoded']:
-                body = base64.b64decode(body).decode("utf-8")
-        except Exception as e:
-            raise Exception(f"Base64 解码失败: {e}")
+        body = _decode_event_body(event)
         
         try:
             # 将解码后的body解析为字典
-            body_dict = json.loads(body)
+            body_dict = json_codec.loads(body)
             return body_dict
         except json.JSONDecodeError as e:
             raise json.JSONDecodeError(f"JSON 解析失败: {e}", e.doc, e.pos)
     except json.JSONDecodeError:
         raise json.JSONDecodeError("JSON 无效", event, 0)
 
-def translate_fields(required_fields: Dict[str, Any]) -> Dict[str, Any]:
+def parse_events(event: str) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    解析传入的事件字符串，body 可以是单个JSON对象、JSON数组或每行一个JSON对象（NDJSON）。
+
+    Args:
+        event (str): 事件字符串，通常是JSON格式。
+
+    Returns:
+        Tuple[List[Dict[str, Any]], bool]: 解析出的事件列表，以及是否为批量格式（数组或NDJSON）。
+
+    Raises:
+        ValueError: 如果事件缺少 'body' 字段、body 内容为空或其中包含非对象元素。
+        Exception: 如果 Base64 解码失败。
+        json.JSONDecodeError: 如果 JSON 解析失败。
+    """
+    try:
+        body = _decode_event_body(event)
+    except json.JSONDecodeError:
+        raise json.JSONDecodeError("JSON 无效", event, 0)
+
+    try:
+        parsed = json_codec.loads(body)
+        if isinstance(parsed, dict):
+            return [parsed], False
+        items = parsed
+    except json.JSONDecodeError as e:
+        # 不是单个JSON文档时按NDJSON逐行解析
+        items = []
+        for line_number, line in enumerate(body.splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                items.append(json_codec.loads(line))
+            except json.JSONDecodeError as line_error:
+                raise json.JSONDecodeError(f"第{line_number}行 JSON 解析失败: {line_error}", e.doc, e.pos)
+
+    if not isinstance(items, list) or not items:
+        raise ValueError("body 不包含任何事件")
+    for item in items:
+        if not isinstance(item, dict):
+            raise ValueError(f"批量事件中包含无效元素: {item!r}")
+    return items, True
+
+def translation_key(text: str, language: str) -> str:
+    """
+    计算翻译条目在缓存和translations.json中的键。
+
+    默认目标语言（zh）直接使用原文作为键，与已有的 {原文: 中文} 文件兼容；
+    其他语言使用 "语言代码::原文"，例如 "ja::Web Server"。
+
+    Args:
+        text (str): 原文。
+        language (str): 目标语言代码。
+
+    Returns:
+        str: 翻译条目的键。
+    """
+    if language == DEFAULT_TARGET_LANGUAGE:
+        return text
+    return f"{language}::{text}"
+
+def get_target_languages() -> List[str]:
+    """获取所有接收者使用的语言，按首次出现的顺序排列。"""
+    return list(get_recipients().keys())
+
+def _is_outbound_failure(error: BaseException) -> bool:
+    """翻译失败是否由时限不足或熔断引起。这类失败与具体原文无关，不记入负缓存。"""
+    while error is not None:
+        if isinstance(error, resilience.OutboundError):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+def _translate_missing(missing: Dict[str, List[str]], translator: Optional[Callable[..., Dict[str, str]]] = None) -> Tuple[Dict[str, Dict[str, str]], Dict[str, List[str]]]:
+    """
+    按目标语言批量翻译缺失的原文，多种语言的请求并行发送。
+
+    翻译失败或结果为空的原文记入负缓存（negative_cache），在有效期内不再调用翻译接口。
+
+    Args:
+        missing (Dict[str, List[str]]): 目标语言到缺失原文列表的映射。
+        translator (Callable, optional): 批量翻译函数，签名与 translate_batch 相同，默认为 translate_batch。
+
+    Returns:
+        Tuple[Dict[str, Dict[str, str]], Dict[str, List[str]]]: 目标语言到 {原文: 翻译结果} 的映射，
+            以及目标语言到翻译失败的原文列表的映射。
+
+    Raises:
+        TranslationError: 如果任一语言的翻译请求失败。
+    """
+    translator = translator or translate_batch
+
+    def run(language: str, texts: List[str]) -> Tuple[Dict[str, str], List[str]]:
+        try:
+            return translator(texts, source_language=SOURCE_LANGUAGE, target_language=language), []
+        except PartialTranslationError as e:
+            return e.results, e.failed
+        except TranslationError as e:
+            if not _is_outbound_failure(e):
+                negative_cache.record_failure([translation_key(text, language) for text in texts], e.message)
+            raise
+
+    try:
+        with metrics.span('translate_text'):
+            if len(missing) == 1:
+                language, texts = next(iter(missing.items()))
+                outcomes = {language: run(language, texts)}
+            else:
+                from concurrent.futures import ThreadPoolExecutor
+
+                # 在线程池中沿用当前调用的上下文（截止时间和统计记录）
+                with ThreadPoolExecutor(max_workers=len(missing)) as pool:
+                    futures = {
+                        language: pool.submit(contextvars.copy_context().run, run, language, texts)
+                        for language, texts in missing.items()
+                    }
+                    outcomes = {language: future.result() for language, future in futures.items()}
+    except TranslationError as e:
+        local_cache.record('translate', 0, sum(len(texts) for texts in missing.values()))
+        raise TranslationError(f"翻译字段失败: {str(e)}") from e
+
+    translated = {language: results for language, (results, _) in outcomes.items()}
+    failed = {language: texts for language, (_, texts) in outcomes.items() if texts}
+    for language, results in translated.items():
+        negative_cache.forget(translation_key(text, language) for text in results)
+    for language, texts in failed.items():
+        negative_cache.record_failure((translation_key(text, language) for text in texts), "翻译失败或结果为空")
+
+    local_cache.record('translate', sum(len(results) for results in translated.values()),
+                       sum(len(texts) for texts in failed.values()))
+    return translated, failed
+
+def _skip_negative(missing: Dict[str, List[str]], known: Dict[str, Dict[str, str]],
+                   fallback: set) -> Dict[str, List[str]]:
+    """
+    跳过负缓存中近期翻译失败的条目：这些条目直接使用原文，不调用翻译接口。
+
+    Args:
+        missing (Dict[str, List[str]]): 目标语言到缺失条目列表的映射。
+        known (Dict[str, Dict[str, str]]): 各语言已知的翻译，命中的条目以原文写入。
+        fallback (set): 因翻译失败而使用原文的 (条目, 语言)，命中的条目加入其中。
+
+    Returns:
+        Dict[str, List[str]]: 仍需调用翻译接口的条目。
+    """
+    remaining = {}
+    for language, texts in missing.items():
+        found = negative_cache.lookup(translation_key(text, language) for text in texts)
+        for text in texts:
+            if translation_key(text, language) not in found:
+                remaining.setdefault(language, []).append(text)
+                continue
+            known[language][text] = text
+            fallback.add((text, language))
+    return remaining
+
+def _report_degraded(stage: str, error: Exception) -> None:
+    """记录降级处理：某一阶段失败时继续发送通知。"""
+    metrics.incr(f"degraded.{stage}")
+    print(f"{stage} 阶段失败，降级处理: {error}")
+
+def lookup_translations(values: List[str], languages: Optional[List[str]] = None,
+                        translator: Optional[Callable[..., Dict[str, str]]] = None,
+                        degrade: bool = False) -> Tuple[Dict[str, Dict[str, str]], Dict[str, str]]:
+    """
+    按层级查找原文在各目标语言下的翻译：进程内字典、本地SQLite缓存、各实例共享的缓存（见 shared_cache）、
+    GitHub翻译文件，最后调用阿里云翻译。
+
+    缓存以 (原文, 目标语言) 为键（见 translation_key）；下层命中的结果会回填到上层缓存，
+    各层的命中统计可通过 local_cache.get_cache_stats() 获取。
+
+    每个原文经翻译记忆（translation_memory）拆分为模板和片段，数字、主机名和IP地址以占位符保留，
+    因此 "Web Server 17" 可以直接使用 "Web Server {0}" 的翻译。原文、模板或片段在某一层全部命中后，
+    不再查找下一层。所有语言缺失的片段在最后一步按语言各发送一次批量请求，且多种语言并行发送。
+
+    Args:
+        values (List[str]): 需要翻译的原文，可以包含重复值。
+        languages (List[str], optional): 目标语言列表，默认为所有接收者使用的语言。
+        translator (Callable, optional): 批量翻译函数，签名与 translate_batch 相同，默认为 translate_batch。
+        degrade (bool): 为True时，读取translations.json失败则跳过该层，翻译失败（包括超时和熔断）
+            则使用原文，保证通知能够按时发送。
+
+    Returns:
+        Tuple[Dict[str, Dict[str, str]], Dict[str, str]]: 目标语言到 {原文: 翻译结果} 的映射，
+            以及本次通过翻译API新增的条目（以 translation_key 为键）。
+
+    Raises:
+        TranslationError: 如果在翻译时发生错误且未启用降级。
+        GitHubError: 如果读取translations.json失败且未启用降级。
+    """
+    unique_values = list(dict.fromkeys(values))
+    languages = list(dict.fromkeys(languages or get_target_languages()))
+    plans = {value: translation_memory.plan(value) for value in unique_values}
+
+    # 目标语言与原文语言相同时直接使用原文
+    translations: Dict[str, Dict[str, str]] = {
+        language: ({value: value for value in unique_values} if language == SOURCE_LANGUAGE else {})
+        for language in languages
+    }
+    # 各语言已知的 {原文/模板/片段: 翻译结果}
+    known: Dict[str, Dict[str, str]] = {language: {} for language in languages}
+
+    def settle() -> Dict[str, Tuple[str, str]]:
+        """用已知条目翻译尚未完成的原文，返回仍需查找的 {键: (条目, 语言)}。"""
+        pending = {}
+        for language in languages:
+            for value, text_plan in plans.items():
+                if value in translations[language]:
+                    continue
+                translated = translation_memory.resolve(text_plan, known[language])
+                if translated is not None:
+                    translations[language][value] = translated
+                    continue
+                for unit in translation_memory.lookup_units(text_plan):
+                    if unit not in known[language]:
+                        pending[translation_key(unit, language)] = (unit, language)
+        return pending
+
+    def apply(pending: Dict[str, Tuple[str, str]], found: Dict[str, str]) -> None:
+        for key, translated in found.items():
+            unit, language = pending[key]
+            known[language][unit] = translated
+
+    # 第一、二层：进程内字典和本地SQLite缓存
+    pending = settle()
+    if pending:
+        with metrics.span('local_cache'):
+            apply(pending, local_cache.lookup(list(pending)))
+        pending = settle()
+
+    # 第三层：各实例共享的缓存，未配置时跳过
+    if pending:
+        missing_keys = list(pending)
+        from_shared = shared_cache.lookup(missing_keys)
+        if shared_cache.is_enabled():
+            local_cache.record('shared', len(from_shared), len(missing_keys) - len(from_shared))
+        local_cache.store(from_shared)
+        apply(pending, from_shared)
+        pending = settle()
+
+    # 第四层：GitHub翻译文件（分片存储时只读取相关分片），命中的条目回填到共享缓存
+    if pending:
+        missing_keys = list(pending)
+        try:
+            with metrics.span('open_github_json'):
+                store = open_translations(missing_keys)
+        except GitHubError as e:
+            if not degrade:
+                raise
+            _report_degraded('open_github_json', e)
+            store = {}
+        from_store = {key: store[key] for key in missing_keys if key in store}
+        local_cache.record('github', len(from_store), len(missing_keys) - len(from_store))
+        local_cache.store(from_store)
+        shared_cache.store(from_store)
+        apply(pending, from_store)
+        pending = settle()
+
+    # 第五层：每种语言通过一次批量请求翻译所有缺失的片段，并保存片段和拼接出的模板。
+    # 近期翻译失败的片段（见 negative_cache）直接使用原文；使用原文兜底的结果不保存
+    new_translations: Dict[str, str] = {}
+    if pending:
+        missing: Dict[str, List[str]] = {}
+        unresolved: List[Tuple[str, str]] = []
+        for language in languages:
+            for value, text_plan in plans.items():
+                if value not in translations[language]:
+                    unresolved.append((value, language))
+                    missing.setdefault(language, []).extend(translation_memory.missing_fragments(text_plan, known[language]))
+        translation_memory.record_misses(len(unresolved))
+        missing = {language: list(dict.fromkeys(texts)) for language, texts in missing.items() if texts}
+        fallback_units: set = set()
+
+        try:
+            missing = _skip_negative(missing, known, fallback_units)
+            if missing:
+                results_by_language, failed = _translate_missing(missing, translator)
+                for language, results in results_by_language.items():
+                    for fragment, text in results.items():
+                        # 丢失占位符的片段翻译不保存，避免后续原文反复回退到整句翻译
+                        if not translation_memory.keeps_placeholders(fragment, text):
+                            continue
+                        known[language][fragment] = text
+                        new_translations[translation_key(fragment, language)] = text
+                for language, texts in failed.items():
+                    for fragment in texts:
+                        known[language][fragment] = fragment
+                        fallback_units.add((fragment, language))
+
+            # 翻译结果丢失占位符时，改为整句翻译原文
+            whole: Dict[str, List[str]] = {}
+            for value, language in unresolved:
+                text_plan = plans[value]
+                translated_template = translation_memory.translate_template(text_plan, known[language])
+                translated = None
+                if translated_template is not None:
+                    translated = translation_memory.fill(translated_template, text_plan['entities'])
+                if translated is None:
+                    whole.setdefault(language, []).append(value)
+                    continue
+                translations[language][value] = translated
+                if not any((fragment, language) in fallback_units for fragment in text_plan['fragments']):
+                    new_translations.setdefault(translation_key(text_plan['template'], language), translated_template)
+
+            whole_known: Dict[str, Dict[str, str]] = {language: {} for language in whole}
+            whole = _skip_negative(whole, whole_known, set())
+            for language, results in whole_known.items():
+                translations[language].update(results)
+            if whole:
+                results_by_language, _ = _translate_missing(whole, translator)
+                for language, results in results_by_language.items():
+                    translations[language].update(results)
+                    for value, text in results.items():
+                        new_translations[translation_key(value, language)] = text
+            # 整句翻译失败的原文使用原文
+            for value, language in unresolved:
+                translations[language].setdefault(value, value)
+        except TranslationError as e:
+            if not degrade:
+                raise
+            _report_degraded('translate_text', e)
+            for value, language in unresolved:
+                translations[language].setdefault(value, value)
+        finally:
+            local_cache.store(new_translations)
+            shared_cache.store(new_translations)
+
+    return translations, new_translations
+
+def _apply_translations(required_fields: Dict[str, Any], translations: Dict[str, str]) -> Dict[str, Any]:
+    """用单一语言的翻译结果替换字段值，跳过为空的字段。"""
+    return {
+        key: translations[value] if key in TRANSLATABLE_FIELDS else value
+        for key, value in required_fields.items()
+        if value is not None
+    }
+
+def _translatable_values(required_fields: Dict[str, Any]) -> List[str]:
+    """取出字段字典中需要翻译的值。"""
+    return [
+        value for key, value in required_fields.items()
+        if value is not None and key in TRANSLATABLE_FIELDS
+    ]
+
+def resolve_translations(required_fields: Dict[str, Any], languages: Optional[List[str]] = None,
+                         degrade: bool = False) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str]]:
+    """
+    查找或翻译指定的字段，不写入translations.json。
+
+    Args:
+        required_fields (Dict[str, Any]): 需要翻译的字段字典。
+        languages (List[str], optional): 目标语言列表，默认为所有接收者使用的语言。
+        degrade (bool): 为True时查找或翻译失败的字段使用原文，见 lookup_translations。
+
+    Returns:
+        Tuple[Dict[str, Dict[str, Any]], Dict[str, str]]: 目标语言到翻译后字段字典的映射，以及本次新增的翻译条目。
+
+    Raises:
+        TranslationError: 如果在翻译字段时发生错误。
+        GitHubError: 如果读取translations.json失败。
+    """
+    translations, new_translations = lookup_translations(_translatable_values(required_fields), languages, degrade=degrade)
+    localized = {
+        language: _apply_translations(required_fields, language_translations)
+        for language, language_translations in translations.items()
+    }
+    return localized, new_translations
+
+def persist_translations(new_translations: Dict[str, str]) -> None:
+    """
+    将新增的翻译条目合并为一次提交写入translations.json（启用写回缓冲区时可能延后提交）。
+
+    Args:
+        new_translations (Dict[str, str]): 新增的翻译条目，可以为空。
+
+    Raises:
+        GitHubError: 如果提交失败。
+    """
+    with metrics.span('update_json_file'):
+        write_response = queue_json_update(new_translations)
+    if write_response['statusCode'] != 200:
+        raise GitHubError(f"更新translations.json失败: {write_response['body']}")
+
+def translate_fields_localized(required_fields: Dict[str, Any], languages: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    将指定的字段翻译为所有目标语言并更新translations.json。
+
+    Args:
+        required_fields (Dict[str, Any]): 需要翻译的字段字典。
+        languages (List[str], optional): 目标语言列表，默认为所有接收者使用的语言。
+
+    Returns:
+        Dict[str, Dict[str, Any]]: 目标语言到翻译后字段字典的映射。
+
+    Raises:
+        TranslationError: 如果在翻译字段时发生错误。
+        GitHubError: 如果GitHub操作失败。
+        Exception: 如果发生其他未预见的错误。
+    """
+    try:
+        localized, new_translations = resolve_translations(required_fields, languages)
+        persist_translations(new_translations)
+        return localized
+
+    except TranslationError as e:
+        raise TranslationError(f"{str(e)}")
+    except GitHubError as e:
+        raise GitHubError(f"{str(e)}")
+    except Exception as e:
+        raise Exception(f"函数translate_fields错误: {str(e)}")
+
+def translate_fields(required_fields: Dict[str, Any], target_language: str = DEFAULT_TARGET_LANGUAGE) -> Dict[str, Any]:
     """
     翻译指定的字段并更新translations.json。
 
     Args:
         required_fields (Dict[str, Any]): 需要翻译的字段字典。
+        target_language (str, optional): 目标语言代码，默认为'zh'（中文）。
 
     Returns:
         Dict[str, Any]: 翻译后的字段字典。
     
+    Raises:
+        TranslationError: 如果在翻译字段时发生错误。
+        GitHubError: 如果GitHub操作失败。
+        Exception: 如果发生其他未预见的错误。
+    """
+    return translate_fields_localized(required_fields, [target_language])[target_language]
+
+def resolve_translations_batch(required_fields_list: List[Dict[str, Any]], languages: Optional[List[str]] = None,
+                               degrade: bool = False) -> Tuple[List[Dict[str, Dict[str, Any]]], Dict[str, str]]:
+    """
+    批量查找或翻译多个事件的字段，不写入translations.json。
+
+    所有事件中的原文先去重，每个原文在每种目标语言下只查找或翻译一次。
+
+    Args:
+        required_fields_list (List[Dict[str, Any]]): 每个事件需要翻译的字段字典。
+        languages (List[str], optional): 目标语言列表，默认为所有接收者使用的语言。
+        degrade (bool): 为True时查找或翻译失败的字段使用原文，见 lookup_translations。
+
+    Returns:
+        Tuple[List[Dict[str, Dict[str, Any]]], Dict[str, str]]: 与输入顺序一致的列表，每项为目标语言到
+            翻译后字段字典的映射；以及本次新增的翻译条目。
+
+    Raises:
+        TranslationError: 如果在翻译字段时发生错误且未启用降级。
+        GitHubError: 如果读取translations.json失败且未启用降级。
+    """
+    translations, new_translations = lookup_translations([
+        value for required_fields in required_fields_list
+        for value in _translatable_values(required_fields)
+    ], languages, degrade=degrade)
+
+    localized_list = []
+    for required_fields in required_fields_list:
+        localized_list.append({
+            language: _apply_translations(required_fields, language_translations)
+            for language, language_translations in translations.items()
+        })
+    return localized_list, new_translations
+
+def translate_fields_batch(required_fields_list: List[Dict[str, Any]], languages: Optional[List[str]] = None) -> List[Dict[str, Dict[str, Any]]]:
+    """
+    批量翻译多个事件的字段，并将新翻译合并为一次提交。
+
+    Args:
+        required_fields_list (List[Dict[str, Any]]): 每个事件需要翻译的字段字典。
+        languages (List[str], optional): 目标语言列表，默认为所有接收者使用的语言。
+
+    Returns:
+        List[Dict[str, Dict[str, Any]]]: 与输入顺序一致的列表，每项为目标语言到翻译后字段字典的映射。
+
     Raises:
         TranslationError: 如果在翻译字段时发生错误。
         GitHubError: 如果GitHub操作失败。
         Exception: 如果发生其他未预见的错误。
     """
     try:
-        # 获取translations.json内容
-        translations = open_github_json()
-        
-        translated_fields = {}
-        for key, value in required_fields.items():
-            if value is not None:
-                if key in ["monitor_name", "monitor_type", "monitor_category", "monitor_status"]:
-                    if value in translations:
-                        translated_value = translations[value]
-                    else:
-                        try:
-                            # 调用翻译API进行翻译
-                            translated_value = translate_text(value, source_language='en', target_language='zh')
-                            # 更新translations.json
-                            translations[value] = translated_value
-                            write_response = update_json_file(translations)
-                            if write_response['statusCode'] != 200:
-                                raise GitHubError(f"更新translations.json失败: {write_response['body']}")
-                        except TranslationError as e:
-                            raise TranslationError(f"翻译字段 {key} 失败: {str(e)}")
-                    translated_fields[key] = translated_value
-                else:
-                    translated_fields[key] = value
-
-        return translated_fields
+        localized_list, new_translations = resolve_translations_batch(required_fields_list, languages)
+        persist_translations(new_translations)
+        return localized_list
 
     except TranslationError as e:
         raise TranslationError(f"{str(e)}")
     except GitHubError as e:
         raise GitHubError(f"{str(e)}")
     except Exception as e:
-        raise Exception(f"函数translate_fields错误: {str(e)}")
+        raise Exception(f"函数translate_fields_batch错误: {str(e)}")
+
+def format_time(timestamp) -> str:
+    """
+    将UTC时间戳转换为本地时间字符串（假设为上海时区）。
+
+    Args:
+        timestamp: UTC时间戳，为空时返回空字符串。
+
+    Returns:
+        str: 格式为 %Y-%m-%d %H:%M:%S 的本地时间。
+    """
+    if not timestamp:
+        return ''
+    local_dt = datetime.fromtimestamp(timestamp, LOCAL_TZ)
+    return local_dt.strftime("%Y-%m-%d %H:%M:%S")
 
-def build_message(data: Dict[str, Any]) -> str:
+def _get_labels(language: str) -> Dict[str, str]:
+    """获取指定语言的消息标签，未定义的语言使用英文标签。"""
+    return MESSAGE_LABELS.get(language, MESSAGE_LABELS['en'])
+
+def build_message(data: Dict[str, Any], language: str = DEFAULT_TARGET_LANGUAGE) -> str:
     """
     构建消息内容。
 
     Args:
         data (Dict[str, Any]): 翻译后的字段字典。
+        language (str, optional): 消息使用的语言，默认为'zh'（中文）。
 
     Returns:
         str: 消息内容。
@@ -132,44 +647,141 @@ def build_message(data: Dict[str, Any]) -> str:
         Exception: 如果在构建消息时发生错误。
     """
     try:
+        labels = _get_labels(language)
         monitor_name = data.get('monitor_name', None)
         monitor_category = data.get('monitor_category', None)
         monitor_status = data.get('monitor_status', None)
         timestamp = data.get('timestamp', None)
 
-        # 时间转换：将UTC时间戳转换为本地时间（假设为上海时区）
-        if timestamp:
-            utc_dt = datetime.utcfromtimestamp(timestamp)
-            local_tz = pytz.timezone('Asia/Shanghai')  # 假设使用上海时区
-            local_dt = utc_dt.astimezone(local_tz)
-            time = local_dt.strftime("%Y-%m-%d %H:%M:%S")
-        else:
-            time = ''
+        time = format_time(timestamp)
 
         # 构建消息内容
         content_parts = [
-            f"业务名称: {monitor_name}", 
-            f"时间: {time}",
+            f"{labels['name']}: {monitor_name}", 
+            f"{labels['time']}: {time}",
         ]
         if monitor_category:
-            content_parts.append(f"分类: {monitor_category}")
+            content_parts.append(f"{labels['category']}: {monitor_category}")
         if monitor_status:
-            content_parts.append(f"状态: {monitor_status}")       
+            content_parts.append(f"{labels['status']}: {monitor_status}")       
     
         content = '\n'.join(content_parts)
-        closing = "\n\n## [点击访问来源](https://hetrixtools.com)\n\n![logo](https://hetrixtools.com/img/ht_logo.png)"
 
-        full_message = content + closing
+        full_message = content + MESSAGE_CLOSING.format(source=labels['source'])
         return full_message
     except Exception as e:
         raise Exception(f"构建消息时出错: {str(e)}")
 
-def send_notification(translated_fields: Dict[str, Any]) -> Dict[str, Any]:
+def build_digest_message(events: List[Dict[str, Any]], language: str = DEFAULT_TARGET_LANGUAGE) -> str:
+    """
+    将同一窗口内的多个事件构建为一条摘要消息。
+
+    Args:
+        events (List[Dict[str, Any]]): 翻译后的字段字典列表，按到达顺序排列。
+        language (str, optional): 消息使用的语言，默认为'zh'（中文）。
+
+    Returns:
+        str: 摘要消息内容。
+
+    Raises:
+        Exception: 如果在构建消息时发生错误。
+    """
+    try:
+        labels = _get_labels(language)
+        content_parts = [labels['digest'].format(count=len(events)), ""]
+        for data in events:
+            line = f"- {format_time(data.get('timestamp'))} {data.get('monitor_name')}"
+            if data.get('monitor_category'):
+                line += f" [{data['monitor_category']}]"
+            if data.get('monitor_status'):
+                line += f": {data['monitor_status']}"
+            content_parts.append(line)
+
+        return '\n'.join(content_parts) + MESSAGE_CLOSING.format(source=labels['source'])
+    except Exception as e:
+        raise Exception(f"构建摘要消息时出错: {str(e)}")
+
+def _is_success(result: Dict[str, Any]) -> bool:
+    """响应是否表示成功（已发送或已加入重发队列）。"""
+    return 200 <= result.get('statusCode', 500) < 300
+
+def _order_key(fields: Dict[str, Any]) -> str:
+    """重发队列中的顺序分组键：同一监控项的消息按顺序发送。"""
+    return f"monitor:{fields.get('monitor_id') or fields.get('monitor_name')}"
+
+def _deliver(full_message: str, summary: Optional[str], uids: Optional[List[str]], order_key: str,
+             sent_message: str) -> Dict[str, Any]:
+    """
+    发送一条消息。发送失败（包括超时和熔断）时写入重发队列；同一分组已有待重发的消息时，
+    新消息也直接入队，由重发按顺序发送。
+
+    Returns:
+        Dict[str, Any]: 已发送时状态码为200，已加入重发队列时为202。
+
+    Raises:
+        WxPusherError: 如果发送失败且重发队列不可用。
+        Exception: 如果WxPusher返回错误。
+    """
+    uids = uids or [UID]
+    queued_response = {
+        "statusCode": 202,
+        "body": json_codec.dumps({"message": "消息已加入重发队列"})
+    }
+
+    if spool.is_enabled() and spool.has_pending(order_key):
+        if spool.enqueue(full_message, summary, uids, order_key):
+            return queued_response
+
+    try:
+        with metrics.span('send_message'):
+            send_response = send_message(full_message, summary, uids)
+    except WxPusherError as e:
+        if spool.is_enabled() and spool.enqueue(full_message, summary, uids, order_key, e.message):
+            print(f"发送消息失败，已加入重发队列: {e.message}")
+            return queued_response
+        raise
+    if "error" in send_response:
+        raise Exception(f"{send_response['error']}")
+
+    return {
+        "statusCode": 200,
+        "body": json_codec.dumps({"message": sent_message})
+    }
+
+def _send_spooled(content: str, summary: Optional[str], uids: List[str]) -> None:
+    """重发队列使用的发送函数，发送失败时抛出异常。"""
+    with metrics.span('send_message'):
+        send_response = send_message(content, summary, uids)
+    if "error" in send_response:
+        raise WxPusherError(send_response['error'])
+
+def drain_spool() -> Dict[str, int]:
+    """
+    重发队列中到期的消息，每次最多 SPOOL_BATCH_SIZE 条。
+
+    Returns:
+        Dict[str, int]: sent、failed、expired 和 remaining 的消息数。
+    """
+    if not spool.is_enabled():
+        return {'sent': 0, 'failed': 0, 'expired': 0, 'remaining': 0}
+    with metrics.span('drain_spool'):
+        return spool.drain(_send_spooled)
+
+def _drain_spool_after_send() -> None:
+    """当前调用的通知发送后重发队列中的消息，失败不影响响应结果。"""
+    try:
+        drain_spool()
+    except Exception as e:
+        print(f"重发消息失败: {e}")
+
+def send_notification(translated_fields: Dict[str, Any], language: str = DEFAULT_TARGET_LANGUAGE, uids: Optional[List[str]] = None) -> Dict[str, Any]:
     """
     发送通知消息。
 
     Args:
         translated_fields (Dict[str, Any]): 翻译后的字段字典。
+        language (str, optional): 消息使用的语言，默认为'zh'（中文）。
+        uids (List[str], optional): 接收消息的用户ID列表，默认为环境变量中的 UID。
 
     Returns:
         Dict[str, Any]: 发送结果。
@@ -179,27 +791,251 @@ def send_notification(translated_fields: Dict[str, Any]) -> Dict[str, Any]:
         Exception: 如果发生其他未预见的错误。
     """
     try:
-        full_message = build_message(translated_fields)
+        full_message = build_message(translated_fields, language)
         summary = translated_fields.get('monitor_name')
 
-        send_response = send_message(full_message, summary)
-        if "error" in send_response:
-            raise Exception(f"{send_response['error']}")
+        return _deliver(full_message, summary, uids, _order_key(translated_fields), "消息发送成功")
+
+    except WxPusherError as e:
+        raise WxPusherError(f"发送消息失败: {e.message}")
+    except Exception as e:
+        raise Exception(f"函数send_notification错误: {str(e)}")
+
+def send_localized(localized: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    按接收者的语言分别发送通知，每种语言一条消息。
+
+    Args:
+        localized (Dict[str, Dict[str, Any]]): 目标语言到翻译后字段字典的映射。
+
+    Returns:
+        Dict[str, Any]: 发送结果。只有一种语言时与 send_notification 的结果相同；
+            任一语言的消息加入重发队列时返回该语言的结果。
+
+    Raises:
+        WxPusherError: 如果发送消息时发生错误。
+        Exception: 如果发生其他未预见的错误。
+    """
+    response = None
+    for language, uids in get_recipients().items():
+        fields = localized.get(language)
+        if fields is not None:
+            result = send_notification(fields, language, uids)
+            if response is None or response['statusCode'] == 200:
+                response = result
+    if response is None:
+        raise Exception("没有与接收者语言匹配的翻译结果")
+    return response
+
+def send_digest(items: List[Dict[str, Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    发送一个窗口内合并的事件，每种语言一条摘要消息。窗口内只有一个事件时按普通消息发送。
+
+    Args:
+        items (List[Dict[str, Dict[str, Any]]]): 每个事件的目标语言到翻译后字段字典的映射。
 
+    Returns:
+        Dict[str, Any]: 发送结果。
+
+    Raises:
+        WxPusherError: 如果发送消息时发生错误。
+        Exception: 如果发生其他未预见的错误。
+    """
+    if len(items) == 1:
+        return send_localized(items[0])
+
+    try:
+        status_code = 200
+        for language, uids in get_recipients().items():
+            events = [item[language] for item in items if language in item]
+            if not events:
+                continue
+            full_message = build_digest_message(events, language)
+            names = list(dict.fromkeys(str(data.get('monitor_name')) for data in events))
+            summary = names[0] if len(names) == 1 else _get_labels(language)['digest_summary'].format(count=len(events))
+
+            result = _deliver(full_message, summary, uids, f"digest:{digest.group_key(events[0])}", "摘要消息发送成功")
+            status_code = max(status_code, result['statusCode'])
+
+        message = "摘要消息发送成功" if status_code == 200 else "摘要消息已加入重发队列"
         return {
-            "statusCode": 200,
-            "body": json.dumps({"message": "消息发送成功"})
+            "statusCode": status_code,
+            "body": json_codec.dumps({"message": message, "events": len(items)})
         }
 
     except WxPusherError as e:
-        raise WxPusherError(f"发送消息失败: {e.message}")
+        raise WxPusherError(f"发送摘要消息失败: {e.message}")
     except Exception as e:
-        raise Exception(f"函数send_notification错误: {str(e)}")
+        raise Exception(f"函数send_digest错误: {str(e)}")
+
+def flush_digests(force: bool = False) -> List[Dict[str, Any]]:
+    """
+    发送所有已到期窗口的摘要消息。
+
+    Args:
+        force (bool): 为True时发送所有窗口，不论是否到期。
+
+    Returns:
+        List[Dict[str, Any]]: 每个窗口的发送结果。发送失败的窗口返回错误响应，不影响其他窗口。
+    """
+    results = []
+    for items in digest.take_due(force):
+        try:
+            results.append(send_digest(items))
+        except WxPusherError as e:
+            results.append(generate_error_response(f"发送消息失败: {str(e)}", 500))
+        except Exception as e:
+            results.append(generate_error_response(f"{str(e)}", 500))
+    return results
+
+def _flush_digests_on_timeout() -> None:
+    """窗口到期定时器的回调，在后台线程中发送到期的摘要。"""
+    for result in flush_digests():
+        if not _is_success(result):
+            print(f"超时发送摘要失败: {result['body']}")
+
+def notify(localized: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    发送通知，启用摘要窗口（DIGEST_WINDOW_SECONDS，见 digest.is_enabled）时先加入窗口合并发送。
+    加入窗口失败（持久存储不可用）时直接发送。
+
+    Args:
+        localized (Dict[str, Dict[str, Any]]): 目标语言到翻译后字段字典的映射。
+
+    Returns:
+        Dict[str, Any]: 发送结果。加入窗口时返回200，消息在窗口到期后发送。
+
+    Raises:
+        WxPusherError: 如果未启用摘要窗口且发送消息时发生错误。
+        Exception: 如果发生其他未预见的错误。
+    """
+    if not digest.is_enabled() or \
+            not digest.add(next(iter(localized.values())), localized, on_timeout=_flush_digests_on_timeout):
+        return send_localized(localized)
+
+    flushed = flush_digests()
+    return {
+        "statusCode": 200,
+        "body": json_codec.dumps({"message": "消息已加入摘要窗口", "flushed": len(flushed)})
+    }
+
+def _persist_after_send(new_translations: Dict[str, str]) -> None:
+    """通知发送后提交新翻译。提交失败不影响已发送的通知，新翻译保留在写回缓冲区中等待下次提交。"""
+    try:
+        persist_translations(new_translations)
+    except GitHubError as e:
+        _report_degraded('update_json_file', e)
+
+def _add_extra_fields(localized: Dict[str, Dict[str, Any]], extra_fields: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """为每种语言的字段字典添加无需翻译的字段。"""
+    for fields in localized.values():
+        fields.update(extra_fields)
+    return localized
+
+def extract_fields(parsed_body: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    从解析后的Webhook内容中提取字段。
+
+    Args:
+        parsed_body (Dict[str, Any]): 解析后的Webhook内容。
+
+    Returns:
+        Tuple[Dict[str, Any], Dict[str, Any]]: 需要翻译的字段字典，以及无需翻译的字段字典。
+    """
+    # 提取所有的字段，使用默认值处理缺失的字段
+    required_fields = {
+        "monitor_name": parsed_body.get('monitor_name', None),
+        "monitor_type": parsed_body.get('monitor_type', None),
+        "monitor_category": parsed_body.get('monitor_category', None),
+        "monitor_status": parsed_body.get('monitor_status', None)
+    }
+    extra_fields = {
+        "monitor_id": parsed_body.get('monitor_id', None),
+        "monitor_target": parsed_body.get('monitor_target', None),
+        "timestamp": parsed_body.get('timestamp', None),
+        "monitor_errors": parsed_body.get('monitor_errors', None)
+    }
+    return required_fields, extra_fields
 
+def handle_batch(events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    批量处理多个Webhook事件。
+
+    所有事件的字段一次性翻译（去重后只翻译一次），逐个发送通知后将新翻译合并为一次提交。
+    翻译或读取translations.json失败时使用原文发送。已处理过的事件和批量中重复的事件不再发送，
+    直接使用首次处理的结果。
+
+    Args:
+        events (List[Dict[str, Any]]): 解析后的事件列表。
+
+    Returns:
+        Dict[str, Any]: HTTP响应结果，body 中的 results 按输入顺序给出每个事件的处理结果。
+            全部成功时状态码为200，部分失败时为207。
+
+    Raises:
+        Exception: 如果发生未预见的错误。
+    """
+    results: List[Any] = [None] * len(events)
+    pending = []
+    # 批量中重复的事件：位置 -> 首次出现的位置
+    duplicates: Dict[int, int] = {}
+    first_positions: Dict[str, int] = {}
+    keys: Dict[int, str] = {}
+    try:
+        for position, parsed_body in enumerate(events):
+            if "status" in parsed_body and parsed_body["status"] == "error":
+                results[position] = parsed_body
+                continue
+            key = idempotency.event_key(parsed_body)
+            if key in first_positions:
+                duplicates[position] = first_positions[key]
+                continue
+            cached = idempotency.acquire(key)
+            if cached is not None:
+                results[position] = cached
+                continue
+            if key is not None:
+                first_positions[key] = position
+                keys[position] = key
+            pending.append((position, extract_fields(parsed_body)))
+
+        localized_list, new_translations = resolve_translations_batch(
+            [required_fields for _, (required_fields, _) in pending], degrade=True
+        )
+
+        for (position, (_, extra_fields)), localized in zip(pending, localized_list):
+            try:
+                results[position] = notify(_add_extra_fields(localized, extra_fields))
+            except WxPusherError as e:
+                results[position] = generate_error_response(f"发送消息失败: {str(e)}", 500)
+            except Exception as e:
+                results[position] = generate_error_response(f"主处理函数异常: {str(e)}", 500)
+    finally:
+        for position, key in keys.items():
+            idempotency.release(key, results[position])
+
+    for position, first_position in duplicates.items():
+        results[position] = results[first_position]
+
+    _persist_after_send(new_translations)
+    _drain_spool_after_send()
+
+    all_succeeded = all(_is_success(result) for result in results)
+    return {
+        "statusCode": 200 if all_succeeded else 207,
+        "body": json_codec.dumps({"results": results})
+    }
+
+@metrics.instrumented('handler')
+@resilience.with_deadline
 def handler(event, context):
     """
     处理Webhook事件的入口函数。
 
+    整个调用受 HANDLER_DEADLINE_SECONDS 时限约束。翻译或读取translations.json失败（包括超时和熔断）时
+    使用原文发送通知；新翻译在通知发送后提交，提交失败不影响响应结果。
+    (monitor_id, monitor_status, timestamp) 相同的重复事件直接返回首次处理的结果，见 idempotency。
+
     Args:
         event: Webhook触发的事件内容。
         context: 上下文信息（通常用于云函数环境）。
@@ -208,42 +1044,39 @@ def handler(event, context):
         Dict[str, Any]: HTTP响应结果。
     """
     try:
-        # 解析Webhook内容
-        parsed_body = parse_event(event)
+        # 解析Webhook内容，body为数组或NDJSON时按批量处理
+        with metrics.span('parse_event'):
+            events, is_batch = parse_events(event)
+        if is_batch:
+            return handle_batch(events)
+
+        parsed_body = events[0]
         if "status" in parsed_body and parsed_body["status"] == "error":
             return parsed_body
-        
-        # 提取所有的字段，使用默认值处理缺失的字段
-        monitor_id = parsed_body.get('monitor_id', None)
-        monitor_name = parsed_body.get('monitor_name', None)
-        monitor_target = parsed_body.get('monitor_target', None)
-        monitor_type = parsed_body.get('monitor_type', None)
-        monitor_category = parsed_body.get('monitor_category', None)
-        monitor_status = parsed_body.get('monitor_status', None)
-        timestamp = parsed_body.get('timestamp', None)
-        monitor_errors = parsed_body.get('monitor_errors', None)
-        
-        # 创建包含所有字段的字典
-        required_fields = {
-            "monitor_name": monitor_name,
-            "monitor_type": monitor_type,
-            "monitor_category": monitor_category,
-            "monitor_status": monitor_status
-        }
-        
-        # 翻译字段
-        translated_fields = translate_fields(required_fields)
-        
-        # 添加未翻译的字段
-        translated_fields.update({
-            "monitor_id": monitor_id,
-            "monitor_target": monitor_target,
-            "timestamp": timestamp,
-            "monitor_errors": monitor_errors
-        })
-        
-        # 发送通知
-        send_response = send_notification(translated_fields)
+
+        # 重复的事件直接返回首次处理的结果
+        key = idempotency.event_key(parsed_body)
+        cached = idempotency.acquire(key)
+        if cached is not None:
+            return cached
+
+        send_response = None
+        try:
+            required_fields, extra_fields = extract_fields(parsed_body)
+            
+            # 将字段翻译为所有接收者使用的语言，失败时使用原文
+            localized, new_translations = resolve_translations(required_fields, degrade=True)
+            
+            # 添加未翻译的字段
+            _add_extra_fields(localized, extra_fields)
+            
+            # 发送通知，之后再提交新翻译
+            send_response = notify(localized)
+        finally:
+            idempotency.release(key, send_response)
+
+        _persist_after_send(new_translations)
+        _drain_spool_after_send()
         return send_response
 
     except ValueError as e:
@@ -255,4 +1088,139 @@ def handler(event, context):
     except WxPusherError as e:
         return generate_error_response(f"发送消息失败: {str(e)}", 500)
     except Exception as e:
-        return generate_error_response(f"主处理函数异常: {str(e)}", 500)
\ No newline at end of file
+        return generate_error_response(f"主处理函数异常: {str(e)}", 500)
+
+async def handle_event_async(event, context) -> Dict[str, Any]:
+    """
+    异步处理Webhook事件。
+
+    翻译完成后立即发送通知，translations.json 的提交与发送并行进行，
+    通知无需等待GitHub提交。网络请求在线程池中通过共享连接池执行。
+
+    Args:
+        event: Webhook触发的事件内容。
+        context: 上下文信息（通常用于云函数环境）。
+
+    Returns:
+        Dict[str, Any]: HTTP响应结果。提交失败不影响已发送的通知，新翻译保留在写回缓冲区中等待下次提交。
+    """
+    import asyncio
+
+    try:
+        # 解析Webhook内容，body为数组或NDJSON时按批量处理
+        with metrics.span('parse_event'):
+            events, is_batch = parse_events(event)
+        if is_batch:
+            return await asyncio.to_thread(handle_batch, events)
+
+        parsed_body = events[0]
+        if "status" in parsed_body and parsed_body["status"] == "error":
+            return parsed_body
+
+        # 重复的事件直接返回首次处理的结果
+        key = idempotency.event_key(parsed_body)
+        cached = await asyncio.to_thread(idempotency.acquire, key)
+        if cached is not None:
+            return cached
+
+        send_result = None
+        try:
+            required_fields, extra_fields = extract_fields(parsed_body)
+
+            # 查找或翻译字段
+            localized, new_translations = await asyncio.to_thread(resolve_translations, required_fields, None, True)
+            _add_extra_fields(localized, extra_fields)
+
+            # 发送通知与提交翻译并行执行
+            send_result, persist_result = await asyncio.gather(
+                asyncio.to_thread(notify, localized),
+                asyncio.to_thread(persist_translations, new_translations),
+                return_exceptions=True
+            )
+        finally:
+            idempotency.release(key, send_result if isinstance(send_result, dict) else None)
+
+        if isinstance(persist_result, Exception):
+            _report_degraded('update_json_file', persist_result)
+        if isinstance(send_result, Exception):
+            raise send_result
+        await asyncio.to_thread(_drain_spool_after_send)
+        return send_result
+
+    except ValueError as e:
+        return generate_error_response(f"解析事件时发生错误: {str(e)}", 400)
+    except TranslationError as e:
+        return generate_error_response(f"翻译字段时发生错误: {str(e)}", 500)
+    except GitHubError as e:
+        return generate_error_response(f"GitHub操作失败: {str(e)}", 500)
+    except WxPusherError as e:
+        return generate_error_response(f"发送消息失败: {str(e)}", 500)
+    except Exception as e:
+        return generate_error_response(f"主处理函数异常: {str(e)}", 500)
+
+@metrics.instrumented('async_handler')
+@resilience.with_deadline
+def async_handler(event, context):
+    """
+    异步处理流程的入口函数，可在函数计算中配置为 index.async_handler。
+
+    Args:
+        event: Webhook触发的事件内容。
+        context: 上下文信息（通常用于云函数环境）。
+
+    Returns:
+        Dict[str, Any]: HTTP响应结果。
+    """
+    # 延迟导入，默认入口不需要加载asyncio
+    import asyncio
+
+    return asyncio.run(handle_event_async(event, context))
+
+@metrics.instrumented('digest_handler')
+@resilience.with_deadline
+def digest_handler(event, context):
+    """
+    发送到期摘要的入口函数，可配置为定时触发器，确保实例空闲时摘要也能按时发送。
+
+    Args:
+        event: 触发器事件内容（未使用）。
+        context: 上下文信息（通常用于云函数环境）。
+
+    Returns:
+        Dict[str, Any]: HTTP响应结果，包含发送的窗口数和发送失败的窗口数。
+    """
+    results = flush_digests()
+    _drain_spool_after_send()
+    failed = [result for result in results if not _is_success(result)]
+    return {
+        "statusCode": 500 if failed else 200,
+        "body": json_codec.dumps({"flushed": len(results), "failed": len(failed)})
+    }
+
+@metrics.instrumented('spool_handler')
+@resilience.with_deadline
+def spool_handler(event, context):
+    """
+    重发队列的入口函数，可配置为定时触发器，在没有新告警时也能重发失败的消息。
+
+    Args:
+        event: 触发器事件内容（未使用）。
+        context: 上下文信息（通常用于云函数环境）。
+
+    Returns:
+        Dict[str, Any]: HTTP响应结果，包含已发送、发送失败、已丢弃和剩余的消息数。
+    """
+    result = drain_spool()
+    return {
+        "statusCode": 500 if result['failed'] else 200,
+        "body": json_codec.dumps(result)
+    }
+
+def _flush_digests_at_exit():
+    """进程退出时尽力发送所有进程内窗口中的摘要，持久存储中的窗口留给其他实例发送。"""
+    try:
+        flush_digests(force=True)
+    except Exception:
+        pass
+
+atexit.register(_flush_digests_at_exit)
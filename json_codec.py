@@ -0,0 +1,147 @@
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+# 可用的JSON编解码实现，按优先顺序排列；JSON_CODEC 为 auto（默认）时使用第一个已安装的实现
+BACKENDS = ('orjson', 'msgspec', 'stdlib')
+
+# 当前使用的实现：(名称, 解码函数, 编码函数)，首次使用时选择
+_backend: Optional[Tuple[str, Callable[[Union[str, bytes]], Any], Callable[[Any, bool], bytes]]] = None
+_lock = threading.Lock()
+
+def _load_orjson():
+    """加载 orjson 实现。"""
+    import orjson
+
+    def dumps(obj: Any, sort_keys: bool) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(obj, option=option)
+
+    # orjson.JSONDecodeError 是 json.JSONDecodeError 的子类，调用方无需区分
+    return orjson.loads, dumps
+
+def _load_msgspec():
+    """加载 msgspec 实现，需要支持 order 参数的版本（0.14及以上）。"""
+    import msgspec
+
+    encoder = msgspec.json.Encoder()
+    sorted_encoder = msgspec.json.Encoder(order='sorted')
+
+    def loads(data: Union[str, bytes]) -> Any:
+        try:
+            return msgspec.json.decode(data)
+        except msgspec.DecodeError as e:
+            doc = data if isinstance(data, str) else data.decode('utf-8', 'replace')
+            raise json.JSONDecodeError(str(e), doc, 0)
+
+    def dumps(obj: Any, sort_keys: bool) -> bytes:
+        return (sorted_encoder if sort_keys else encoder).encode(obj)
+
+    return loads, dumps
+
+def _load_stdlib():
+    """加载标准库实现，输出格式与其他实现一致。"""
+    def dumps(obj: Any, sort_keys: bool) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), sort_keys=sort_keys).encode('utf-8')
+
+    return json.loads, dumps
+
+_LOADERS = {'orjson': _load_orjson, 'msgspec': _load_msgspec, 'stdlib': _load_stdlib}
+
+def _get_backend():
+    """获取当前使用的实现，首次调用时按 JSON_CODEC 选择。"""
+    global _backend
+
+    if _backend is None:
+        with _lock:
+            if _backend is None:
+                _backend = _select(os.getenv('JSON_CODEC', 'auto').lower())
+    return _backend
+
+def _select(name: str):
+    """
+    选择实现。指定的实现未安装时依次尝试其余实现，最终使用标准库。
+
+    Args:
+        name (str): orjson、msgspec、stdlib 或 auto。
+    """
+    candidates = BACKENDS if name not in BACKENDS else (name,) + tuple(b for b in BACKENDS if b != name)
+    for candidate in candidates:
+        try:
+            return (candidate,) + _LOADERS[candidate]()
+        except (ImportError, AttributeError, TypeError):
+            # 未安装，或版本过旧不支持所需参数
+            continue
+    return ('stdlib',) + _load_stdlib()
+
+def use(name: str) -> str:
+    """
+    切换使用的实现（用于基准测试）。
+
+    Args:
+        name (str): orjson、msgspec、stdlib 或 auto。
+
+    Returns:
+        str: 实际使用的实现名称。
+    """
+    global _backend
+
+    with _lock:
+        _backend = _select(name.lower())
+    return _backend[0]
+
+def get_backend() -> str:
+    """获取当前使用的实现名称。"""
+    return _get_backend()[0]
+
+def available_backends() -> Tuple[str, ...]:
+    """获取已安装的实现名称。"""
+    names = []
+    for name in BACKENDS:
+        try:
+            _LOADERS[name]()
+        except (ImportError, AttributeError, TypeError):
+            continue
+        names.append(name)
+    return tuple(names)
+
+def loads(data: Union[str, bytes]) -> Any:
+    """
+    解析JSON文本。
+
+    Args:
+        data (str | bytes): JSON文本，bytes 按UTF-8解码。
+
+    Returns:
+        Any: 解析结果。
+
+    Raises:
+        json.JSONDecodeError: 如果不是有效的JSON。
+    """
+    return _get_backend()[1](data)
+
+def dumps_bytes(obj: Any, sort_keys: bool = False) -> bytes:
+    """
+    将对象编码为UTF-8编码的紧凑JSON（不转义非ASCII字符）。
+
+    Args:
+        obj (Any): 要编码的对象。
+        sort_keys (bool): 是否按键排序。
+
+    Returns:
+        bytes: JSON文本。
+    """
+    return _get_backend()[2](obj, sort_keys)
+
+def dumps(obj: Any, sort_keys: bool = False) -> str:
+    """将对象编码为紧凑的JSON字符串，见 dumps_bytes。"""
+    return dumps_bytes(obj, sort_keys).decode('utf-8')
+
+def encode_store(data: Dict[str, Any]) -> bytes:
+    """
+    编码翻译文件内容：按键排序的紧凑UTF-8 JSON。
+
+    各实现对相同内容的输出逐字节一致，内容未变化时文件的Git Blob SHA也不变，可据此跳过提交。
+    """
+    return dumps_bytes(data, sort_keys=True)
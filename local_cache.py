@@ -0,0 +1,180 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional
+import metrics
+
+# 容器本地缓存文件路径。函数计算实例的 /tmp 在进程重启后通常仍然保留
+DEFAULT_LOCAL_CACHE_PATH = '/tmp/translations.sqlite3'
+
+# 本地缓存条目的有效期（秒），过期后重新从GitHub读取，以便获取手动修正的翻译
+DEFAULT_LOCAL_CACHE_TTL = 86400
+
+# 第一层：进程内字典，值为 (翻译结果, 写入时间)
+_memory: Dict[str, tuple] = {}
+
+# 第二层：SQLite 连接，首次使用时打开
+_connection: Optional[sqlite3.Connection] = None
+_connection_path: Optional[str] = None
+_lock = threading.Lock()
+
+# 各层命中统计
+_stats = {
+    'memory': {'hits': 0, 'misses': 0},
+    'local': {'hits': 0, 'misses': 0},
+    'shared': {'hits': 0, 'misses': 0},
+    'github': {'hits': 0, 'misses': 0},
+    'translate': {'hits': 0, 'misses': 0},
+}
+
+def _get_ttl() -> float:
+    """读取本地缓存有效期配置（环境变量 LOCAL_CACHE_TTL，单位秒）。"""
+    try:
+        return float(os.getenv('LOCAL_CACHE_TTL', DEFAULT_LOCAL_CACHE_TTL))
+    except ValueError:
+        return float(DEFAULT_LOCAL_CACHE_TTL)
+
+def _get_connection() -> Optional[sqlite3.Connection]:
+    """
+    获取本地SQLite缓存连接。
+
+    LOCAL_CACHE_PATH 设置为空字符串时禁用本地缓存；打开失败时同样返回None，
+    本地缓存不可用不影响正常处理。
+    """
+    global _connection, _connection_path
+
+    path = os.getenv('LOCAL_CACHE_PATH', DEFAULT_LOCAL_CACHE_PATH)
+    if not path:
+        return None
+    if _connection is not None and _connection_path == path:
+        return _connection
+
+    try:
+        connection = sqlite3.connect(path, timeout=1.0, check_same_thread=False, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "source TEXT PRIMARY KEY, translated TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+    except sqlite3.Error as e:
+        print(f"本地缓存不可用: {e}")
+        return None
+
+    if _connection is not None:
+        _connection.close()
+    _connection, _connection_path = connection, path
+    return _connection
+
+def _count(tier: str, hits: int, misses: int) -> None:
+    """更新指定层级的命中统计，并同步到 metrics 计数器。"""
+    _stats[tier]['hits'] += hits
+    _stats[tier]['misses'] += misses
+    metrics.incr(f"cache.{tier}.hits", hits)
+    metrics.incr(f"cache.{tier}.misses", misses)
+
+def lookup(keys: Iterable[str]) -> Dict[str, str]:
+    """
+    依次在进程内字典和本地SQLite缓存中查找翻译。
+
+    SQLite中命中的条目会回填到进程内字典。
+
+    Args:
+        keys (Iterable[str]): 需要查找的原文。
+
+    Returns:
+        Dict[str, str]: 命中的原文到翻译结果的映射。
+    """
+    now = time.time()
+    ttl = _get_ttl()
+    found: Dict[str, str] = {}
+    remaining = []
+
+    for key in dict.fromkeys(keys):
+        entry = _memory.get(key)
+        if entry is not None and now - entry[1] < ttl:
+            found[key] = entry[0]
+        else:
+            remaining.append(key)
+    _count('memory', len(found), len(remaining))
+
+    if not remaining:
+        return found
+
+    local_found: Dict[str, str] = {}
+    with _lock:
+        connection = _get_connection()
+        if connection is not None:
+            try:
+                placeholders = ','.join('?' * len(remaining))
+                rows = connection.execute(
+                    f"SELECT source, translated, updated_at FROM translations WHERE source IN ({placeholders})",
+                    remaining
+                ).fetchall()
+                for source, translated, updated_at in rows:
+                    if now - updated_at < ttl:
+                        local_found[source] = translated
+                        _memory[source] = (translated, updated_at)
+            except sqlite3.Error as e:
+                print(f"读取本地缓存失败: {e}")
+    _count('local', len(local_found), len(remaining) - len(local_found))
+
+    found.update(local_found)
+    return found
+
+def store(entries: Dict[str, str]) -> None:
+    """
+    将翻译写入进程内字典和本地SQLite缓存。
+
+    Args:
+        entries (Dict[str, str]): 原文到翻译结果的映射。
+    """
+    if not entries:
+        return
+
+    now = time.time()
+    for key, value in entries.items():
+        _memory[key] = (value, now)
+
+    with _lock:
+        connection = _get_connection()
+        if connection is None:
+            return
+        try:
+            connection.executemany(
+                "INSERT OR REPLACE INTO translations (source, translated, updated_at) VALUES (?, ?, ?)",
+                [(key, value, now) for key, value in entries.items()]
+            )
+        except sqlite3.Error as e:
+            print(f"写入本地缓存失败: {e}")
+
+def record(tier: str, hits: int, misses: int) -> None:
+    """
+    记录下层（shared、github、translate）的命中统计。
+
+    Args:
+        tier (str): 层级名称。
+        hits (int): 命中数。
+        misses (int): 未命中数。
+    """
+    _count(tier, hits, misses)
+
+def get_cache_stats() -> Dict[str, Dict[str, int]]:
+    """
+    获取各层缓存的命中统计。
+
+    Returns:
+        Dict[str, Dict[str, int]]: memory、local、shared、github、translate 各层的 hits 和 misses。
+    """
+    return {tier: dict(counts) for tier, counts in _stats.items()}
+
+def clear() -> None:
+    """清空进程内字典并关闭SQLite连接（不删除缓存文件）。"""
+    global _connection, _connection_path
+
+    _memory.clear()
+    with _lock:
+        if _connection is not None:
+            _connection.close()
+        _connection, _connection_path = None, None
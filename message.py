@@ -1,14 +1,20 @@
-import requests
 import json
 import os
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+from clients import get_http_session
+import json_codec
+import metrics
+import resilience
 
 # 从环境变量中加载必要的配置信息
 APP_TOKEN = os.getenv('APP_TOKEN')  # WxPusher应用令牌
 UID = os.getenv('UID')  # 接收消息的用户ID
 
+# 接收者的默认语言
+DEFAULT_LANGUAGE = 'zh'
+
 # WxPusher API endpoint
-WXPUSHER_API_URL = 'https://wxpusher.zjiecode.com/api/send/message'
+WXPUSHER_API_URL = os.getenv('WXPUSHER_API_URL', 'https://wxpusher.zjiecode.com/api/send/message')
 
 class WxPusherError(Exception):
     """自定义异常类，用于处理与WxPusher相关的错误"""
@@ -16,13 +22,33 @@ class WxPusherError(Exception):
         self.message = message
         super().__init__(self.message)
 
-def send_message(full_message: str, summary: str) -> Dict[str, str]:
+def get_recipients() -> Dict[str, List[str]]:
+    """
+    读取接收者及其语言。
+
+    环境变量 RECIPIENTS 的格式为 "UID_xxx:zh,UID_yyy:ja,UID_zzz:en"，省略语言时使用默认语言（zh）；
+    未设置时只发送给 UID，使用默认语言。
+
+    Returns:
+        Dict[str, List[str]]: 语言代码到接收者ID列表的映射，按首次出现的顺序排列。
+    """
+    recipients: Dict[str, List[str]] = {}
+    spec = os.getenv('RECIPIENTS', '')
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        uid, _, language = item.partition(':')
+        recipients.setdefault(language.strip() or DEFAULT_LANGUAGE, []).append(uid.strip())
+    if not recipients:
+        recipients[DEFAULT_LANGUAGE] = [UID]
+    return recipients
+
+def send_message(full_message: str, summary: str, uids: Optional[List[str]] = None) -> Dict[str, str]:
     """
     发送消息到WxPusher。
 
     Args:
         full_message (str): 完整的消息内容。
         summary (str): 消息摘要。
+        uids (List[str], optional): 接收消息的用户ID列表，默认为环境变量中的 UID。
 
     Returns:
         dict: 包含发送结果的状态信息。成功时返回包含"success"键的字典；失败时返回包含"error"键的字典。
@@ -30,6 +56,9 @@ def send_message(full_message: str, summary: str) -> Dict[str, str]:
     Raises:
         WxPusherError: 如果发送请求过程中发生特定错误。
     """
+    # 延迟导入，完全命中缓存的调用无需加载requests
+    import requests
+
     try:
         headers = {
             'Content-Type': 'application/json',
@@ -40,12 +69,22 @@ def send_message(full_message: str, summary: str) -> Dict[str, str]:
             "content": full_message,  # 完整的消息内容
             "summary": summary,  # 消息摘要
             "contentType": 3,  # 内容类型，3表示Markdown格式
-            "uids": [UID],  # 接收消息的用户ID列表
+            "uids": uids or [UID],  # 接收消息的用户ID列表
         }
 
-        response = requests.post(WXPUSHER_API_URL, headers=headers, json=payload)
+        body = json_codec.dumps_bytes(payload)
+
+        def post(timeout: float):
+            metrics.incr('wxpusher.requests')
+            return get_http_session().post(WXPUSHER_API_URL, headers=headers, data=body, timeout=timeout)
+
+        response = resilience.call(
+            'wxpusher', post,
+            retry_on=(requests.exceptions.ConnectionError, requests.exceptions.Timeout),
+            retry_if=resilience.is_retryable_response
+        )
         response.raise_for_status()  # 检查HTTP响应状态码是否为200-299范围
-        result = response.json()
+        result = json_codec.loads(response.content)
 
         if result['code'] != 1000:
             # 如果API返回的code不是1000，表示请求失败
@@ -0,0 +1,153 @@
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+# 是否启用耗时统计和计数（环境变量 METRICS_ENABLED，也可通过 enable() 切换）
+_enabled = os.getenv('METRICS_ENABLED', '').lower() in ('1', 'true', 'yes', 'on')
+
+# 当前调用的统计记录，线程池（asyncio.to_thread）中执行的代码共享同一记录
+_current: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar('metrics_current', default=None)
+
+# 进程内累计统计，在热启动的多次调用间累积
+_totals: Dict[str, Any] = {'invocations': 0, 'spans': {}, 'counters': {}}
+_lock = threading.Lock()
+
+class _NullSpan:
+    """未启用统计时使用的空上下文管理器。"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    """记录一个阶段耗时的上下文管理器。"""
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _record_span(self.name, (time.perf_counter() - self.start) * 1000)
+        return False
+
+def enable(flag: bool = True) -> None:
+    """开启或关闭统计。"""
+    global _enabled
+    _enabled = flag
+
+def is_enabled() -> bool:
+    """是否启用统计。"""
+    return _enabled
+
+def span(name: str):
+    """
+    记录一个阶段的耗时，用法为 with metrics.span('open_github_json'): ...
+
+    未启用统计时返回共享的空上下文管理器，几乎没有额外开销。
+
+    Args:
+        name (str): 阶段名称。
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name)
+
+def incr(name: str, value: int = 1) -> None:
+    """
+    增加计数器，例如缓存命中数、API调用次数和重试次数。
+
+    Args:
+        name (str): 计数器名称。
+        value (int): 增加的数量，默认为1。
+    """
+    if not _enabled or not value:
+        return
+    with _lock:
+        _totals['counters'][name] = _totals['counters'].get(name, 0) + value
+        current = _current.get()
+        if current is not None:
+            current['counters'][name] = current['counters'].get(name, 0) + value
+
+def _record_span(name: str, elapsed_ms: float) -> None:
+    """将阶段耗时写入当前调用和累计统计。"""
+    with _lock:
+        total = _totals['spans'].setdefault(name, {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+        total['count'] += 1
+        total['total_ms'] += elapsed_ms
+        total['max_ms'] = max(total['max_ms'], elapsed_ms)
+        current = _current.get()
+        if current is not None:
+            current['spans'][name] = current['spans'].get(name, 0.0) + elapsed_ms
+
+def instrumented(name: str) -> Callable:
+    """
+    装饰入口函数：为每次调用建立统计记录，结束时输出一行结构化JSON日志。
+
+    Args:
+        name (str): 入口函数名称，写入日志的 handler 字段。
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+
+            record = {'spans': {}, 'counters': {}}
+            token = _current.set(record)
+            start = time.perf_counter()
+            status = None
+            try:
+                result = func(*args, **kwargs)
+                if isinstance(result, dict):
+                    status = result.get('statusCode')
+                return result
+            finally:
+                total_ms = (time.perf_counter() - start) * 1000
+                _current.reset(token)
+                with _lock:
+                    _totals['invocations'] += 1
+                print(json.dumps({
+                    'type': 'metrics',
+                    'handler': name,
+                    'status': status,
+                    'total_ms': round(total_ms, 3),
+                    'spans': {key: round(value, 3) for key, value in record['spans'].items()},
+                    'counters': record['counters'],
+                }, ensure_ascii=False))
+        return wrapper
+    return decorator
+
+def snapshot() -> Dict[str, Any]:
+    """
+    获取进程内累计统计。
+
+    Returns:
+        Dict[str, Any]: invocations（调用次数）、spans（各阶段次数、总耗时和最大耗时，毫秒）和 counters（计数器）。
+    """
+    with _lock:
+        return {
+            'invocations': _totals['invocations'],
+            'spans': {key: dict(value) for key, value in _totals['spans'].items()},
+            'counters': dict(_totals['counters']),
+        }
+
+def reset() -> None:
+    """清空累计统计。"""
+    with _lock:
+        _totals['invocations'] = 0
+        _totals['spans'] = {}
+        _totals['counters'] = {}
@@ -0,0 +1,36 @@
+import argparse
+import sys
+from github import migrate_to_shards, GitHubError, DEFAULT_SHARD_DIR
+
+def main(argv=None) -> int:
+    """
+    将单文件翻译存储迁移为分片存储的命令行入口。
+
+    使用与函数相同的环境变量（GITHUB_TOKEN、GITHUB_REPO、GITHUB_FILE）定位源文件。
+    迁移完成后，将函数的 GITHUB_SHARDS 和 GITHUB_SHARD_DIR 设置为相同的值即可启用分片存储。
+
+    Args:
+        argv (list, optional): 命令行参数，默认为 sys.argv[1:]。
+
+    Returns:
+        int: 退出码，0表示成功。
+    """
+    parser = argparse.ArgumentParser(description="将 translations.json 迁移为按哈希分片的多个文件")
+    parser.add_argument('--shards', type=int, required=True, help="分片数量（大于1）")
+    parser.add_argument('--dir', default=DEFAULT_SHARD_DIR, help=f"分片目录，默认为 {DEFAULT_SHARD_DIR}")
+    parser.add_argument('--dry-run', action='store_true', help="只显示每个分片的条目数，不写入GitHub")
+    args = parser.parse_args(argv)
+
+    try:
+        counts = migrate_to_shards(args.shards, args.dir, dry_run=args.dry_run)
+    except GitHubError as e:
+        print(f"迁移失败: {e.message}", file=sys.stderr)
+        return 1
+
+    for path, count in counts.items():
+        print(f"{path}\t{count}")
+    print(f"共 {sum(counts.values())} 条，{len(counts)} 个分片" + ("（未写入）" if args.dry_run else ""))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,114 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable
+import metrics
+
+# 翻译失败后首次跳过翻译接口的时长（秒），同一条目连续失败时加倍，最长为 NEGATIVE_CACHE_TTL
+FAILURE_BASE_SECONDS = 30.0
+DEFAULT_FAILURE_TTL = 3600
+
+# 最多记录的条目数，超出时淘汰最久未使用的条目
+DEFAULT_MAX_ENTRIES = 4096
+
+# 条目类型：failure（翻译失败或结果为空）。翻译结果与原文相同的条目是正常的翻译，与其他翻译一样写入各级缓存和翻译文件
+FAILURE = 'failure'
+
+# 翻译键 -> {'kind': 类型, 'until': 到期时间, 'failures': 连续失败次数, 'reason': 失败原因}
+# 到期的失败条目保留连续失败次数，再次失败时跳过时间继续加倍
+_entries: 'OrderedDict[str, Dict]' = OrderedDict()
+_lock = threading.Lock()
+
+_stats = {'hits': 0, 'failures': 0}
+
+def _get_float_env(name: str, default: float) -> float:
+    """读取浮点类型的环境变量，无效时返回默认值。"""
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+def is_enabled() -> bool:
+    """是否启用负缓存（NEGATIVE_CACHE_TTL 设置为0时禁用）。"""
+    return _get_float_env('NEGATIVE_CACHE_TTL', DEFAULT_FAILURE_TTL) > 0
+
+def _put(key: str, entry: Dict) -> None:
+    """写入条目，超过 NEGATIVE_CACHE_MAX_ENTRIES 时淘汰最久未使用的条目。"""
+    _entries[key] = entry
+    _entries.move_to_end(key)
+    max_entries = int(_get_float_env('NEGATIVE_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES))
+    while len(_entries) > max(1, max_entries):
+        _entries.popitem(last=False)
+
+def lookup(keys: Iterable[str]) -> Dict[str, str]:
+    """
+    查找近期翻译失败的条目，这些条目在有效期内直接使用原文，不调用翻译接口。
+
+    Args:
+        keys (Iterable[str]): 翻译键（见 index.translation_key）。
+
+    Returns:
+        Dict[str, str]: 仍在有效期内的条目到类型（failure）的映射。
+    """
+    if not is_enabled():
+        return {}
+
+    now = time.time()
+    found = {}
+    with _lock:
+        for key in keys:
+            entry = _entries.get(key)
+            if entry is not None and entry['until'] > now:
+                _entries.move_to_end(key)
+                found[key] = entry['kind']
+    if found:
+        _stats['hits'] += len(found)
+        metrics.incr('negative_cache.hits', len(found))
+    return found
+
+def record_failure(keys: Iterable[str], reason: str = '') -> None:
+    """
+    记录翻译失败的条目。跳过时长从 FAILURE_BASE_SECONDS 开始，连续失败时加倍，最长为 NEGATIVE_CACHE_TTL。
+
+    Args:
+        keys (Iterable[str]): 翻译失败的翻译键。
+        reason (str): 失败原因，用于日志。
+    """
+    if not is_enabled():
+        return
+
+    max_ttl = _get_float_env('NEGATIVE_CACHE_TTL', DEFAULT_FAILURE_TTL)
+    now = time.time()
+    count = 0
+    with _lock:
+        for key in keys:
+            previous = _entries.get(key)
+            failures = previous['failures'] + 1 if previous is not None and previous['kind'] == FAILURE else 1
+            ttl = min(max_ttl, FAILURE_BASE_SECONDS * (2 ** (failures - 1)))
+            _put(key, {'kind': FAILURE, 'until': now + ttl, 'failures': failures, 'reason': reason})
+            count += 1
+    if count:
+        _stats['failures'] += count
+        metrics.incr('negative_cache.failures', count)
+
+def forget(keys: Iterable[str]) -> None:
+    """翻译成功后删除条目，清零连续失败次数。"""
+    with _lock:
+        for key in keys:
+            _entries.pop(key, None)
+
+def get_stats() -> Dict[str, int]:
+    """
+    获取负缓存统计。
+
+    Returns:
+        Dict[str, int]: hits（跳过翻译接口的次数）、failures（记录的失败数）和 entries（当前条目数）。
+    """
+    with _lock:
+        return {**_stats, 'entries': len(_entries)}
+
+def clear() -> None:
+    """清空所有条目。"""
+    with _lock:
+        _entries.clear()
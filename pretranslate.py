@@ -0,0 +1,198 @@
+import argparse
+import csv
+import json
+import os
+import sys
+from typing import Dict, List, Optional
+
+import index
+import local_cache
+import negative_cache
+import scheduler
+import shared_cache
+from github import update_json_file, GitHubError
+from translation import translate_batch, TranslationError
+
+# 默认每秒最多发送的翻译请求数
+DEFAULT_RATE = 5.0
+
+def _detect_format(path: str) -> str:
+    """根据扩展名判断输入格式：jsonl、csv 或 text。"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.jsonl', '.ndjson', '.json'):
+        return 'jsonl'
+    if extension == '.csv':
+        return 'csv'
+    return 'text'
+
+def _field_values(item: Dict) -> List[str]:
+    """取出事件或CSV行中需要翻译的字段值。"""
+    return [
+        str(item[field]) for field in index.TRANSLATABLE_FIELDS
+        if item.get(field) not in (None, '')
+    ]
+
+def load_strings(path: str, input_format: Optional[str] = None) -> List[str]:
+    """
+    读取需要预翻译的原文。
+
+    - text：每行一个原文。
+    - csv：包含 monitor_name、monitor_type、monitor_category、monitor_status 中任一列时只读取这些列，
+      否则读取所有单元格。
+    - jsonl：录制的Webhook事件（如 requests.jsonl），每行是事件对象或包含 body 字段的函数计算事件，
+      body 可以是数组或NDJSON；读取其中需要翻译的字段，无法解析的行会被跳过。
+
+    Args:
+        path (str): 输入文件路径。
+        input_format (str, optional): 输入格式，默认根据扩展名判断。
+
+    Returns:
+        List[str]: 去重后的原文，按首次出现的顺序排列。
+    """
+    input_format = input_format or _detect_format(path)
+    values: List[str] = []
+
+    with open(path, encoding='utf-8', newline='') as f:
+        if input_format == 'csv':
+            reader = csv.reader(f)
+            header = next(reader, [])
+            if any(name in index.TRANSLATABLE_FIELDS for name in header):
+                for row in reader:
+                    values.extend(_field_values(dict(zip(header, row))))
+            else:
+                for row in [header, *reader]:
+                    values.extend(cell.strip() for cell in row)
+        elif input_format == 'jsonl':
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    item = json.loads(line)
+                    if isinstance(item, dict) and isinstance(item.get('body'), str):
+                        items, _ = index.parse_events(line)
+                    else:
+                        items = item if isinstance(item, list) else [item]
+                except (ValueError, json.JSONDecodeError):
+                    continue
+                for item in items:
+                    if isinstance(item, dict):
+                        values.extend(_field_values(item))
+        else:
+            values.extend(line.strip() for line in f)
+
+    return list(dict.fromkeys(value for value in values if value))
+
+def _dry_run_translator(requested: Dict[str, str]):
+    """
+    试运行时代替翻译接口：记录需要翻译的条目并原样返回原文，不产生API调用。
+
+    Args:
+        requested (Dict[str, str]): 收集需要翻译的条目（以 translation_key 为键，值为原文）。
+    """
+    def translate(source_texts: List[str], source_language: str = 'en', target_language: str = 'zh') -> Dict[str, str]:
+        for text in source_texts:
+            requested[index.translation_key(text, target_language)] = text
+        return {text: text for text in source_texts}
+
+    return translate
+
+def pretranslate(values: List[str], languages: Optional[List[str]] = None, rate: float = DEFAULT_RATE,
+                 dry_run: bool = False) -> Dict[str, str]:
+    """
+    查找原文在各目标语言下的翻译，返回翻译文件中尚不存在的条目。
+
+    与函数使用相同的查找流程（翻译记忆、GitHub翻译文件），因此写入后函数处理这些原文时不再调用翻译接口。
+    翻译失败的原文不会写入。
+
+    Args:
+        values (List[str]): 原文列表。
+        languages (List[str], optional): 目标语言列表，默认为所有接收者使用的语言。
+        rate (float): 每秒最多发送的翻译请求数。
+        dry_run (bool): 为True时不调用翻译接口，返回需要翻译的条目，值为原文。
+
+    Returns:
+        Dict[str, str]: 需要新增的条目（以 translation_key 为键）。
+
+    Raises:
+        TranslationError: 如果翻译失败。
+        GitHubError: 如果读取翻译文件失败。
+    """
+    requested: Dict[str, str] = {}
+    translator = _dry_run_translator(requested) if dry_run else translate_batch
+    # 翻译请求通过共享的令牌桶限速，每个批量请求消耗一个令牌
+    scheduler.configure('aliyun', rate, burst=1)
+    # 以翻译文件为准重新查找；试运行得到的原文不能留在进程内缓存和负缓存中
+    local_cache.clear()
+    negative_cache.clear()
+    shared_cache.reset()
+    try:
+        _, new_translations = index.lookup_translations(values, languages, translator=translator)
+    finally:
+        if dry_run:
+            local_cache.clear()
+            negative_cache.clear()
+    return requested if dry_run else new_translations
+
+def main(argv=None) -> int:
+    """
+    批量预翻译监控项名称、类型、分类和状态的命令行入口。
+
+    使用与函数相同的环境变量（阿里云密钥、GITHUB_TOKEN、GITHUB_REPO、GITHUB_FILE、GITHUB_SHARDS、RECIPIENTS）。
+    所有新条目合并为一次写入；启用分片存储时每个涉及的分片各提交一次。
+
+    Args:
+        argv (list, optional): 命令行参数，默认为 sys.argv[1:]。
+
+    Returns:
+        int: 退出码，0表示成功。
+    """
+    parser = argparse.ArgumentParser(description="预翻译监控项字段并写入翻译文件")
+    parser.add_argument('inputs', nargs='+', help="输入文件：每行一个原文的文本文件、CSV文件或录制的 requests.jsonl")
+    parser.add_argument('--format', choices=('text', 'csv', 'jsonl'), help="输入格式，默认根据扩展名判断")
+    parser.add_argument('--lang', action='append', dest='languages', help="目标语言，可重复指定，默认为 RECIPIENTS 中的语言")
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE, help=f"每秒最多发送的翻译请求数，默认为 {DEFAULT_RATE:g}，0表示不限速")
+    parser.add_argument('--message', help="提交信息，默认为 COMMIT_MESSAGE")
+    parser.add_argument('--dry-run', action='store_true', help="只列出需要翻译的条目，不调用翻译接口，不写入GitHub")
+    parser.add_argument('--diff', action='store_true', help="调用翻译接口并显示将新增的条目，不写入GitHub")
+    args = parser.parse_args(argv)
+
+    # 预翻译以GitHub中的翻译文件为准，禁用容器本地缓存和共享缓存，避免缓存中已有的条目掩盖文件中缺失的条目；
+    # 同时避免 --diff 和 --dry-run 的结果写入生产实例读取的共享缓存
+    os.environ['LOCAL_CACHE_PATH'] = ''
+    os.environ['SHARED_CACHE_URL'] = ''
+
+    values: List[str] = []
+    for path in args.inputs:
+        values.extend(load_strings(path, args.format))
+    values = list(dict.fromkeys(values))
+
+    try:
+        new_translations = pretranslate(values, args.languages, rate=args.rate, dry_run=args.dry_run)
+    except (TranslationError, GitHubError) as e:
+        print(f"预翻译失败: {e.message}", file=sys.stderr)
+        return 1
+
+    for key, translated in sorted(new_translations.items()):
+        if args.dry_run:
+            print(key)
+        else:
+            print(f"+ {json.dumps(key, ensure_ascii=False)}: {json.dumps(translated, ensure_ascii=False)}")
+
+    summary = f"共 {len(values)} 个原文，新增 {len(new_translations)} 条"
+    if args.dry_run or args.diff or not new_translations:
+        print(summary + ("（未写入）" if new_translations else ""))
+        return 0
+
+    if args.message:
+        os.environ['COMMIT_MESSAGE'] = args.message
+    response = update_json_file(new_translations)
+    if response['statusCode'] != 200:
+        print(f"写入失败: {json.loads(response['body'])['error']}", file=sys.stderr)
+        return 1
+
+    print(summary + "，已写入")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,247 @@
+import contextvars
+import functools
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple, Type, Union
+import metrics
+import scheduler
+
+# 每次调用的总时限（秒），0表示不限制
+DEFAULT_DEADLINE_SECONDS = 8.0
+
+# 单次外部请求的超时上限（秒）和失败后的最大重试次数
+DEFAULT_CALL_TIMEOUT = 5.0
+DEFAULT_MAX_RETRIES = 2
+
+# 为发送消息保留的时间（秒）：翻译和GitHub请求不能占用这部分时间，保证告警按时发出
+DEFAULT_SEND_RESERVE = 2.0
+
+# 剩余时间少于该值（秒）时不再发起请求
+MIN_CALL_TIMEOUT = 0.2
+
+# 重试退避时间（秒）
+RETRY_BACKOFF_BASE = 0.1
+RETRY_BACKOFF_CAP = 1.0
+
+# 熔断：连续失败达到阈值后，在冷却时间内直接跳过该服务；冷却结束后放行一次试探请求
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_SECONDS = 30.0
+
+# 需要重试的HTTP状态码：限流和服务端错误
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# 需要为发送消息预留时间的服务
+_RESERVING_SERVICES = ('github', 'aliyun')
+
+# 当前调用的截止时间（time.monotonic() 的值），None 表示不限制
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar('resilience_deadline', default=None)
+
+# 各服务的熔断状态：{'failures': 连续失败次数, 'opened_at': 熔断开始时间, 'probing': 是否正在试探}
+_circuits: Dict[str, Dict[str, Any]] = {}
+_lock = threading.Lock()
+
+class OutboundError(Exception):
+    """外部请求因时限或熔断未能执行时抛出的异常"""
+    def __init__(self, message):
+        self.message = message
+        super().__init__(self.message)
+
+class DeadlineExceededError(OutboundError):
+    """本次调用的剩余时间不足以发起请求"""
+    pass
+
+class CircuitOpenError(OutboundError):
+    """服务处于熔断状态，请求被跳过"""
+    pass
+
+def _get_float_env(name: str, default: float) -> float:
+    """读取浮点类型的环境变量，无效时返回默认值。"""
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+def remaining() -> Optional[float]:
+    """获取本次调用的剩余时间（秒），未设置时限时返回None。"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+def with_deadline(func: Callable) -> Callable:
+    """
+    装饰入口函数：为每次调用设置总时限（环境变量 HANDLER_DEADLINE_SECONDS）。
+
+    时限通过 contextvars 传递，asyncio.to_thread 中执行的代码共享同一时限。
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        seconds = _get_float_env('HANDLER_DEADLINE_SECONDS', DEFAULT_DEADLINE_SECONDS)
+        if seconds <= 0:
+            return func(*args, **kwargs)
+        token = _deadline.set(time.monotonic() + seconds)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _deadline.reset(token)
+    return wrapper
+
+def _call_timeout(service: str) -> float:
+    """
+    计算下一次请求的超时时间：不超过 OUTBOUND_TIMEOUT_SECONDS，也不超过剩余时间
+    （翻译和GitHub请求还需扣除为发送消息预留的时间）。
+
+    Raises:
+        DeadlineExceededError: 如果剩余时间不足。
+    """
+    timeout = _get_float_env('OUTBOUND_TIMEOUT_SECONDS', DEFAULT_CALL_TIMEOUT)
+    left = remaining()
+    if left is not None:
+        if service in _RESERVING_SERVICES:
+            left -= _get_float_env('SEND_RESERVE_SECONDS', DEFAULT_SEND_RESERVE)
+        if left < MIN_CALL_TIMEOUT:
+            metrics.incr(f"{service}.deadline_exceeded")
+            raise DeadlineExceededError(f"{service} 请求已跳过: 剩余时间不足")
+        timeout = min(timeout, left)
+    return timeout
+
+def _before_call(service: str) -> None:
+    """
+    检查熔断状态。冷却时间结束后只放行一次试探请求。
+
+    Raises:
+        CircuitOpenError: 如果服务处于熔断状态。
+    """
+    with _lock:
+        circuit = _circuits.get(service)
+        if circuit is None or circuit['opened_at'] is None:
+            return
+        cooling = time.monotonic() - circuit['opened_at'] < _get_float_env('CIRCUIT_RESET_SECONDS', DEFAULT_RESET_SECONDS)
+        if cooling or circuit['probing']:
+            metrics.incr(f"{service}.circuit_open")
+            raise CircuitOpenError(f"{service} 请求已跳过: 服务熔断中")
+        circuit['probing'] = True
+
+def _record_success(service: str) -> None:
+    """请求成功，关闭熔断并清零连续失败次数。"""
+    with _lock:
+        circuit = _circuits.get(service)
+        if circuit is not None:
+            circuit.update(failures=0, opened_at=None, probing=False)
+
+def _release_probe(service: str) -> None:
+    """试探请求未实际发出（例如剩余时间不足），放弃试探，下一次调用可以重新试探。"""
+    with _lock:
+        circuit = _circuits.get(service)
+        if circuit is not None:
+            circuit['probing'] = False
+
+def _record_failure(service: str) -> bool:
+    """
+    记录一次失败，连续失败达到 CIRCUIT_FAILURE_THRESHOLD 次或试探失败时打开熔断。
+
+    Returns:
+        bool: 熔断是否已打开。
+    """
+    threshold = int(_get_float_env('CIRCUIT_FAILURE_THRESHOLD', DEFAULT_FAILURE_THRESHOLD))
+    with _lock:
+        circuit = _circuits.setdefault(service, {'failures': 0, 'opened_at': None, 'probing': False})
+        circuit['failures'] += 1
+        if circuit['probing'] or (threshold > 0 and circuit['failures'] >= threshold):
+            if circuit['opened_at'] is None or circuit['probing']:
+                metrics.incr(f"{service}.circuit_opened")
+            circuit.update(opened_at=time.monotonic(), probing=False)
+        return circuit['opened_at'] is not None
+
+def call(service: str, func: Callable[[float], Any],
+         retry_on: Union[Tuple[Type[BaseException], ...], Callable[[BaseException], bool]] = (),
+         retry_if: Optional[Callable[[Any], bool]] = None) -> Any:
+    """
+    在时限、限流和熔断保护下执行一次外部请求，失败时按退避重试。每次尝试前从服务的令牌桶获取令牌，见 scheduler。
+
+    Args:
+        service (str): 服务名称（github、aliyun、wxpusher），用于熔断和计数。
+        func (Callable[[float], Any]): 接收超时时间（秒）并发起请求的函数。
+        retry_on (Tuple[type, ...] | Callable): 需要重试的异常类型（例如连接错误和超时），
+            或判断异常是否需要重试的函数。
+        retry_if (Callable, optional): 根据返回值判断是否需要重试，例如HTTP 5xx和429。
+
+    Returns:
+        Any: func 的返回值。重试用尽时返回最后一次的返回值。
+
+    Raises:
+        CircuitOpenError: 如果服务处于熔断状态。
+        DeadlineExceededError: 如果剩余时间不足以发起请求或等待令牌。
+        Exception: 重试用尽后最后一次请求抛出的异常；不在 retry_on 中的异常直接抛出。
+    """
+    _before_call(service)
+    max_retries = int(_get_float_env('OUTBOUND_MAX_RETRIES', DEFAULT_MAX_RETRIES))
+
+    error: Optional[BaseException] = None
+    result = None
+    for attempt in range(max_retries + 1):
+        try:
+            # 按服务的令牌桶排队，之后再按剩余时间计算超时
+            scheduler.acquire(service)
+            timeout = _call_timeout(service)
+        except DeadlineExceededError:
+            if not attempt:
+                _release_probe(service)
+                raise
+            break
+        if attempt:
+            metrics.incr(f"{service}.retries")
+
+        error = None
+        try:
+            result = func(timeout)
+        except Exception as e:
+            retryable = retry_on(e) if callable(retry_on) else isinstance(e, retry_on)
+            if not retryable:
+                # 其他异常（如4xx响应）说明服务本身可用，不计入熔断
+                _record_success(service)
+                raise
+            error = e
+        else:
+            if retry_if is None or not retry_if(result):
+                _record_success(service)
+                return result
+
+        opened = _record_failure(service)
+        if opened or attempt == max_retries:
+            break
+
+        # 剩余时间不足以等待退避后再次请求时不再重试
+        backoff = random.uniform(0, min(RETRY_BACKOFF_CAP, RETRY_BACKOFF_BASE * (2 ** attempt)))
+        left = remaining()
+        if left is not None and left - backoff < MIN_CALL_TIMEOUT:
+            break
+        time.sleep(backoff)
+
+    if error is not None:
+        raise error
+    return result
+
+def is_retryable_response(response: Any) -> bool:
+    """HTTP响应是否为限流或服务端错误，需要重试。"""
+    return getattr(response, 'status_code', None) in RETRYABLE_STATUS_CODES
+
+def get_circuit_states() -> Dict[str, Dict[str, Any]]:
+    """
+    获取各服务的熔断状态。
+
+    Returns:
+        Dict[str, Dict[str, Any]]: 服务名称到 {'failures': 连续失败次数, 'open': 是否熔断} 的映射。
+    """
+    with _lock:
+        return {
+            service: {'failures': circuit['failures'], 'open': circuit['opened_at'] is not None}
+            for service, circuit in _circuits.items()
+        }
+
+def reset_circuits() -> None:
+    """关闭所有熔断。"""
+    with _lock:
+        _circuits.clear()
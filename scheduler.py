@@ -0,0 +1,251 @@
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, Iterable, Mapping, Optional
+import metrics
+import resilience
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+# 各服务默认的令牌桶配置：每秒请求数和突发容量，0表示不限速。可通过 <服务>_RATE_LIMIT 和 <服务>_RATE_BURST 覆盖
+DEFAULT_RATE_LIMITS = {
+    'aliyun': (20.0, 20.0),
+    'github': (10.0, 20.0),
+}
+
+# GitHub剩余配额低于总配额的该比例时，将剩余配额平均分配到重置之前
+ADAPTIVE_THRESHOLD = 0.1
+
+# 按剩余配额调整后的最低速率（每秒请求数），避免配额重置时间异常时长时间停顿
+MIN_ADAPTIVE_RATE = 0.05
+
+# 服务端限流但未给出等待时间时暂停的秒数
+DEFAULT_THROTTLE_SECONDS = 1.0
+
+# 各服务的令牌桶：{'tokens': 当前令牌数（为负表示已预约的请求）, 'updated': 上次补充时间,
+# 'paused_until': 暂停到的时间, 'adaptive_rate': 按剩余配额调整后的速率}
+_buckets: Dict[str, Dict[str, Any]] = {}
+
+# 通过 configure 设置的速率，优先于环境变量
+_overrides: Dict[str, tuple] = {}
+
+# 正在执行的相同请求：(命名空间, 键) -> Future
+_inflight: Dict[tuple, 'Future'] = {}
+
+_lock = threading.Lock()
+
+def _get_float_env(name: str, default: float) -> float:
+    """读取浮点类型的环境变量，无效时返回默认值。"""
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+def get_limit(service: str) -> tuple:
+    """
+    获取服务的令牌桶配置。
+
+    Returns:
+        tuple: (每秒请求数, 突发容量)。每秒请求数为0表示不限速。
+    """
+    if service in _overrides:
+        return _overrides[service]
+    default_rate, default_burst = DEFAULT_RATE_LIMITS.get(service, (0.0, 1.0))
+    prefix = service.upper()
+    rate = _get_float_env(f"{prefix}_RATE_LIMIT", default_rate)
+    burst = _get_float_env(f"{prefix}_RATE_BURST", default_burst if service in DEFAULT_RATE_LIMITS else max(1.0, rate))
+    return max(0.0, rate), max(1.0, burst)
+
+def configure(service: str, rate: Optional[float], burst: Optional[float] = None) -> None:
+    """
+    覆盖服务的令牌桶配置（例如预翻译命令行的 --rate）。
+
+    Args:
+        service (str): 服务名称。
+        rate (float, optional): 每秒请求数，0表示不限速；为None时恢复使用环境变量。
+        burst (float, optional): 突发容量，默认为1。
+    """
+    with _lock:
+        if rate is None:
+            _overrides.pop(service, None)
+        else:
+            _overrides[service] = (max(0.0, rate), max(1.0, burst or 1.0))
+        _buckets.pop(service, None)
+
+def _get_bucket(service: str, burst: float, now: float) -> Dict[str, Any]:
+    """获取服务的令牌桶，首次使用时装满。"""
+    bucket = _buckets.get(service)
+    if bucket is None:
+        bucket = {'tokens': burst, 'updated': now, 'paused_until': 0.0, 'adaptive_rate': None}
+        _buckets[service] = bucket
+    return bucket
+
+def acquire(service: str) -> None:
+    """
+    在发起请求前获取一个令牌，令牌不足或服务暂停时排队等待。
+
+    请求按获取令牌的先后顺序放行；等待时间超过本次调用的剩余时间时不排队，直接放弃请求。
+
+    Args:
+        service (str): 服务名称（github、aliyun、wxpusher）。
+
+    Raises:
+        DeadlineExceededError: 如果等待令牌的时间超过剩余时间。
+    """
+    rate, burst = get_limit(service)
+    with _lock:
+        now = time.monotonic()
+        bucket = _get_bucket(service, burst, now)
+        if rate <= 0 and bucket['paused_until'] <= now:
+            return
+        if bucket['adaptive_rate'] is not None:
+            rate = min(rate, bucket['adaptive_rate']) if rate > 0 else bucket['adaptive_rate']
+
+        # 暂停期间不补充令牌
+        refill_from = max(bucket['updated'], min(now, bucket['paused_until']))
+        tokens = min(burst, bucket['tokens'] + max(0.0, now - refill_from) * rate)
+        wait = max(0.0, bucket['paused_until'] - now)
+        if tokens < 1:
+            wait += (1 - tokens) / rate if rate > 0 else 0.0
+
+        left = resilience.remaining()
+        if wait > 0 and left is not None and wait > left - resilience.MIN_CALL_TIMEOUT:
+            bucket['tokens'], bucket['updated'] = tokens, now
+            metrics.incr(f"{service}.rate_limited")
+            raise resilience.DeadlineExceededError(f"{service} 请求已跳过: 限流等待时间超过剩余时间")
+
+        # 预约令牌：令牌数可以为负，后来的请求排在已预约的请求之后
+        bucket['tokens'], bucket['updated'] = tokens - 1, now
+
+    if wait > 0:
+        metrics.incr(f"{service}.rate_limit_waits")
+        with metrics.span(f"{service}.rate_limit_wait"):
+            time.sleep(wait)
+
+def pause(service: str, seconds: float) -> None:
+    """服务端限流时暂停该服务的请求，直到等待时间结束。"""
+    with _lock:
+        rate, burst = get_limit(service)
+        bucket = _get_bucket(service, burst, time.monotonic())
+        bucket['paused_until'] = max(bucket['paused_until'], time.monotonic() + max(0.0, seconds))
+    metrics.incr(f"{service}.throttled")
+
+def observe_headers(service: str, headers: Mapping[str, str]) -> None:
+    """
+    根据响应头调整请求速率。
+
+    - Retry-After：暂停指定的秒数（GitHub次级限流和429）。
+    - X-RateLimit-Remaining 为0：暂停到 X-RateLimit-Reset。
+    - 剩余配额低于总配额的 ADAPTIVE_THRESHOLD：将剩余配额平均分配到重置之前；配额充足时恢复配置的速率。
+
+    Args:
+        service (str): 服务名称。
+        headers (Mapping[str, str]): 响应头（大小写不敏感）。
+    """
+    retry_after = headers.get('Retry-After')
+    if retry_after:
+        try:
+            pause(service, float(retry_after))
+        except ValueError:
+            pause(service, DEFAULT_THROTTLE_SECONDS)
+
+    try:
+        remaining = int(headers['X-RateLimit-Remaining'])
+        limit = int(headers.get('X-RateLimit-Limit') or 0)
+        reset_in = float(headers['X-RateLimit-Reset']) - time.time()
+    except (KeyError, TypeError, ValueError):
+        return
+
+    if remaining <= 0 and reset_in > 0:
+        pause(service, reset_in)
+        return
+
+    with _lock:
+        rate, burst = get_limit(service)
+        bucket = _get_bucket(service, burst, time.monotonic())
+        if reset_in > 0 and limit > 0 and remaining < limit * ADAPTIVE_THRESHOLD:
+            bucket['adaptive_rate'] = max(MIN_ADAPTIVE_RATE, remaining / reset_in)
+        else:
+            bucket['adaptive_rate'] = None
+
+def coalesce(namespace: str, keys: Iterable[Hashable], fetch: Callable[[list], Dict[Hashable, Any]]) -> Dict[Hashable, Any]:
+    """
+    合并相同的并发请求：其他线程正在获取的键等待其结果，其余的键由当前线程通过一次 fetch 获取。
+
+    Args:
+        namespace (str): 命名空间，例如 "aliyun:en:zh"，不同命名空间的相同键互不影响。
+        keys (Iterable): 需要获取的键。
+        fetch (Callable[[list], Dict]): 获取一组键的函数，返回 {键: 结果}。
+
+    Returns:
+        Dict: {键: 结果}。fetch 未返回的键不包含在结果中。
+
+    Raises:
+        Exception: fetch 抛出的异常；等待其他线程时抛出该线程 fetch 的异常。
+        DeadlineExceededError: 如果等待其他线程的结果超过本次调用的剩余时间。
+    """
+    # 延迟导入，concurrent.futures 会连带加载 logging，只在实际合并请求时才需要
+    from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+    owned, waiting = [], {}
+    with _lock:
+        for key in dict.fromkeys(keys):
+            future = _inflight.get((namespace, key))
+            if future is None:
+                _inflight[(namespace, key)] = Future()
+                owned.append(key)
+            else:
+                waiting[key] = future
+    if waiting:
+        metrics.incr('scheduler.coalesced', len(waiting))
+
+    results: Dict[Hashable, Any] = {}
+    if owned:
+        try:
+            results = dict(fetch(owned))
+        except BaseException as e:
+            with _lock:
+                futures = [_inflight.pop((namespace, key)) for key in owned]
+            for future in futures:
+                future.set_exception(e)
+            raise
+        with _lock:
+            futures = {key: _inflight.pop((namespace, key)) for key in owned}
+        for key, future in futures.items():
+            future.set_result(results.get(key))
+
+    for key, future in waiting.items():
+        left = resilience.remaining()
+        try:
+            value = future.result(timeout=None if left is None else max(0.0, left))
+        except FutureTimeoutError:
+            raise resilience.DeadlineExceededError(f"{namespace} 等待相同请求的结果超时")
+        if value is not None:
+            results[key] = value
+    return results
+
+def get_states() -> Dict[str, Dict[str, Any]]:
+    """
+    获取各服务的限流状态。
+
+    Returns:
+        Dict[str, Dict[str, Any]]: 服务名称到 {'tokens': 可用令牌数, 'paused_for': 剩余暂停秒数,
+            'adaptive_rate': 按剩余配额调整后的速率} 的映射。
+    """
+    now = time.monotonic()
+    with _lock:
+        return {
+            service: {
+                'tokens': round(bucket['tokens'], 3),
+                'paused_for': round(max(0.0, bucket['paused_until'] - now), 3),
+                'adaptive_rate': bucket['adaptive_rate'],
+            }
+            for service, bucket in _buckets.items()
+        }
+
+def reset() -> None:
+    """清空所有令牌桶和配置覆盖。"""
+    with _lock:
+        _buckets.clear()
+        _overrides.clear()
@@ -0,0 +1,413 @@
+import argparse
+import asyncio
+import base64
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+import clients
+import digest
+import github
+import index
+import local_cache
+import metrics
+import negative_cache
+import resilience
+import scheduler
+import shared_cache
+import spool
+import translation_memory
+
+# 默认监听地址和端口（函数计算自定义运行时同样使用9000端口）
+DEFAULT_HOST = '0.0.0.0'
+DEFAULT_PORT = 9000
+
+# 处理模式：thread（线程池中运行 index.handler）或 async（共享事件循环中运行 index.handle_event_async）
+SERVER_MODES = ('thread', 'async')
+DEFAULT_MODE = 'thread'
+
+# 同时处理的Webhook数量，以及等待处理的最大请求数；超出时直接返回503，由负载均衡或HetrixTools重试
+DEFAULT_WORKERS = 16
+DEFAULT_MAX_PENDING = 64
+
+# 请求body的最大字节数
+DEFAULT_MAX_BODY_BYTES = 1024 * 1024
+
+# 长连接的空闲超时（秒）
+DEFAULT_KEEPALIVE_SECONDS = 5.0
+
+# 优雅退出时等待处理中请求完成的最长时间（秒），应大于 HANDLER_DEADLINE_SECONDS
+DEFAULT_SHUTDOWN_TIMEOUT = 15.0
+
+# 后台维护间隔（秒）：发送到期摘要、重发失败消息、提交写回缓冲区
+DEFAULT_MAINTENANCE_SECONDS = 15.0
+
+class WebhookServer(ThreadingHTTPServer):
+    """
+    常驻的Webhook服务器。
+
+    每个连接由独立线程读写，Webhook的处理由固定大小的工作池执行：thread 模式为线程池，
+    async 模式为共享事件循环（并发数由信号量限制）。翻译缓存、HTTP连接池和熔断状态在进程内共享，
+    不会因冷启动而丢失。
+    """
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address: Tuple[str, int], mode: str = DEFAULT_MODE, workers: int = DEFAULT_WORKERS,
+                 max_pending: int = DEFAULT_MAX_PENDING, max_body_bytes: int = DEFAULT_MAX_BODY_BYTES,
+                 keepalive_seconds: float = DEFAULT_KEEPALIVE_SECONDS):
+        if mode not in SERVER_MODES:
+            raise ValueError(f"无效的处理模式: {mode}")
+        super().__init__(address, _make_request_handler(keepalive_seconds))
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.max_body_bytes = max_body_bytes
+        self.draining = False
+        self._slots = threading.BoundedSemaphore(self.workers + max(0, max_pending))
+        self._inflight = 0
+        self._inflight_lock = threading.Condition()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._loop_executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        if mode == 'thread':
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='webhook')
+        else:
+            self._start_loop()
+
+    def _start_loop(self) -> None:
+        """启动 async 模式使用的事件循环线程。asyncio.to_thread 使用的线程池与工作数相匹配。"""
+        self._loop = asyncio.new_event_loop()
+        # 每个事件最多同时有两个 to_thread 调用（发送通知与提交翻译并行）
+        self._loop_executor = ThreadPoolExecutor(max_workers=self.workers * 2, thread_name_prefix='webhook-io')
+        self._loop.set_default_executor(self._loop_executor)
+        self._semaphore = asyncio.Semaphore(self.workers)
+        self._loop_thread = threading.Thread(target=self._loop.run_forever, name='webhook-loop', daemon=True)
+        self._loop_thread.start()
+
+    def try_acquire(self) -> bool:
+        """占用一个处理名额。正在退出或等待处理的请求已满时返回False。"""
+        if self.draining or not self._slots.acquire(blocking=False):
+            return False
+        with self._inflight_lock:
+            self._inflight += 1
+        return True
+
+    def release(self) -> None:
+        """释放处理名额。"""
+        self._slots.release()
+        with self._inflight_lock:
+            self._inflight -= 1
+            self._inflight_lock.notify_all()
+
+    @property
+    def inflight(self) -> int:
+        """正在处理或等待处理的Webhook数量。"""
+        return self._inflight
+
+    def dispatch(self, event: str) -> Dict[str, Any]:
+        """
+        在工作池中处理一次Webhook事件。
+
+        Args:
+            event (str): 与函数计算HTTP触发器格式相同的事件字符串。
+
+        Returns:
+            Dict[str, Any]: 入口函数的响应结果。
+        """
+        if self._executor is not None:
+            return self._executor.submit(index.handler, event, None).result()
+        return _dispatch_async(self, event)
+
+    async def _handle_async(self, event: str) -> Dict[str, Any]:
+        """在事件循环中处理事件，同时处理的数量不超过工作数。"""
+        async with self._semaphore:
+            return await index.handle_event_async(event, None)
+
+    def wait_idle(self, timeout: float) -> bool:
+        """
+        等待所有处理中的请求完成。
+
+        Returns:
+            bool: 是否在超时前全部完成。
+        """
+        deadline = time.monotonic() + timeout
+        with self._inflight_lock:
+            while self._inflight > 0:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    return False
+                self._inflight_lock.wait(left)
+        return True
+
+    def close_workers(self) -> None:
+        """关闭工作池和事件循环。"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join(timeout=5)
+            self._loop_executor.shutdown(wait=True)
+            self._loop.close()
+
+@metrics.instrumented('server_async')
+@resilience.with_deadline
+def _dispatch_async(server: WebhookServer, event: str) -> Dict[str, Any]:
+    """
+    将事件提交到共享事件循环并等待结果。
+
+    run_coroutine_threadsafe 创建的任务继承调用线程的上下文，因此时限和统计记录在事件循环中同样生效。
+    """
+    return asyncio.run_coroutine_threadsafe(server._handle_async(event), server._loop).result()
+
+def build_event(body: bytes, headers: Dict[str, str], path: str) -> str:
+    """
+    将HTTP请求转换为函数计算HTTP触发器格式的事件字符串，交给 index 的入口函数处理。
+
+    Args:
+        body (bytes): 请求body。
+        headers (Dict[str, str]): 请求头。
+        path (str): 请求路径。
+
+    Returns:
+        str: 事件字符串。body 不是有效的UTF-8时使用Base64编码。
+    """
+    try:
+        text, encoded = body.decode('utf-8'), False
+    except UnicodeDecodeError:
+        text, encoded = base64.b64encode(body).decode('ascii'), True
+    return json.dumps({
+        'body': text,
+        'isBase64Encoded': encoded,
+        'headers': headers,
+        'path': path,
+        'httpMethod': 'POST'
+    }, ensure_ascii=False)
+
+def _make_request_handler(keepalive_seconds: float):
+    """创建请求处理类。"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+        timeout = keepalive_seconds
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, body: str, headers: Optional[Dict[str, str]] = None) -> None:
+            data = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            if self.server.draining:
+                # 退出期间关闭长连接，负载均衡会将后续请求转发到其他实例
+                self.send_header('Connection', 'close')
+                self.close_connection = True
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _send_json(self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None) -> None:
+            self._send(status, json.dumps(payload, ensure_ascii=False), headers)
+
+        def do_GET(self):
+            path = self.path.split('?', 1)[0]
+            if path == '/healthz':
+                return self._send_json(503 if self.server.draining else 200, get_health(self.server))
+            if path == '/metrics':
+                return self._send_json(200, get_server_metrics())
+            self._send_json(404, {'error': 'Not Found'})
+
+        def do_POST(self):
+            try:
+                length = int(self.headers.get('Content-Length') or 0)
+            except ValueError:
+                length = -1
+            if length < 0 or length > self.server.max_body_bytes:
+                self.close_connection = True
+                return self._send_json(413, {'error': '请求body过大或长度无效'})
+            body = self.rfile.read(length) if length else b''
+
+            if not self.server.try_acquire():
+                return self._send_json(503, {'error': '服务繁忙或正在退出，请稍后重试'}, {'Retry-After': '1'})
+            try:
+                result = self.server.dispatch(build_event(body, dict(self.headers), self.path))
+            except Exception as e:
+                result = {'statusCode': 500, 'body': json.dumps({'error': f"服务器处理异常: {str(e)}"})}
+            finally:
+                self.server.release()
+
+            if 'statusCode' not in result:
+                # 入口函数原样返回的事件内容
+                return self._send_json(200, result)
+            body_text = result.get('body', '')
+            self._send(result['statusCode'], body_text if isinstance(body_text, str) else json.dumps(body_text))
+
+    return Handler
+
+def get_health(server: WebhookServer) -> Dict[str, Any]:
+    """
+    获取服务器状态，用于负载均衡的健康检查。
+
+    Returns:
+        Dict[str, Any]: status（ok 或 draining）、处理模式、工作数、处理中的请求数、待重发消息数和熔断状态。
+    """
+    return {
+        'status': 'draining' if server.draining else 'ok',
+        'mode': server.mode,
+        'workers': server.workers,
+        'inflight': server.inflight,
+        'spool_pending': spool.pending_count(),
+        'circuits': resilience.get_circuit_states(),
+    }
+
+def get_server_metrics() -> Dict[str, Any]:
+    """
+    获取进程内累计统计：调用耗时和计数器（需启用 METRICS_ENABLED）、各级翻译缓存命中、共享缓存、翻译记忆和负缓存命中以及各服务的限流状态。
+    """
+    return {
+        'metrics': metrics.snapshot(),
+        'cache': local_cache.get_cache_stats(),
+        'shared_cache': shared_cache.get_stats(),
+        'translation_memory': translation_memory.get_stats(),
+        'negative_cache': negative_cache.get_stats(),
+        'github_writes': github.get_write_stats(),
+        'rate_limits': scheduler.get_states(),
+    }
+
+def run_maintenance() -> None:
+    """发送到期的摘要、重发失败的消息并按阈值提交写回缓冲区，失败只记录日志。"""
+    for name, task in (('digest_handler', lambda: index.digest_handler(None, None)),
+                       ('spool_handler', lambda: index.spool_handler(None, None)),
+                       ('flush_json_updates', github.flush_json_updates)):
+        try:
+            task()
+        except Exception as e:
+            print(f"后台任务 {name} 失败: {e}")
+
+def warm_up() -> None:
+    """
+    启动时预热：建立共享的HTTP会话，并将翻译文件（启用分片存储时为所有分片）读入进程内缓存。
+    共享缓存可用时只建立其连接，不预先读取翻译文件。读取失败不影响启动，首次请求时再读取。
+    """
+    clients.get_http_session()
+    if shared_cache.ping():
+        return
+    try:
+        github.open_github_json()
+    except github.GitHubError as e:
+        print(f"预热翻译文件失败: {e.message}")
+
+def _get_env(name: str, default, cast):
+    """读取环境变量并转换类型，无效时返回默认值。"""
+    try:
+        return cast(os.getenv(name, default))
+    except ValueError:
+        return default
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, mode: str = DEFAULT_MODE,
+          workers: int = DEFAULT_WORKERS, max_pending: int = DEFAULT_MAX_PENDING,
+          shutdown_timeout: float = DEFAULT_SHUTDOWN_TIMEOUT,
+          maintenance_seconds: float = DEFAULT_MAINTENANCE_SECONDS, warm: bool = True) -> int:
+    """
+    启动服务器并阻塞运行，收到 SIGTERM 或 SIGINT 后优雅退出。
+
+    退出时先停止接受新请求（健康检查返回503），等待处理中的请求完成（最多 shutdown_timeout 秒），
+    然后发送所有窗口中的摘要并提交写回缓冲区。
+
+    Returns:
+        int: 退出码，0表示所有请求已处理完成。
+    """
+    # 共享连接池的连接数与工作数匹配，避免并发请求时连接池溢出后丢弃连接
+    os.environ.setdefault('HTTP_POOL_MAXSIZE', str(max(workers, 10)))
+    # 常驻进程由后台线程发送到期摘要并在退出前发送所有窗口，未设置 SPOOL_DIR 时也可以使用进程内窗口
+    digest.enable_memory_windows()
+
+    server = WebhookServer((host, port), mode=mode, workers=workers, max_pending=max_pending,
+                           keepalive_seconds=_get_env('SERVER_KEEPALIVE_SECONDS', DEFAULT_KEEPALIVE_SECONDS, float),
+                           max_body_bytes=_get_env('SERVER_MAX_BODY_BYTES', DEFAULT_MAX_BODY_BYTES, int))
+    if warm:
+        warm_up()
+
+    stopping = threading.Event()
+
+    def request_shutdown(signum=None, frame=None):
+        if stopping.is_set():
+            return
+        stopping.set()
+        server.draining = True
+        # shutdown() 会等待 serve_forever 返回，不能在主线程的信号处理函数中直接调用
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, request_shutdown)
+    signal.signal(signal.SIGINT, request_shutdown)
+
+    def maintenance_loop():
+        while not stopping.wait(maintenance_seconds):
+            run_maintenance()
+
+    if maintenance_seconds > 0:
+        threading.Thread(target=maintenance_loop, name='webhook-maintenance', daemon=True).start()
+
+    print(json.dumps({'type': 'server', 'event': 'started', 'host': host, 'port': server.server_port,
+                      'mode': mode, 'workers': server.workers}))
+    try:
+        server.serve_forever()
+    finally:
+        request_shutdown()
+        idle = server.wait_idle(shutdown_timeout)
+        server.server_close()
+        server.close_workers()
+        _flush_on_shutdown()
+        print(json.dumps({'type': 'server', 'event': 'stopped', 'inflight': server.inflight}))
+    return 0 if idle else 1
+
+def _flush_on_shutdown() -> None:
+    """退出前发送所有窗口中的摘要并提交写回缓冲区中的翻译。"""
+    try:
+        index.flush_digests(force=True)
+    except Exception as e:
+        print(f"退出时发送摘要失败: {e}")
+    try:
+        github.flush_json_updates(force=True)
+    except Exception as e:
+        print(f"退出时提交翻译失败: {e}")
+
+def main(argv=None) -> int:
+    """
+    常驻服务器的命令行入口。参数默认值来自环境变量，其余配置（密钥、GitHub、RECIPIENTS等）与函数相同。
+    """
+    parser = argparse.ArgumentParser(description="以常驻HTTP服务器方式运行Webhook处理")
+    parser.add_argument('--host', default=os.getenv('SERVER_HOST', DEFAULT_HOST), help=f"监听地址，默认为 {DEFAULT_HOST}")
+    parser.add_argument('--port', type=int, default=_get_env('SERVER_PORT', DEFAULT_PORT, int), help=f"监听端口，默认为 {DEFAULT_PORT}")
+    parser.add_argument('--mode', choices=SERVER_MODES, default=os.getenv('SERVER_MODE', DEFAULT_MODE),
+                        help="处理模式：thread（线程池）或 async（共享事件循环），默认为 thread")
+    parser.add_argument('--workers', type=int, default=_get_env('SERVER_WORKERS', DEFAULT_WORKERS, int),
+                        help=f"同时处理的Webhook数量，默认为 {DEFAULT_WORKERS}")
+    parser.add_argument('--max-pending', type=int, default=_get_env('SERVER_MAX_PENDING', DEFAULT_MAX_PENDING, int),
+                        help=f"等待处理的最大请求数，超出时返回503，默认为 {DEFAULT_MAX_PENDING}")
+    parser.add_argument('--shutdown-timeout', type=float,
+                        default=_get_env('SERVER_SHUTDOWN_TIMEOUT', DEFAULT_SHUTDOWN_TIMEOUT, float),
+                        help=f"退出时等待处理中请求的最长时间（秒），默认为 {DEFAULT_SHUTDOWN_TIMEOUT:g}")
+    parser.add_argument('--maintenance-seconds', type=float,
+                        default=_get_env('SERVER_MAINTENANCE_SECONDS', DEFAULT_MAINTENANCE_SECONDS, float),
+                        help=f"后台发送摘要、重发消息和提交翻译的间隔（秒），0表示禁用，默认为 {DEFAULT_MAINTENANCE_SECONDS:g}")
+    parser.add_argument('--no-warm', action='store_true', help="启动时不预热翻译文件")
+    args = parser.parse_args(argv)
+
+    return serve(args.host, args.port, mode=args.mode, workers=args.workers, max_pending=args.max_pending,
+                 shutdown_timeout=args.shutdown_timeout, maintenance_seconds=args.maintenance_seconds,
+                 warm=not args.no_warm)
+
+if __name__ == '__main__':
+    sys.exit(main())
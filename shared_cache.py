@@ -0,0 +1,417 @@
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+from urllib.parse import unquote, urlparse
+import metrics
+import resilience
+
+# 共享缓存中翻译键的前缀，多个部署共用同一个Redis时用于区分
+DEFAULT_KEY_PREFIX = 'hetrix:translations:'
+
+# 共享缓存条目的有效期（秒），与本地缓存一致，过期后重新从GitHub读取以获取手动修正的翻译；0表示不过期
+DEFAULT_TTL = 86400
+
+# 单次请求（含建立连接）的超时时间（秒）。共享缓存应在亚毫秒内响应，超时即跳过该层
+DEFAULT_TIMEOUT = 0.2
+
+# 请求失败后跳过共享缓存的时长（秒），避免缓存服务不可用时每次调用都等待超时
+DEFAULT_RETRY_SECONDS = 30.0
+
+# 每个后端保留的空闲连接数
+DEFAULT_MAX_IDLE = 8
+
+# 单个 MGET 或流水线请求包含的最多键数
+BATCH_SIZE = 500
+
+class SharedCacheError(Exception):
+    """自定义异常类，用于共享缓存相关的错误"""
+    def __init__(self, message):
+        self.message = message
+        super().__init__(self.message)
+
+class CacheBackend:
+    """
+    共享缓存后端接口。
+
+    实现 get_many 和 set_many，请求失败时抛出 SharedCacheError；调用方负责计时、统计和失败后的跳过。
+    """
+    name = 'none'
+
+    def get_many(self, keys: List[str]) -> Dict[str, str]:
+        """批量读取，返回命中的 {键: 值}。"""
+        raise NotImplementedError
+
+    def set_many(self, entries: Dict[str, str], ttl: float) -> None:
+        """批量写入，ttl 为0时不过期。"""
+        raise NotImplementedError
+
+    def ping(self) -> None:
+        """检查后端是否可用。"""
+
+    def close(self) -> None:
+        """关闭连接。"""
+
+class NullBackend(CacheBackend):
+    """未配置共享缓存时使用的空后端：不命中，不写入。"""
+    name = 'none'
+
+    def get_many(self, keys: List[str]) -> Dict[str, str]:
+        return {}
+
+    def set_many(self, entries: Dict[str, str], ttl: float) -> None:
+        pass
+
+class _RespError(str):
+    """Redis 返回的错误响应，在流水线读完所有响应后再抛出。"""
+
+class RedisBackend(CacheBackend):
+    """
+    使用Redis协议（RESP）的后端，兼容 Redis、Valkey、KeyDB 以及阿里云Tair等服务。
+
+    直接通过套接字发送命令，不依赖 redis 包；连接在调用间复用。
+    地址格式为 redis://[[用户名]:密码@]主机[:端口][/数据库]，rediss:// 使用TLS。
+    """
+    name = 'redis'
+
+    def __init__(self, url: str):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or '127.0.0.1'
+        self.port = parsed.port or 6379
+        self.username = unquote(parsed.username) if parsed.username else None
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.strip('/') or 0)
+        self.tls = parsed.scheme == 'rediss'
+        self._idle: List[tuple] = []
+        self._lock = threading.Lock()
+
+    def _timeout(self) -> float:
+        """请求超时时间，受本次调用的剩余时间限制。"""
+        timeout = _get_float_env('SHARED_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+        left = resilience.remaining()
+        if left is not None:
+            timeout = min(timeout, max(0.01, left))
+        return timeout
+
+    def _connect(self, timeout: float) -> tuple:
+        """建立连接并完成认证和数据库选择，返回 (套接字, 读取缓冲)。"""
+        # 延迟导入，只有配置了共享缓存并实际发起请求时才加载socket
+        import socket
+
+        sock = socket.create_connection((self.host, self.port), timeout=timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if self.tls:
+            # 延迟导入，只有使用TLS连接时才加载ssl
+            import ssl
+            sock = ssl.create_default_context().wrap_socket(sock, server_hostname=self.host)
+        connection = (sock, sock.makefile('rb'))
+
+        handshake = []
+        if self.password is not None:
+            handshake.append(('AUTH', self.username, self.password) if self.username else ('AUTH', self.password))
+        if self.db:
+            handshake.append(('SELECT', str(self.db)))
+        if handshake:
+            try:
+                self._send(connection, handshake)
+            except BaseException:
+                self._discard(connection)
+                raise
+        return connection
+
+    def _discard(self, connection: tuple) -> None:
+        """关闭连接，忽略关闭时的错误。"""
+        for item in reversed(connection):
+            try:
+                item.close()
+            except OSError:
+                pass
+
+    def _send(self, connection: tuple, commands: List[tuple]) -> list:
+        """在一个连接上以流水线方式发送命令并读取所有响应。"""
+        sock, reader = connection
+        payload = bytearray()
+        for command in commands:
+            args = [arg.encode('utf-8') if isinstance(arg, str) else arg for arg in command if arg is not None]
+            payload += b'*%d\r\n' % len(args)
+            for arg in args:
+                payload += b'$%d\r\n%s\r\n' % (len(arg), arg)
+        sock.sendall(payload)
+        replies = [_read_reply(reader) for _ in commands]
+        errors = [reply for reply in replies if isinstance(reply, _RespError)]
+        if errors:
+            raise SharedCacheError(f"共享缓存返回错误: {errors[0]}")
+        return replies
+
+    def execute(self, commands: List[tuple]) -> list:
+        """
+        以流水线方式执行一组命令。
+
+        Args:
+            commands (List[tuple]): 命令及参数，例如 [('GET', 'key')]。
+
+        Returns:
+            list: 各命令的响应。
+
+        空闲连接可能已被服务端关闭（Redis timeout、SLB/NAT空闲回收或函数实例冻结），
+        此时关闭该连接并使用新连接重试一次；超时不重试。
+
+        Raises:
+            SharedCacheError: 如果连接失败、超时或任一命令返回错误。
+        """
+        timeout = self._timeout()
+        with self._lock:
+            connection = self._idle.pop() if self._idle else None
+        while True:
+            reused = connection is not None
+            try:
+                if connection is None:
+                    connection = self._connect(timeout)
+                connection[0].settimeout(timeout)
+                replies = self._send(connection, commands)
+            except SharedCacheError:
+                # 命令返回错误时已读完所有响应，连接仍然可用
+                self._release(connection)
+                raise
+            except (OSError, ValueError) as e:
+                if connection is not None:
+                    self._discard(connection)
+                    connection = None
+                if reused and isinstance(e, OSError) and not isinstance(e, TimeoutError):
+                    metrics.incr('shared_cache.reconnects')
+                    continue
+                raise SharedCacheError(f"共享缓存请求失败: {e}") from e
+            self._release(connection)
+            return replies
+
+    def _release(self, connection: Optional[tuple]) -> None:
+        """将连接放回空闲列表，超过 SHARED_CACHE_MAX_IDLE 时关闭。"""
+        if connection is None:
+            return
+        with self._lock:
+            if len(self._idle) < int(_get_float_env('SHARED_CACHE_MAX_IDLE', DEFAULT_MAX_IDLE)):
+                self._idle.append(connection)
+                return
+        self._discard(connection)
+
+    def get_many(self, keys: List[str]) -> Dict[str, str]:
+        found = {}
+        for start in range(0, len(keys), BATCH_SIZE):
+            batch = keys[start:start + BATCH_SIZE]
+            values = self.execute([('MGET',) + tuple(batch)])[0] or []
+            for key, value in zip(batch, values):
+                if value is not None:
+                    found[key] = value.decode('utf-8')
+        return found
+
+    def set_many(self, entries: Dict[str, str], ttl: float) -> None:
+        expiry = ('EX', str(int(ttl))) if ttl > 0 else ()
+        items = list(entries.items())
+        for start in range(0, len(items), BATCH_SIZE):
+            self.execute([('SET', key, value) + expiry for key, value in items[start:start + BATCH_SIZE]])
+
+    def ping(self) -> None:
+        self.execute([('PING',)])
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            self._discard(connection)
+
+def _read_reply(reader):
+    """
+    读取一个RESP响应。错误响应以 _RespError 返回，由调用方在读完流水线后处理。
+
+    Raises:
+        ConnectionError: 如果连接已关闭。
+        ValueError: 如果响应无法解析。
+    """
+    line = reader.readline()
+    if not line.endswith(b'\r\n'):
+        raise ConnectionError("连接已关闭")
+    prefix, payload = line[:1], line[1:-2]
+    if prefix == b'+':
+        return payload.decode('utf-8')
+    if prefix == b'-':
+        return _RespError(payload.decode('utf-8', 'replace'))
+    if prefix == b':':
+        return int(payload)
+    if prefix == b'$':
+        length = int(payload)
+        if length < 0:
+            return None
+        data = reader.read(length + 2)
+        if len(data) != length + 2:
+            raise ConnectionError("连接已关闭")
+        return data[:-2]
+    if prefix == b'*':
+        count = int(payload)
+        return None if count < 0 else [_read_reply(reader) for _ in range(count)]
+    raise ValueError(f"无法解析的响应: {line[:32]!r}")
+
+# 地址协议到后端的映射，可通过 register_backend 扩展
+BACKENDS: Dict[str, Callable[[str], CacheBackend]] = {
+    'redis': RedisBackend,
+    'rediss': RedisBackend,
+}
+
+# 当前使用的后端及其地址，SHARED_CACHE_URL 变化时重新创建
+_backend: Optional[CacheBackend] = None
+_backend_url: Optional[str] = None
+_disabled_until = 0.0
+_lock = threading.Lock()
+
+_stats = {'hits': 0, 'misses': 0, 'writes': 0, 'errors': 0, 'skipped': 0}
+
+def _get_float_env(name: str, default: float) -> float:
+    """读取浮点类型的环境变量，无效时返回默认值。"""
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+def register_backend(scheme: str, factory: Callable[[str], CacheBackend]) -> None:
+    """
+    注册共享缓存后端。
+
+    Args:
+        scheme (str): SHARED_CACHE_URL 的协议，例如 "memcached"。
+        factory (Callable[[str], CacheBackend]): 根据地址创建后端的函数。
+    """
+    BACKENDS[scheme] = factory
+    reset()
+
+def get_backend() -> CacheBackend:
+    """
+    获取共享缓存后端。
+
+    SHARED_CACHE_URL 为空（默认）时使用 NullBackend；协议未注册时打印错误并同样使用 NullBackend。
+    """
+    global _backend, _backend_url
+
+    url = os.getenv('SHARED_CACHE_URL', '')
+    if _backend is not None and _backend_url == url:
+        return _backend
+
+    with _lock:
+        if _backend is None or _backend_url != url:
+            if _backend is not None:
+                _backend.close()
+            backend: CacheBackend = NullBackend()
+            if url:
+                scheme = urlparse(url).scheme
+                factory = BACKENDS.get(scheme)
+                if factory is None:
+                    print(f"不支持的共享缓存协议: {scheme}")
+                else:
+                    try:
+                        backend = factory(url)
+                    except ValueError as e:
+                        print(f"共享缓存地址无效: {e}")
+            _backend, _backend_url = backend, url
+        return _backend
+
+def is_enabled() -> bool:
+    """是否配置了共享缓存。"""
+    return not isinstance(get_backend(), NullBackend)
+
+def _available(backend: CacheBackend) -> bool:
+    """后端已配置，且不在失败后的跳过期内。"""
+    if isinstance(backend, NullBackend):
+        return False
+    if time.monotonic() < _disabled_until:
+        _stats['skipped'] += 1
+        metrics.incr('shared_cache.skipped')
+        return False
+    return True
+
+def _record_error(error: SharedCacheError) -> None:
+    """请求失败后在 SHARED_CACHE_RETRY_SECONDS 内跳过共享缓存。"""
+    global _disabled_until
+
+    _disabled_until = time.monotonic() + _get_float_env('SHARED_CACHE_RETRY_SECONDS', DEFAULT_RETRY_SECONDS)
+    _stats['errors'] += 1
+    metrics.incr('shared_cache.errors')
+    print(f"共享缓存不可用，暂时跳过: {error.message}")
+
+def lookup(keys: Iterable[str]) -> Dict[str, str]:
+    """
+    在共享缓存中查找翻译。未配置或不可用时返回空字典，不影响正常处理。
+
+    Args:
+        keys (Iterable[str]): 翻译键（见 index.translation_key）。
+
+    Returns:
+        Dict[str, str]: 命中的翻译键到翻译结果的映射。
+    """
+    keys = list(dict.fromkeys(keys))
+    backend = get_backend()
+    if not keys or not _available(backend):
+        return {}
+
+    prefix = os.getenv('SHARED_CACHE_PREFIX', DEFAULT_KEY_PREFIX)
+    try:
+        with metrics.span('shared_cache.lookup'):
+            values = backend.get_many([prefix + key for key in keys])
+    except SharedCacheError as e:
+        _record_error(e)
+        return {}
+
+    found = {key: values[prefix + key] for key in keys if prefix + key in values}
+    _stats['hits'] += len(found)
+    _stats['misses'] += len(keys) - len(found)
+    return found
+
+def store(entries: Dict[str, str]) -> None:
+    """
+    将翻译写入共享缓存，其他实例随即可以读取。未配置或不可用时忽略。
+
+    Args:
+        entries (Dict[str, str]): 翻译键到翻译结果的映射。
+    """
+    backend = get_backend()
+    if not entries or not _available(backend):
+        return
+
+    prefix = os.getenv('SHARED_CACHE_PREFIX', DEFAULT_KEY_PREFIX)
+    ttl = _get_float_env('SHARED_CACHE_TTL', DEFAULT_TTL)
+    try:
+        with metrics.span('shared_cache.store'):
+            backend.set_many({prefix + key: value for key, value in entries.items()}, ttl)
+    except SharedCacheError as e:
+        _record_error(e)
+        return
+    _stats['writes'] += len(entries)
+    metrics.incr('shared_cache.writes', len(entries))
+
+def ping() -> bool:
+    """检查共享缓存是否可用（用于启动预热），同时建立连接。未配置时返回False。"""
+    backend = get_backend()
+    if not _available(backend):
+        return False
+    try:
+        backend.ping()
+    except SharedCacheError as e:
+        _record_error(e)
+        return False
+    return True
+
+def get_stats() -> Dict[str, object]:
+    """
+    获取共享缓存统计。
+
+    Returns:
+        Dict[str, object]: backend（后端名称）、hits、misses、writes（写入条数）、errors（失败次数）
+            和 skipped（失败后跳过的次数）。
+    """
+    return {'backend': get_backend().name, **_stats}
+
+def reset() -> None:
+    """关闭连接并清除失败状态，下一次使用时按 SHARED_CACHE_URL 重新创建后端。"""
+    global _backend, _backend_url, _disabled_until
+
+    with _lock:
+        if _backend is not None:
+            _backend.close()
+        _backend, _backend_url, _disabled_until = None, None, 0.0
@@ -0,0 +1,244 @@
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+import metrics
+
+# 重发队列所在目录，默认不启用。队列替代 HetrixTools 的重试（发送失败时返回202），必须位于各实例共享、
+# 实例回收后仍然保留的持久存储上（例如挂载的NAS目录）；单个实例的 /tmp 随实例回收丢失，其他实例也无法重发
+DEFAULT_SPOOL_DIR = ''
+SPOOL_FILE_NAME = 'notifications.sqlite3'
+
+# 每次最多重发的消息数，避免服务恢复时集中重发
+DEFAULT_SPOOL_BATCH_SIZE = 20
+
+# 重发退避时间（秒）及消息最长保留时间（秒），超时的消息被丢弃
+RETRY_BACKOFF_BASE = 5.0
+RETRY_BACKOFF_CAP = 600.0
+DEFAULT_SPOOL_MAX_AGE = 86400
+
+# 重发时认领消息的时长（秒），在此期间其他线程或实例不会重复发送
+CLAIM_SECONDS = 60
+
+_connection: Optional[sqlite3.Connection] = None
+_connection_path: Optional[str] = None
+_lock = threading.Lock()
+
+def _get_int_env(name: str, default: int) -> int:
+    """读取整数类型的环境变量，无效时返回默认值。"""
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+def is_enabled() -> bool:
+    """是否启用重发队列（设置了 SPOOL_DIR 时启用）。未启用时发送失败返回错误，由 HetrixTools 重试。"""
+    return bool(os.getenv('SPOOL_DIR', DEFAULT_SPOOL_DIR))
+
+def _get_connection(create: bool = False) -> Optional[sqlite3.Connection]:
+    """
+    获取重发队列的SQLite连接。打开失败时返回None，此时发送失败的消息不会入队。
+
+    Args:
+        create (bool): 队列文件不存在时是否创建。只读操作不创建文件，没有失败消息的调用无需访问磁盘。
+    """
+    global _connection, _connection_path
+
+    directory = os.getenv('SPOOL_DIR', DEFAULT_SPOOL_DIR)
+    if not directory:
+        return None
+    path = os.path.join(directory, SPOOL_FILE_NAME)
+    if _connection is not None and _connection_path == path:
+        return _connection
+    if not create and not os.path.exists(path):
+        return None
+
+    try:
+        os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(path, timeout=1.0, check_same_thread=False, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=FULL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS notifications ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, dedup_key TEXT NOT NULL UNIQUE, group_key TEXT NOT NULL, "
+            "content TEXT NOT NULL, summary TEXT, uids TEXT NOT NULL, created_at REAL NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, next_attempt_at REAL NOT NULL, last_error TEXT)"
+        )
+    except (OSError, sqlite3.Error) as e:
+        print(f"重发队列不可用: {e}")
+        return None
+
+    if _connection is not None:
+        _connection.close()
+    _connection, _connection_path = connection, path
+    return _connection
+
+def dedup_key(content: str, summary: Optional[str], uids: List[str]) -> str:
+    """根据接收者和消息内容计算去重键，同一条消息重复入队时只保留一条。"""
+    payload = json.dumps([sorted(uids), summary, content], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def enqueue(content: str, summary: Optional[str], uids: List[str], group_key: str, error: Optional[str] = None) -> bool:
+    """
+    将发送失败或需要延后发送的消息写入重发队列。
+
+    Args:
+        content (str): 完整的消息内容。
+        summary (str): 消息摘要。
+        uids (List[str]): 接收消息的用户ID列表。
+        group_key (str): 顺序分组键（通常为监控项），同一分组内的消息按入队顺序发送。
+        error (str, optional): 发送失败的原因。
+
+    Returns:
+        bool: 消息是否已在队列中（包括此前已入队的相同消息）。重发队列不可用时返回False。
+    """
+    now = time.time()
+    # 发送失败的消息推迟到退避时间之后再重发；为保持顺序而入队的消息可以立即重发
+    next_attempt_at = now + RETRY_BACKOFF_BASE if error else now
+    with _lock:
+        connection = _get_connection(create=True)
+        if connection is None:
+            return False
+        try:
+            cursor = connection.execute(
+                "INSERT OR IGNORE INTO notifications "
+                "(dedup_key, group_key, content, summary, uids, created_at, next_attempt_at, last_error) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (dedup_key(content, summary, uids), group_key, content, summary, json.dumps(uids), now, next_attempt_at, error)
+            )
+        except sqlite3.Error as e:
+            print(f"写入重发队列失败: {e}")
+            return False
+    metrics.incr('spool.enqueued' if cursor.rowcount > 0 else 'spool.duplicates')
+    return True
+
+def has_pending(group_key: str) -> bool:
+    """指定分组是否有等待重发的消息。有则新消息也应入队，以保持分组内的发送顺序。"""
+    with _lock:
+        connection = _get_connection()
+        if connection is None:
+            return False
+        try:
+            row = connection.execute(
+                "SELECT 1 FROM notifications WHERE group_key = ? LIMIT 1", (group_key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"读取重发队列失败: {e}")
+            return False
+    return row is not None
+
+def pending_count() -> int:
+    """获取重发队列中的消息数。"""
+    with _lock:
+        connection = _get_connection()
+        if connection is None:
+            return 0
+        try:
+            return connection.execute("SELECT COUNT(*) FROM notifications").fetchone()[0]
+        except sqlite3.Error as e:
+            print(f"读取重发队列失败: {e}")
+            return 0
+
+def _claim(connection: sqlite3.Connection, spool_id: int, now: float) -> bool:
+    """
+    认领一条消息：将下一次重发时间推迟 CLAIM_SECONDS，多个线程或实例同时重发时每条消息只由一方发送。
+    """
+    with _lock:
+        try:
+            return connection.execute(
+                "UPDATE notifications SET next_attempt_at = ? WHERE id = ? AND next_attempt_at <= ?",
+                (now + CLAIM_SECONDS, spool_id, now)
+            ).rowcount > 0
+        except sqlite3.Error as e:
+            print(f"更新重发队列失败: {e}")
+            return False
+
+def drain(send: Callable[[str, Optional[str], List[str]], Any], limit: Optional[int] = None) -> Dict[str, int]:
+    """
+    按入队顺序重发到期的消息。
+
+    同一分组的消息按入队顺序发送，较早的消息未到重发时间或发送失败时，该分组的后续消息保留到下一次；
+    任一消息发送失败时停止本次重发，避免在服务故障期间集中请求。失败的消息按带抖动的指数退避
+    推迟下一次重发，超过 SPOOL_MAX_AGE_SECONDS 的消息被丢弃。
+
+    Args:
+        send (Callable): 发送函数，接收 (消息内容, 摘要, 接收者ID列表)，发送失败时抛出异常。
+        limit (int, optional): 本次最多发送的消息数，默认为 SPOOL_BATCH_SIZE。
+
+    Returns:
+        Dict[str, int]: sent（已发送）、failed（发送失败）、expired（已丢弃）和 remaining（剩余）的消息数。
+    """
+    result = {'sent': 0, 'failed': 0, 'expired': 0, 'remaining': 0}
+    limit = limit if limit is not None else _get_int_env('SPOOL_BATCH_SIZE', DEFAULT_SPOOL_BATCH_SIZE)
+    now = time.time()
+
+    with _lock:
+        connection = _get_connection()
+        if connection is None:
+            return result
+        try:
+            expired = connection.execute(
+                "DELETE FROM notifications WHERE created_at < ?",
+                (now - _get_int_env('SPOOL_MAX_AGE_SECONDS', DEFAULT_SPOOL_MAX_AGE),)
+            ).rowcount
+            # 多读取一些消息，以便跳过被阻塞的分组后仍能发送 limit 条
+            rows = connection.execute(
+                "SELECT id, group_key, content, summary, uids, attempts, next_attempt_at "
+                "FROM notifications ORDER BY id LIMIT ?",
+                (limit * 4,)
+            ).fetchall()
+        except sqlite3.Error as e:
+            print(f"读取重发队列失败: {e}")
+            return result
+    result['expired'] = expired
+    metrics.incr('spool.expired', expired)
+
+    blocked = set()
+    for spool_id, group_key, content, summary, uids, attempts, next_attempt_at in rows:
+        if result['sent'] >= limit:
+            break
+        if group_key in blocked:
+            continue
+        if next_attempt_at > now or not _claim(connection, spool_id, now):
+            blocked.add(group_key)
+            continue
+
+        try:
+            send(content, summary, json.loads(uids))
+        except Exception as e:
+            backoff = min(RETRY_BACKOFF_CAP, RETRY_BACKOFF_BASE * (2 ** attempts))
+            with _lock:
+                try:
+                    connection.execute(
+                        "UPDATE notifications SET attempts = attempts + 1, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                        (time.time() + random.uniform(backoff / 2, backoff), str(e), spool_id)
+                    )
+                except sqlite3.Error as db_error:
+                    print(f"更新重发队列失败: {db_error}")
+            result['failed'] += 1
+            metrics.incr('spool.failed')
+            break
+
+        with _lock:
+            try:
+                connection.execute("DELETE FROM notifications WHERE id = ?", (spool_id,))
+            except sqlite3.Error as e:
+                print(f"更新重发队列失败: {e}")
+        result['sent'] += 1
+        metrics.incr('spool.sent')
+
+    result['remaining'] = pending_count()
+    return result
+
+def clear() -> None:
+    """关闭SQLite连接（不删除队列文件）。"""
+    global _connection, _connection_path
+
+    with _lock:
+        if _connection is not None:
+            _connection.close()
+        _connection, _connection_path = None, None
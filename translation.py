@@ -1,8 +1,21 @@
-from aliyunsdkcore.client import AcsClient
-from aliyunsdkcore.request import CommonRequest
-from aliyunsdkcore.auth.credentials import AccessKeyCredential
 import json
 import os
+from typing import TYPE_CHECKING, Dict, List
+from clients import get_acs_client
+import metrics
+import resilience
+import scheduler
+
+if TYPE_CHECKING:
+    from aliyunsdkcore.client import AcsClient
+
+# 阿里云机器翻译服务地址，可通过环境变量指向本地测试服务
+ALIYUN_MT_DOMAIN = os.getenv('ALIYUN_MT_DOMAIN', 'mt.aliyuncs.com')
+ALIYUN_MT_PROTOCOL = os.getenv('ALIYUN_MT_PROTOCOL', 'https')
+
+# 阿里云批量翻译接口单次请求的条数和总字符数上限
+BATCH_MAX_ITEMS = 50
+BATCH_MAX_CHARS = 8000
 
 class TranslationError(Exception):
     """自定义异常类，用于处理翻译相关的错误"""
@@ -10,6 +23,70 @@ class TranslationError(Exception):
         self.message = message
         super().__init__(self.message)
 
+class PartialTranslationError(TranslationError):
+    """批量翻译中部分文本翻译失败或结果为空时抛出的异常，其余文本的翻译结果保存在 results 中"""
+    def __init__(self, message, results: Dict[str, str], failed: List[str]):
+        super().__init__(message)
+        self.results = results
+        self.failed = failed
+
+def _get_client() -> 'AcsClient':
+    """
+    获取共享的阿里云客户端。
+
+    Returns:
+        AcsClient: 使用环境变量中访问密钥创建的客户端，在热启动调用间复用。
+
+    Raises:
+        TranslationError: 如果阿里云访问密钥未设置。
+    """
+    # 从环境变量中获取阿里云访问密钥ID和密钥
+    access_key_id = os.getenv('ALIYUN_ACCESS_KEY_ID')
+    access_key_secret = os.getenv('ALIYUN_ACCESS_KEY_SECRET')
+
+    if not access_key_id or not access_key_secret:
+        raise TranslationError("阿里云访问密钥未设置，请检查环境变量。")
+
+    return get_acs_client(access_key_id, access_key_secret)
+
+def _is_retryable_error(error: BaseException) -> bool:
+    """阿里云SDK的网络错误、超时、限流和服务端错误需要重试。"""
+    from aliyunsdkcore.acs_exception.exceptions import ClientException, ServerException
+
+    if isinstance(error, ClientException):
+        return error.get_error_code() == 'SDK.HttpError'
+    if isinstance(error, ServerException):
+        return (error.get_http_status() or 0) >= 500 or str(error.get_error_code()).startswith('Throttling')
+    return False
+
+def _do_action(client: 'AcsClient', request) -> bytes:
+    """
+    发送阿里云API请求。
+
+    连接和读取超时受本次调用的剩余时间限制，网络错误、限流和服务端错误按退避重试，
+    连续失败时熔断，见 resilience.call。请求按令牌桶（ALIYUN_RATE_LIMIT）限速，见 scheduler。
+
+    Raises:
+        ClientException: 如果请求失败。
+        ServerException: 如果服务端返回错误。
+        OutboundError: 如果剩余时间不足或服务处于熔断状态。
+    """
+    from aliyunsdkcore.acs_exception.exceptions import ServerException
+
+    def send(timeout: float) -> bytes:
+        request.set_connect_timeout(timeout)
+        request.set_read_timeout(timeout)
+        metrics.incr('aliyun.requests')
+        try:
+            return client.do_action_with_exception(request)
+        except ServerException as e:
+            # 服务端限流时暂停后续请求，重试和其他线程的请求都在暂停结束后发出
+            if str(e.get_error_code()).startswith('Throttling'):
+                scheduler.pause('aliyun', scheduler.DEFAULT_THROTTLE_SECONDS)
+            raise
+
+    return resilience.call('aliyun', send, retry_on=_is_retryable_error)
+
 def translate_text(source_text: str, source_language: str = 'en', target_language: str = 'zh') -> str:
     """
     使用阿里云翻译服务将文本从一种语言翻译成另一种语言。
@@ -26,25 +103,18 @@ def translate_text(source_text: str, source_language: str = 'en', target_languag
         TranslationError: 如果阿里云访问密钥未设置或翻译请求失败。
     """
     try:
-        # 从环境变量中获取阿里云访问密钥ID和密钥
-        access_key_id = os.getenv('ALIYUN_ACCESS_KEY_ID')
-        access_key_secret = os.getenv('ALIYUN_ACCESS_KEY_SECRET')
-
-        if not access_key_id or not access_key_secret:
-            raise TranslationError("阿里云访问密钥未设置，请检查环境变量。")
+        # 获取共享的AcsClient实例，用于与阿里云API进行交互
+        client = _get_client()
 
-        # 创建AccessKeyCredential实例，用于认证
-        credentials = AccessKeyCredential(access_key_id, access_key_secret)
-
-        # 创建AcsClient实例，用于与阿里云API进行交互
-        client = AcsClient(region_id='ap-northeast-1', credential=credentials)
+        # 延迟导入阿里云SDK，完全命中缓存的调用无需加载
+        from aliyunsdkcore.request import CommonRequest
 
         # 创建CommonRequest实例，用于构建具体的API请求
         request = CommonRequest()
         request.set_accept_format('json')  # 设置响应格式为JSON
-        request.set_domain('mt.aliyuncs.com')  # 设置请求域名
+        request.set_domain(ALIYUN_MT_DOMAIN)  # 设置请求域名
         request.set_method('POST')  # 设置HTTP方法为POST
-        request.set_protocol_type('https')  # 设置协议类型为HTTPS
+        request.set_protocol_type(ALIYUN_MT_PROTOCOL)  # 设置协议类型，默认为HTTPS
         request.set_version('2018-10-12')  # 设置API版本
         request.set_action_name('TranslateGeneral')  # 设置API操作名称
 
@@ -55,20 +125,133 @@ def translate_text(source_text: str, source_language: str = 'en', target_languag
         request.add_query_param('FormatType', 'text')  # 添加格式类型参数
 
         # 发送请求并获取响应
-        response = client.do_action(request)
+        response = _do_action(client, request)
 
         # 将响应转换为JSON格式
         response_json = json.loads(response.decode('utf-8'))
 
-        # 打印响应内容以便调试
-        print(f"Translation Response: {response_json}")
-
         # 检查响应中是否包含预期的字段
         if 'Data' in response_json and 'Translated' in response_json['Data']:
             translated_text = response_json['Data']['Translated']
+            if not translated_text or not translated_text.strip():
+                raise TranslationError(f"文本 {source_text} 的翻译结果为空")
             return translated_text
         else:
             raise TranslationError(f"响应中未找到翻译结果: {response_json}")
 
+    except TranslationError:
+        raise
+    except Exception as e:
+        raise TranslationError(f"{str(e)}") from e
+
+def _chunk_texts(source_texts: List[str]) -> List[List[str]]:
+    """按批量翻译接口的条数和字符数上限将文本分组。"""
+    chunks = []
+    current = []
+    current_chars = 0
+    for text in source_texts:
+        if current and (len(current) >= BATCH_MAX_ITEMS or current_chars + len(text) > BATCH_MAX_CHARS):
+            chunks.append(current)
+            current = []
+            current_chars = 0
+        current.append(text)
+        current_chars += len(text)
+    if current:
+        chunks.append(current)
+    return chunks
+
+def translate_batch(source_texts: List[str], source_language: str = 'en', target_language: str = 'zh') -> Dict[str, str]:
+    """
+    使用阿里云批量翻译接口（GetBatchTranslate）一次翻译多条文本。
+
+    重复的文本只翻译一次；超过单次请求上限时自动拆分为多次请求。其他线程正在翻译的相同文本
+    不再重复请求，而是等待其结果，见 scheduler.coalesce。
+
+    Args:
+        source_texts (List[str]): 要翻译的源文本列表。
+        source_language (str, optional): 源语言代码，默认为'en'（英文）。
+        target_language (str, optional): 目标语言代码，默认为'zh'（中文）。
+
+    Returns:
+        Dict[str, str]: 源文本到翻译结果的映射。
+
+    Raises:
+        PartialTranslationError: 如果部分文本翻译失败或翻译结果为空，其余文本的结果在异常的 results 中。
+        TranslationError: 如果阿里云访问密钥未设置或翻译请求失败。
+    """
+    unique_texts = list(dict.fromkeys(source_texts))
+    if not unique_texts:
+        return {}
+
+    try:
+        results = scheduler.coalesce(
+            f"aliyun:{source_language}:{target_language}", unique_texts,
+            lambda texts: _request_batch(texts, source_language, target_language)
+        )
+    except TranslationError:
+        raise
+    except Exception as e:
+        raise TranslationError(f"{str(e)}") from e
+
+    failed = [text for text in unique_texts if text not in results]
+    if failed:
+        raise PartialTranslationError(f"部分文本翻译失败: {failed}", {text: results[text] for text in unique_texts if text in results}, failed)
+    return results
+
+def _request_batch(unique_texts: List[str], source_language: str, target_language: str) -> Dict[str, str]:
+    """
+    调用批量翻译接口翻译去重后的文本，超过单次请求上限时拆分为多次请求。
+
+    Returns:
+        Dict[str, str]: 源文本到翻译结果的映射，不包含翻译失败或结果为空的文本。
+
+    Raises:
+        TranslationError: 如果翻译请求失败。
+    """
+    try:
+        # 延迟导入阿里云SDK，完全命中缓存的调用无需加载
+        from aliyunsdkcore.request import CommonRequest
+
+        client = _get_client()
+
+        results = {}
+        for chunk in _chunk_texts(unique_texts):
+            request = CommonRequest()
+            request.set_accept_format('json')
+            request.set_domain(ALIYUN_MT_DOMAIN)
+            request.set_method('POST')
+            request.set_protocol_type(ALIYUN_MT_PROTOCOL)
+            request.set_version('2018-10-12')
+            request.set_action_name('GetBatchTranslate')
+
+            # SourceText 为 {序号: 文本} 形式的JSON字符串，响应中按序号返回结果
+            request.add_query_param('SourceLanguage', source_language)
+            request.add_query_param('TargetLanguage', target_language)
+            request.add_query_param('SourceText', json.dumps({str(i): text for i, text in enumerate(chunk)}, ensure_ascii=False))
+            request.add_query_param('FormatType', 'text')
+            request.add_query_param('Scene', 'general')
+            request.add_query_param('ApiType', 'translate_standard')
+
+            response = _do_action(client, request)
+            response_json = json.loads(response.decode('utf-8'))
+
+            translated_list = response_json.get('TranslatedList')
+            if not isinstance(translated_list, list):
+                raise TranslationError(f"响应中未找到翻译结果: {response_json}")
+
+            for item in translated_list:
+                index = int(item.get('index', -1))
+                if not 0 <= index < len(chunk):
+                    raise TranslationError(f"翻译结果序号无效: {item}")
+                # 单条文本失败或结果为空时跳过，由调用方按文本处理
+                if str(item.get('code')) != '200' or not str(item.get('translated') or '').strip():
+                    print(f"文本 {chunk[index]} 翻译失败: {item}")
+                    continue
+                results[chunk[index]] = item['translated']
+
+        return results
+
+    except TranslationError:
+        raise
     except Exception as e:
-        raise TranslationError(f"{str(e)}")
\ No newline at end of file
+        raise TranslationError(f"{str(e)}") from e
@@ -0,0 +1,187 @@
+import os
+import re
+from typing import Any, Dict, List, Optional
+import metrics
+
+# 模板中的占位符，{0}、{1}... 按出现顺序对应原文中被替换的实体
+PLACEHOLDER_PATTERN = re.compile(r'\{(\d+)\}')
+
+# 保留原样、不参与翻译的实体：IPv6/IPv4地址、主机名、包含数字的标识符（如 db-eu-3、web01）和数字
+_ENTITY_PATTERN = re.compile(
+    r'(?<![\w:])(?:[0-9A-Fa-f]{0,4}:){2,7}[0-9A-Fa-f]{1,4}(?![\w:])'
+    r'|\b(?:\d{1,3}\.){3}\d{1,3}(?::\d+)?\b'
+    r'|\b(?:[A-Za-z0-9](?:[A-Za-z0-9-]*[A-Za-z0-9])?\.)+[A-Za-z]{2,}(?::\d+)?\b'
+    r'|\b[\w-]*\d[\w-]*\b'
+)
+
+# 模板按分隔符拆分为片段，例如 "Web Server {0} - HTTPS" 拆分为 "Web Server {0}" 和 "HTTPS"
+_SEPARATOR_PATTERN = re.compile(r'(\s+[-|/–—·]\s+|[,;:]\s+|\s*[()\[\]]\s*)')
+
+# 片段中除占位符外至少包含一个字母时才需要翻译
+_LETTER_PATTERN = re.compile(r'[^\W\d_]')
+
+# 各种命中方式的统计：exact（原文）、template（模板）、fragments（片段拼接）、identity（无需翻译）、miss
+_stats = {'exact': 0, 'template': 0, 'fragments': 0, 'identity': 0, 'miss': 0}
+
+def is_enabled() -> bool:
+    """是否启用翻译记忆（环境变量 TRANSLATION_MEMORY，默认启用）。"""
+    return os.getenv('TRANSLATION_MEMORY', 'true').lower() not in ('0', 'false', 'no', 'off')
+
+def _count(kind: str, value: int = 1) -> None:
+    """更新命中统计，并同步到 metrics 计数器。"""
+    _stats[kind] += value
+    metrics.incr(f"translation_memory.{kind}", value)
+
+def _is_translatable(fragment: str) -> bool:
+    """片段去掉占位符后是否仍包含需要翻译的文字。"""
+    return bool(_LETTER_PATTERN.search(PLACEHOLDER_PATTERN.sub('', fragment)))
+
+def normalize(text: str) -> tuple:
+    """
+    将原文中的数字、主机名和IP地址替换为占位符。
+
+    Args:
+        text (str): 原文，例如 "Web Server 17 - HTTPS"。
+
+    Returns:
+        tuple: (模板, 实体列表)，例如 ("Web Server {0} - HTTPS", ["17"])。
+            未启用翻译记忆或原文本身包含占位符格式的内容时，模板即原文。
+    """
+    if not is_enabled() or PLACEHOLDER_PATTERN.search(text):
+        return text, []
+
+    entities: List[str] = []
+
+    def replace(match: 're.Match') -> str:
+        entities.append(match.group(0))
+        return '{%d}' % (len(entities) - 1)
+
+    return _ENTITY_PATTERN.sub(replace, text), entities
+
+def plan(text: str) -> Dict[str, Any]:
+    """
+    分析原文，得到模板、实体和需要翻译的片段。
+
+    Args:
+        text (str): 原文。
+
+    Returns:
+        Dict[str, Any]: text（原文）、template（模板）、entities（实体列表）、
+            parts（模板按分隔符拆分的结果，偶数位为片段，奇数位为分隔符）和 fragments（需要翻译的片段）。
+    """
+    template, entities = normalize(text)
+    parts = _SEPARATOR_PATTERN.split(template) if is_enabled() else [template]
+    fragments = list(dict.fromkeys(
+        part.strip() for part in parts[::2] if _is_translatable(part)
+    ))
+    return {'text': text, 'template': template, 'entities': entities, 'parts': parts, 'fragments': fragments}
+
+def lookup_units(text_plan: Dict[str, Any]) -> List[str]:
+    """
+    获取需要在缓存中查找的条目：原文、模板和各片段。不需要翻译的原文返回空列表。
+
+    Args:
+        text_plan (Dict[str, Any]): plan() 的结果。
+
+    Returns:
+        List[str]: 去重后的查找条目。
+    """
+    if not text_plan['fragments']:
+        return []
+    return list(dict.fromkeys([text_plan['text'], text_plan['template'], *text_plan['fragments']]))
+
+def fill(translated_template: str, entities: List[str]) -> Optional[str]:
+    """
+    将实体填回翻译后的模板。
+
+    Args:
+        translated_template (str): 翻译后的模板。
+        entities (List[str]): 实体列表。
+
+    Returns:
+        Optional[str]: 填充后的翻译结果；翻译结果丢失或改动了占位符时返回None。
+    """
+    indexes = [int(index) for index in PLACEHOLDER_PATTERN.findall(translated_template)]
+    if sorted(indexes) != list(range(len(entities))):
+        return None
+    return PLACEHOLDER_PATTERN.sub(lambda match: entities[int(match.group(1))], translated_template)
+
+def keeps_placeholders(source: str, translated: str) -> bool:
+    """翻译结果是否完整保留了原文中的占位符。"""
+    return sorted(PLACEHOLDER_PATTERN.findall(source)) == sorted(PLACEHOLDER_PATTERN.findall(translated))
+
+def translate_template(text_plan: Dict[str, Any], known: Dict[str, str]) -> Optional[str]:
+    """
+    用已知的片段翻译拼接出模板的翻译。
+
+    Args:
+        text_plan (Dict[str, Any]): plan() 的结果。
+        known (Dict[str, str]): 已知的 {原文/模板/片段: 翻译结果}。
+
+    Returns:
+        Optional[str]: 模板的翻译；有片段缺失时返回None。
+    """
+    if any(fragment not in known for fragment in text_plan['fragments']):
+        return None
+
+    output = []
+    for position, part in enumerate(text_plan['parts']):
+        fragment = part.strip()
+        if position % 2 == 0 and fragment and _is_translatable(part):
+            part = part.replace(fragment, known[fragment], 1)
+        output.append(part)
+    return ''.join(output)
+
+def resolve(text_plan: Dict[str, Any], known: Dict[str, str], count: bool = True) -> Optional[str]:
+    """
+    依次用原文、模板和片段的已知翻译得到原文的翻译。
+
+    Args:
+        text_plan (Dict[str, Any]): plan() 的结果。
+        known (Dict[str, str]): 已知的 {原文/模板/片段: 翻译结果}。
+        count (bool): 是否计入命中统计。调用翻译API之后再次拼接时应为False。
+
+    Returns:
+        Optional[str]: 翻译结果；无法在本地得到时返回None（未命中由调用方通过 record_misses 记录）。
+    """
+    def hit(kind: str, translated: str) -> str:
+        if count:
+            _count(kind)
+        return translated
+
+    text = text_plan['text']
+    if not text_plan['fragments']:
+        return hit('identity', text)
+    if text in known:
+        return hit('exact', known[text])
+
+    template = text_plan['template']
+    if template in known:
+        translated = fill(known[template], text_plan['entities'])
+        if translated is not None:
+            return hit('template', translated)
+
+    translated_template = translate_template(text_plan, known)
+    if translated_template is not None:
+        translated = fill(translated_template, text_plan['entities'])
+        if translated is not None:
+            return hit('fragments', translated)
+
+    return None
+
+def record_misses(count: int) -> None:
+    """记录需要调用翻译API的原文数量。"""
+    _count('miss', count)
+
+def missing_fragments(text_plan: Dict[str, Any], known: Dict[str, str]) -> List[str]:
+    """获取尚无翻译的片段。"""
+    return [fragment for fragment in text_plan['fragments'] if fragment not in known]
+
+def get_stats() -> Dict[str, int]:
+    """
+    获取翻译记忆的命中统计。
+
+    Returns:
+        Dict[str, int]: exact、template、fragments、identity 和 miss 的次数。
+    """
+    return dict(_stats)